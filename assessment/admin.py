@@ -4,10 +4,13 @@ from .models import (
     AssessmentComponent,
     Course,
     Enrollment,
+    GradeImportJob,
     LearningOutcome,
+    LearningOutcomeAttainment,
     LearningOutcomeContribution,
     LearningOutcomeProgramOutcome,
     ProgramOutcome,
+    ProgramOutcomeAttainment,
     Student,
     StudentAssessment,
 )
@@ -46,9 +49,16 @@ class StudentAdmin(admin.ModelAdmin):
 
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
-    list_display = ("student", "course", "year", "section")
+    list_display = ("student", "course", "year", "section", "final_score")
     list_filter = ("year", "course")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("student", "course").with_final_score()
+
+    @admin.display(description="Final puan", ordering="final_total")
+    def final_score(self, obj):
+        return obj.final_score
+
 
 @admin.register(AssessmentComponent)
 class AssessmentComponentAdmin(admin.ModelAdmin):
@@ -66,3 +76,23 @@ class LearningOutcomeContributionAdmin(admin.ModelAdmin):
 class StudentAssessmentAdmin(admin.ModelAdmin):
     list_display = ("assessment_component", "enrollment", "score")
     list_filter = ("assessment_component__course",)
+
+
+@admin.register(LearningOutcomeAttainment)
+class LearningOutcomeAttainmentAdmin(admin.ModelAdmin):
+    list_display = ("enrollment", "learning_outcome", "score")
+    list_filter = ("learning_outcome__course",)
+
+
+@admin.register(ProgramOutcomeAttainment)
+class ProgramOutcomeAttainmentAdmin(admin.ModelAdmin):
+    list_display = ("enrollment", "program_outcome", "weighted_total", "weight_total")
+    list_filter = ("program_outcome",)
+
+
+@admin.register(GradeImportJob)
+class GradeImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "course", "filename", "status", "rows_processed", "rows_total", "created_at", "finished_at")
+    list_filter = ("status", "course")
+    exclude = ("headers", "rows")
+    readonly_fields = ("errors", "summary", "started_at", "finished_at")
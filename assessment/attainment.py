@@ -0,0 +1,147 @@
+import threading
+
+from django.db import transaction
+
+from .curriculum import get_lo_po_map
+from .models import Enrollment, LearningOutcomeAttainment, ProgramOutcomeAttainment
+from .scoring import lo_scores_for_enrollments
+from .versioning import before_pending_bumps
+
+BATCH_SIZE = 500
+
+_pending = threading.local()
+
+
+def _write(enrollment_ids, lo_score_maps):
+    lo_po_map = get_lo_po_map()
+    lo_rows = []
+    po_rows = []
+    for enrollment_id in enrollment_ids:
+        lo_scores = lo_score_maps.get(enrollment_id, {})
+        lo_rows.extend(
+            LearningOutcomeAttainment(enrollment_id=enrollment_id, learning_outcome_id=lo_id, score=score)
+            for lo_id, score in lo_scores.items()
+        )
+        po_rows.extend(
+            ProgramOutcomeAttainment(
+                enrollment_id=enrollment_id, program_outcome_id=po_id, weighted_total=total, weight_total=weight_sum
+            )
+            for po_id, (total, weight_sum) in lo_po_map.po_totals(lo_scores).items()
+        )
+    with transaction.atomic():
+        LearningOutcomeAttainment.objects.filter(enrollment_id__in=enrollment_ids).delete()
+        ProgramOutcomeAttainment.objects.filter(enrollment_id__in=enrollment_ids).delete()
+        LearningOutcomeAttainment.objects.bulk_create(lo_rows, batch_size=BATCH_SIZE)
+        ProgramOutcomeAttainment.objects.bulk_create(po_rows, batch_size=BATCH_SIZE)
+
+
+def refresh_enrollments(enrollments):
+    """Verilen kayıtların ÖÇ ve PÇ başarımlarını yeniden hesaplayıp yazar."""
+    enrollments = list(enrollments)
+    for start in range(0, len(enrollments), BATCH_SIZE):
+        batch = enrollments[start : start + BATCH_SIZE]
+        _write([e.id for e in batch], lo_scores_for_enrollments(batch))
+    return len(enrollments)
+
+
+def refresh_program_outcomes(course_ids):
+    """ÖÇ–PÇ ağırlığı değiştiğinde yalnızca PÇ satırlarını mevcut ÖÇ başarımlarından yeniler."""
+    lo_po_map = get_lo_po_map()
+    enrollment_ids = list(Enrollment.objects.filter(course_id__in=course_ids).values_list("id", flat=True))
+    for start in range(0, len(enrollment_ids), BATCH_SIZE):
+        batch = enrollment_ids[start : start + BATCH_SIZE]
+        lo_score_maps = lo_scores_from_attainment(batch)
+        po_rows = [
+            ProgramOutcomeAttainment(
+                enrollment_id=enrollment_id, program_outcome_id=po_id, weighted_total=total, weight_total=weight_sum
+            )
+            for enrollment_id in batch
+            for po_id, (total, weight_sum) in lo_po_map.po_totals(lo_score_maps.get(enrollment_id, {})).items()
+        ]
+        with transaction.atomic():
+            ProgramOutcomeAttainment.objects.filter(enrollment_id__in=batch).delete()
+            ProgramOutcomeAttainment.objects.bulk_create(po_rows, batch_size=BATCH_SIZE)
+
+
+def rebuild_attainment(courses=None):
+    """Tüm (veya verilen derslerin) başarım tablolarını toplu olarak yeniden kurar."""
+    enrollments = Enrollment.objects.only("id", "course_id").order_by("id")
+    if courses is not None:
+        enrollments = enrollments.filter(course__in=courses)
+    return refresh_enrollments(enrollments)
+
+
+def _pending_state():
+    state = getattr(_pending, "state", None)
+    if state is not None and not any(func is _flush for _, func, *_ in transaction.get_connection().run_on_commit):
+        # İşlem (veya kaydetme noktası) geri alındığında onay kancası düşer; bekleyen kimlikler de atılır,
+        # yoksa geri alınan değişikliklerin kimlikleri sonraki işlemin yenilemesine karışırdı.
+        state = None
+    if state is None:
+        state = _pending.state = {"enrollments": set(), "courses": set(), "po_courses": set()}
+    return state
+
+
+def schedule_refresh(enrollment_ids=(), course_ids=(), po_course_ids=()):
+    """Yenilemeyi işlem (transaction) sonuna erteler; aynı kayıt bir kez yenilenir."""
+    state = _pending_state()
+    state["enrollments"].update(enrollment_ids)
+    state["courses"].update(course_ids)
+    state["po_courses"].update(po_course_ids)
+    transaction.on_commit(_flush)
+
+
+# Sürüm artışları yenilenmiş tabloları göstermelidir; artış kancası daha önce kaydedilmiş olsa da önce bu çalışır.
+@before_pending_bumps
+def _flush():
+    state = getattr(_pending, "state", None)
+    if state is None:
+        return
+    del _pending.state
+    if state["courses"]:
+        rebuild_attainment(courses=list(state["courses"]))
+    enrollment_ids = state["enrollments"]
+    if enrollment_ids:
+        refresh_enrollments(
+            Enrollment.objects.filter(id__in=enrollment_ids).exclude(course_id__in=state["courses"]).only(
+                "id", "course_id"
+            )
+        )
+    po_course_ids = state["po_courses"] - state["courses"]
+    if po_course_ids:
+        refresh_program_outcomes(po_course_ids)
+
+
+def lo_scores_from_attainment(enrollments):
+    """Kayıtlı ÖÇ başarımları: {enrollment_id: {lo_id: puan}}."""
+    enrollment_ids = [getattr(e, "id", e) for e in enrollments]
+    scores = {enrollment_id: {} for enrollment_id in enrollment_ids}
+    rows = LearningOutcomeAttainment.objects.filter(enrollment_id__in=enrollment_ids).values_list(
+        "enrollment_id", "learning_outcome_id", "score"
+    )
+    for enrollment_id, lo_id, score in rows:
+        scores[enrollment_id][lo_id] = score
+    return scores
+
+
+def po_performance_from_attainment(enrollments):
+    """Kayıtlı PÇ başarımlarını birleştirir; calculate_po_performance ile aynı biçimde döner.
+
+    Aynı ders birden çok kez alınmışsa önceki hesapla uyumlu olarak yalnızca sonuncu kayıt sayılır.
+    """
+    latest = {}
+    for enrollment in enrollments:
+        latest[enrollment.course_id] = enrollment.id
+    enrollment_ids = list(latest.values())
+    po_scores = {}
+    rows = ProgramOutcomeAttainment.objects.filter(enrollment_id__in=enrollment_ids).select_related("program_outcome")
+    for row in rows:
+        item = po_scores.setdefault(row.program_outcome_id, {"total": 0.0, "weight": 0, "po": row.program_outcome})
+        item["total"] += row.weighted_total
+        item["weight"] += row.weight_total
+
+    results = []
+    for item in po_scores.values():
+        normalized = item["total"] / item["weight"] if item["weight"] else 0
+        results.append({"program_outcome": item["po"], "score": round(normalized, 1)})
+    return sorted(results, key=lambda x: x["program_outcome"].code)
@@ -0,0 +1,58 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.views.decorators.http import condition
+
+from .versioning import get_versions
+
+
+# Bu önbelleklerdeki sürümler süreç başınadır; başka bir süreçteki yazma onları artırmaz.
+PER_PROCESS_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def _shared_versions():
+    """Sürüm damgaları tüm süreçlerin gördüğü bir önbellekte mi tutuluyor."""
+    return settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES
+
+
+def _data_versions(request, scopes_for, args, kwargs):
+    """İsteğin bağlı olduğu kapsamlar ve sürümleri; ETag ve Last-Modified için bir kez hesaplanır."""
+    if not hasattr(request, "_data_versions"):
+        state = None
+        # Bekleyen mesajlar sayfaya işlenir; bu yanıtlar koşullu olarak önbelleklenmez.
+        # Süreç başına sürümlerle 304 dönmek başka süreçteki bir değişikliği gizleyebilir.
+        if _shared_versions() and not len(get_messages(request)):
+            scopes = scopes_for(request, *args, **kwargs)
+            if scopes is not None:
+                state = (tuple(scopes), get_versions(*scopes))
+        request._data_versions = state
+    return request._data_versions
+
+
+def versioned(scopes_for):
+    """Görünümü, `scopes_for(request, ...)` kapsamlarının sürümlerinden türetilen ETag/Last-Modified ile sarar.
+
+    Veri değişmediyse görünüm çalışmadan 304 döner. `scopes_for` None dönerse ya da varsayılan önbellek süreçler
+    arasında paylaşılmıyorsa istek koşulsuz işlenir.
+    """
+
+    def etag(request, *args, **kwargs):
+        state = _data_versions(request, scopes_for, args, kwargs)
+        if state is None:
+            return None
+        scopes, versions = state
+        return hashlib.sha1("|".join(f"{scope}={version}" for scope, version in zip(scopes, versions)).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        state = _data_versions(request, scopes_for, args, kwargs)
+        if state is None or not state[1]:
+            return None
+        # Sürümler mikrosaniye cinsinden en son değişiklik zamanını izler.
+        return datetime.fromtimestamp(max(state[1]) / 1_000_000, tz=timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
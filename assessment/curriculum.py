@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+from django.db.models import Avg, Count
+
+from .models import LearningOutcomeProgramOutcome, ProgramOutcome
+from .versioning import CURRICULUM, get_version
+
+_compiled = None
+
+
+class LoPoMap:
+    """Derlenmiş, seyrek ÖÇ→PÇ ağırlık yapısı; bir müfredat sürümü için değişmez."""
+
+    __slots__ = ("version", "links", "program_outcomes")
+
+    def __init__(self, version, links, program_outcomes):
+        self.version = version
+        self.links = links
+        self.program_outcomes = program_outcomes
+
+    @classmethod
+    def build(cls, version):
+        links = defaultdict(list)
+        rows = LearningOutcomeProgramOutcome.objects.order_by("id").values_list(
+            "learning_outcome_id", "program_outcome_id", "weight"
+        )
+        for lo_id, po_id, weight in rows:
+            links[lo_id].append((po_id, weight))
+        return cls(
+            version,
+            {lo_id: tuple(items) for lo_id, items in links.items()},
+            {po.id: po for po in ProgramOutcome.objects.all()},
+        )
+
+    def po_totals(self, lo_scores):
+        """ÖÇ puanlarından PÇ toplamları: {po_id: (ağırlıklı toplam, ağırlık toplamı)}."""
+        totals = {}
+        for lo_id, score in lo_scores.items():
+            for po_id, weight in self.links.get(lo_id, ()):
+                total, weight_sum = totals.get(po_id, (0.0, 0))
+                totals[po_id] = (total + score * weight, weight_sum + weight)
+        return totals
+
+
+def course_po_weights(courses=None):
+    """Ders x PÇ başına ortalama ÖÇ–PÇ ağırlığı ve bağlantı sayısı: {(course_id, po_id): (ortalama, sayı)}.
+
+    Tek bir gruplu sorguyla hesaplanır; `courses` verilirse (sorgu kümesi veya id listesi) yalnızca o dersler okunur.
+    """
+    links = LearningOutcomeProgramOutcome.objects.all()
+    if courses is not None:
+        links = links.filter(learning_outcome__course__in=courses)
+    rows = (
+        links.order_by()
+        .values("learning_outcome__course_id", "program_outcome_id")
+        .annotate(avg_weight=Avg("weight"), link_count=Count("id"))
+    )
+    return {
+        (row["learning_outcome__course_id"], row["program_outcome_id"]): (row["avg_weight"], row["link_count"])
+        for row in rows
+    }
+
+
+def get_lo_po_map():
+    """Güncel müfredat sürümünün derlenmiş ÖÇ→PÇ haritası; sürüm değişince yeniden kurulur."""
+    global _compiled
+    version = get_version(CURRICULUM)
+    compiled = _compiled
+    if compiled is None or compiled.version != version:
+        compiled = _compiled = LoPoMap.build(version)
+    return compiled
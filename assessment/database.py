@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_SIZE = -64 * 1024
+DEFAULT_BUSY_TIMEOUT = 5000
+
+
+def sqlite_pragmas():
+    """Üretim profili PRAGMA'ları; ayarlardan okunur.
+
+    cache_size SQLite anlamıyla verilir: negatif değer KiB, pozitif değer sayfa sayısıdır.
+    """
+    return [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", int(getattr(settings, "ASSESSMENT_SQLITE_BUSY_TIMEOUT", DEFAULT_BUSY_TIMEOUT))),
+        ("mmap_size", int(getattr(settings, "ASSESSMENT_SQLITE_MMAP_SIZE", DEFAULT_MMAP_SIZE))),
+        ("cache_size", int(getattr(settings, "ASSESSMENT_SQLITE_CACHE_SIZE", DEFAULT_CACHE_SIZE))),
+    ]
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Her yeni SQLite bağlantısına üretim profilini uygular.
+
+    WAL ile okuyucular yazma işlemi sürerken beklemez; synchronous=NORMAL WAL'da güvenli ve daha hızlıdır.
+    ASSESSMENT_SQLITE_PROFILE varsayılan olarak yalnızca DEBUG kapalıyken açıktır: journal_mode dosyaya kalıcı
+    yazıldığından geliştirme veritabanı olduğu gibi bırakılır.
+    """
+    if connection.vendor != "sqlite" or not getattr(settings, "ASSESSMENT_SQLITE_PROFILE", not settings.DEBUG):
+        return
+    # Ham sqlite3 bağlantısı kullanılır; PRAGMA'lar sorgu günlüğüne ve sorgu bütçesine sayılmaz.
+    for name, value in sqlite_pragmas():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
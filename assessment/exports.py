@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .importing import (
+    CLASS_HEADERS,
+    ENTRY_HEADERS,
+    LETTER_HEADERS,
+    NAME_HEADERS,
+    STUDENT_NUMBER_HEADERS,
+    SURNAME_HEADERS,
+)
+from .models import Enrollment, LearningOutcomeAttainment, ProgramOutcomeAttainment
+from .structure import get_course_structure
+from .versioning import course_roster_scope, course_scope, get_version
+from .xlsx import stream_xlsx
+
+BATCH_SIZE = 500
+TEMPLATE_TIMEOUT = 24 * 60 * 60
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _score(value):
+    return round(value, 1) if value is not None else None
+
+
+def course_attainment_rows(course):
+    """Dersin başlık satırını ve kayıt başına final/ÖÇ/PÇ puanlarını partiler halinde üretir.
+
+    Puanlar başarım tablolarından okunur; her parti için üç sorgu çalışır.
+    """
+    structure = get_course_structure(course)
+    program_outcomes = sorted({link.program_outcome for link in structure.program_links}, key=lambda po: po.code)
+    yield (
+        ["Öğrenci No", "Ad Soyad", "Yıl", "Şube", "Final"]
+        + [lo.code for lo in structure.learning_outcomes]
+        + [po.code for po in program_outcomes]
+    )
+
+    enrollment_ids = list(
+        Enrollment.objects.filter(course=course).order_by("student__student_number", "year", "id").values_list("id", flat=True)
+    )
+    for start in range(0, len(enrollment_ids), BATCH_SIZE):
+        chunk = enrollment_ids[start : start + BATCH_SIZE]
+        enrollments = Enrollment.objects.filter(id__in=chunk).select_related("student").with_final_score().in_bulk()
+        lo_scores = defaultdict(dict)
+        for enrollment_id, lo_id, score in LearningOutcomeAttainment.objects.filter(enrollment_id__in=chunk).values_list(
+            "enrollment_id", "learning_outcome_id", "score"
+        ):
+            lo_scores[enrollment_id][lo_id] = score
+        po_scores = defaultdict(dict)
+        for enrollment_id, po_id, weighted_total, weight_total in ProgramOutcomeAttainment.objects.filter(
+            enrollment_id__in=chunk
+        ).values_list("enrollment_id", "program_outcome_id", "weighted_total", "weight_total"):
+            po_scores[enrollment_id][po_id] = weighted_total / weight_total if weight_total else 0
+        for enrollment_id in chunk:
+            enrollment = enrollments[enrollment_id]
+            yield (
+                [
+                    enrollment.student.student_number,
+                    enrollment.student.full_name,
+                    enrollment.year,
+                    enrollment.section,
+                    enrollment.final_score,
+                ]
+                + [_score(lo_scores[enrollment_id].get(lo.id)) for lo in structure.learning_outcomes]
+                + [_score(po_scores[enrollment_id].get(po.id)) for po in program_outcomes]
+            )
+
+
+def stream_attainment_export(courses):
+    """Her ders için bir sayfa içeren başarım çalışma kitabını parça parça üretir."""
+    return stream_xlsx((course.code, course_attainment_rows(course)) for course in courses)
+
+
+def _split_name(full_name):
+    """OBS biçimi: son sözcük soyadı, kalanı ad."""
+    parts = full_name.rsplit(" ", 1)
+    return (parts[0], parts[1]) if len(parts) == 2 else (full_name, "")
+
+
+def course_template_rows(course):
+    """Dersin kayıtlı öğrencileriyle OBS biçiminde boş not şablonu satırları."""
+    components = sorted(get_course_structure(course).components, key=lambda comp: comp.name)
+    yield (
+        ["No", STUDENT_NUMBER_HEADERS[0], NAME_HEADERS[0], SURNAME_HEADERS[0], CLASS_HEADERS[0], ENTRY_HEADERS[0]]
+        + [f"{comp.name}(%{comp.weight_percent})" for comp in components]
+        + [LETTER_HEADERS[0]]
+    )
+    enrollments = (
+        Enrollment.objects.filter(course=course)
+        .order_by("student__student_number", "id")
+        .values_list("student__student_number", "student__full_name", "class_level", "entry_status", "letter_grade")
+    )
+    seen = set()
+    for student_number, full_name, class_level, entry_status, letter_grade in enrollments.iterator():
+        # Aynı öğrencinin farklı yıl/şube kayıtları içe aktarmada tek satıra iner.
+        if student_number in seen:
+            continue
+        seen.add(student_number)
+        first_name, last_name = _split_name(full_name)
+        yield (
+            [len(seen), student_number, first_name, last_name, class_level, entry_status]
+            + [None] * len(components)
+            + [letter_grade]
+        )
+
+
+def course_grade_template(course):
+    """Ders şablonunun XLSX baytları; ders yapısı ve öğrenci listesi sürümüne göre önbelleklenir."""
+    key = (
+        f"assessment:template:{course.id}:"
+        f"{get_version(course_scope(course.id))}:{get_version(course_roster_scope(course.id))}"
+    )
+    data = cache.get(key)
+    if data is None:
+        data = b"".join(stream_xlsx([(course.code, course_template_rows(course))]))
+        cache.set(key, data, TEMPLATE_TIMEOUT)
+    return data
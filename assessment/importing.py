@@ -0,0 +1,467 @@
+import json
+import re
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import F
+
+from .attainment import schedule_refresh
+from .models import AssessmentComponent, Course, Enrollment, Student, StudentAssessment
+from .search import normalize_search_text
+from .versioning import (
+    STUDENTS,
+    course_roster_scope,
+    course_scope,
+    course_scores_scope,
+    invalidate,
+    student_scope,
+)
+
+DEFAULT_YEAR = 2023
+BATCH_SIZE = 500
+PROGRESS_EVERY = 500
+
+STUDENT_NUMBER_HEADERS = ["Öğrenci No", "Ogrenci No", "Student No"]
+NAME_HEADERS = ["Adı", "Adi", "Name"]
+SURNAME_HEADERS = ["Soyadı", "Soyadi", "Surname"]
+CLASS_HEADERS = ["Snf", "Sınıf", "Sinif", "Class"]
+ENTRY_HEADERS = ["Girme Durum", "Girme Durumu", "Entry Status"]
+LETTER_HEADERS = ["Harf Notu", "Harf Not", "Letter Grade"]
+
+COMPONENT_PATTERN = re.compile(r"^(?P<name>.+)\(%(?P<weight>\d+)\)$")
+
+
+class GradeImportError(Exception):
+    """Tablo içe aktarılamayacak durumda (ör. Öğrenci No sütunu yok)."""
+
+
+class ImportSummary(NamedTuple):
+    rows: int
+    students_created: int
+    students_updated: int
+    enrollments_created: int
+    enrollments_updated: int
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+def normalize_header(header):
+    if not header:
+        return ""
+    return header.split("_")[0].strip()
+
+
+def component_columns(headers):
+    columns = {}
+    for index, header in enumerate(headers):
+        clean = normalize_header(header)
+        match = COMPONENT_PATTERN.match(clean)
+        if not match:
+            continue
+        weight = int(match.group("weight"))
+        if weight < 0 or weight > 100:
+            continue
+        columns[index] = {"name": match.group("name").strip(), "weight": weight}
+    return columns
+
+
+def find_header_index(header_map, candidates):
+    for candidate in candidates:
+        if candidate in header_map:
+            return header_map[candidate]
+    return None
+
+
+def sheet_table(raw_rows):
+    """İlk satırı başlık kabul eder; veri satırlarını başlık genişliğine tamamlar/kırpar."""
+    if not raw_rows:
+        return [], []
+    headers = [normalize_header(header) for header in raw_rows[0]]
+    header_len = len(headers)
+    rows = []
+    for row in raw_rows[1:]:
+        if len(row) < header_len:
+            row = row + [""] * (header_len - len(row))
+        rows.append(row[:header_len])
+    return headers, rows
+
+
+def _cell(row, index):
+    if index is None or index >= len(row):
+        return None
+    return (row[index] or "").strip()
+
+
+def _chunks(values, size=BATCH_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _payload_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise GradeImportError("Tablo hücrelerinde yalnızca metin veya sayı olabilir.")
+
+
+def decode_grade_table(raw, bases=None):
+    """Düzenleyicinin gönderdiği JSON tabloyu tek geçişte doğrular ve (başlıklar, satırlar) döner.
+
+    Yük ya tam tablodur (`{"headers": [...], "rows": [[...], ...]}`) ya da sunucunun bildiği
+    bir temel tabloya göre yalnızca değişen hücrelerdir
+    (`{"base": "template", "changes": [[satır, sütun, değer], ...]}`); `bases` bu temelleri
+    ada göre verir.
+    """
+    try:
+        payload = json.loads(raw or "")
+    except ValueError:
+        raise GradeImportError("Tablo verisi okunamadı.")
+    if not isinstance(payload, dict):
+        raise GradeImportError("Tablo verisi okunamadı.")
+
+    base_name = payload.get("base")
+    if base_name:
+        base = (bases or {}).get(base_name)
+        if base is None:
+            raise GradeImportError("Düzenlenen tablonun kaynağı bulunamadı; lütfen sayfayı yenileyin.")
+        headers = list(base[0])
+        rows = [list(row) for row in base[1]]
+        changes = payload.get("changes", [])
+        if not isinstance(changes, list):
+            raise GradeImportError("Tablo verisi okunamadı.")
+        for change in changes:
+            if not isinstance(change, list) or len(change) != 3:
+                raise GradeImportError("Geçersiz hücre değişikliği.")
+            row_index, col_index, value = change
+            if not (
+                isinstance(row_index, int)
+                and isinstance(col_index, int)
+                and 0 <= row_index < len(rows)
+                and 0 <= col_index < len(headers)
+            ):
+                raise GradeImportError("Geçersiz hücre değişikliği.")
+            rows[row_index][col_index] = _payload_text(value)
+    else:
+        headers = payload.get("headers")
+        rows = payload.get("rows")
+        if not isinstance(headers, list) or not isinstance(rows, list):
+            raise GradeImportError("Tablo verisi okunamadı.")
+        headers = [_payload_text(header) for header in headers]
+        header_len = len(headers)
+        table = []
+        for row in rows:
+            if not isinstance(row, list):
+                raise GradeImportError("Tablo verisi okunamadı.")
+            row = [_payload_text(value) for value in row[:header_len]]
+            table.append(row + [""] * (header_len - len(row)))
+        rows = table
+    if not headers:
+        raise GradeImportError("Tablo başlıkları bulunamadı; kayıt yapılamadı.")
+    return headers, rows
+
+
+def _lock_course(course):
+    """Dersin içe aktarmalarını sıraya sokar; çağıran açık bir işlemin içinde olmalıdır.
+
+    PostgreSQL'de ders satırı FOR UPDATE ile kilitlenir. SQLite satır kilidi tanımaz ve ertelenmiş bir işlemde
+    okumadan sonra gelen yazma, araya başka bir yazar girdiyse beklemeden hata verir; yazma kilidi bu yüzden
+    değeri değiştirmeyen bir UPDATE ile en başta alınır.
+    """
+    courses = Course.objects.filter(id=course.id)
+    if transaction.get_connection().vendor == "sqlite":
+        courses.update(term=F("term"))
+    else:
+        list(courses.select_for_update().values_list("id", flat=True))
+
+
+class GradeImport:
+    """Bir dersin not tablosunu önceden yüklenmiş ders verisiyle karşılaştırıp toplu yazar.
+
+    `plan()` birkaç sorguyla farkı bellekte hesaplar; `apply()` ders kilidini alıp farkı aynı işlemde yeniden
+    hesaplar ve bulk_create/bulk_update ile uygular.
+    """
+
+    def __init__(self, course, headers, rows, progress=None):
+        self.course = course
+        self.headers = headers
+        self.rows = rows
+        self.progress = progress
+        self.errors = []
+        self.planned = False
+
+    def _parse_rows(self):
+        header_map = {normalize_header(header): idx for idx, header in enumerate(self.headers)}
+        student_no_idx = find_header_index(header_map, STUDENT_NUMBER_HEADERS)
+        if student_no_idx is None:
+            raise GradeImportError("Öğrenci No sütunu bulunamadı; kayıt yapılamadı.")
+        name_idx = find_header_index(header_map, NAME_HEADERS)
+        surname_idx = find_header_index(header_map, SURNAME_HEADERS)
+        class_idx = find_header_index(header_map, CLASS_HEADERS)
+        entry_idx = find_header_index(header_map, ENTRY_HEADERS)
+        letter_idx = find_header_index(header_map, LETTER_HEADERS)
+
+        parsed = {}
+        row_count = 0
+        for row_index, row in enumerate(self.rows):
+            if self.progress and row_index and row_index % PROGRESS_EVERY == 0:
+                self.progress(row_index)
+            student_number = _cell(row, student_no_idx)
+            if not student_number:
+                continue
+            row_count += 1
+            full_name = f"{_cell(row, name_idx) or ''} {_cell(row, surname_idx) or ''}".strip()
+            entry = parsed.setdefault(student_number, {"full_name": "", "fields": {}, "scores": {}})
+            if full_name:
+                entry["full_name"] = full_name
+            class_val = _cell(row, class_idx)
+            if class_val is not None:
+                entry["fields"]["class_level"] = int(class_val) if class_val.isdigit() else None
+            entry_status = _cell(row, entry_idx)
+            if entry_status is not None:
+                entry["fields"]["entry_status"] = entry_status
+            letter_grade = _cell(row, letter_idx)
+            if letter_grade is not None:
+                entry["fields"]["letter_grade"] = letter_grade
+            for col_index in self.columns:
+                raw_score = _cell(row, col_index)
+                if not raw_score:
+                    continue
+                try:
+                    entry["scores"][col_index] = float(raw_score.replace(",", "."))
+                except ValueError:
+                    self.errors.append(
+                        {
+                            "row": row_index + 1,
+                            "column": normalize_header(self.headers[col_index]),
+                            "value": raw_score,
+                            "message": "Sayısal olmayan not atlandı.",
+                        }
+                    )
+        if self.progress:
+            self.progress(len(self.rows))
+        return parsed, row_count
+
+    def plan(self):
+        """Tablodaki değişiklikleri mevcut ders verisiyle karşılaştırır; veritabanına yazmaz."""
+        course = self.course
+        self.errors = []
+        self.columns = component_columns(self.headers)
+        self.entries, self.row_count = self._parse_rows()
+
+        existing_components = {}
+        for comp in AssessmentComponent.objects.filter(course=course).order_by("id"):
+            existing_components.setdefault(comp.name, comp)
+        self.new_components = {}
+        self.weight_changes = []
+        self.component_by_column = {}
+        for col_index, info in self.columns.items():
+            comp = existing_components.get(info["name"]) or self.new_components.get(info["name"])
+            if comp is None:
+                comp = self.new_components[info["name"]] = AssessmentComponent(
+                    course=course, name=info["name"], weight_percent=info["weight"]
+                )
+            elif comp.weight_percent != info["weight"]:
+                self.weight_changes.append((comp, comp.weight_percent, info["weight"]))
+                comp.weight_percent = info["weight"]
+            self.component_by_column[col_index] = comp
+
+        self.students = {}
+        for chunk in _chunks(self.entries):
+            for student in Student.objects.filter(student_number__in=chunk).order_by("id"):
+                self.students.setdefault(student.student_number, student)
+        self.new_students = []
+        self.renamed_students = []
+        self.previous_names = {}
+        for student_number, entry in self.entries.items():
+            student = self.students.get(student_number)
+            if student is None:
+                full_name = entry["full_name"] or student_number
+                student = Student(
+                    student_number=student_number, full_name=full_name, search_name=normalize_search_text(full_name)[:255]
+                )
+                self.students[student_number] = student
+                self.new_students.append(student)
+            elif entry["full_name"] and student.full_name != entry["full_name"]:
+                self.previous_names[student_number] = student.full_name
+                student.full_name = entry["full_name"]
+                student.search_name = normalize_search_text(student.full_name)[:255]
+                self.renamed_students.append(student)
+
+        enrollments = {}
+        existing_ids = [student.id for student in self.students.values() if student.id]
+        for chunk in _chunks(existing_ids):
+            for enrollment in Enrollment.objects.filter(course=course, student_id__in=chunk).order_by("id"):
+                enrollments.setdefault(enrollment.student_id, enrollment)
+        self.enrollments = {}
+        self.new_enrollments = []
+        self.changed_enrollments = []
+        self.enrollment_changes = {}
+        for student_number, entry in self.entries.items():
+            student = self.students[student_number]
+            enrollment = enrollments.get(student.id) if student.id else None
+            if enrollment is None:
+                enrollment = Enrollment(student=student, course=course, year=DEFAULT_YEAR, **entry["fields"])
+                self.new_enrollments.append(enrollment)
+            else:
+                changes = {
+                    field: (getattr(enrollment, field), value)
+                    for field, value in entry["fields"].items()
+                    if getattr(enrollment, field) != value
+                }
+                if changes:
+                    for field, (_, value) in changes.items():
+                        setattr(enrollment, field, value)
+                    self.enrollment_changes[student_number] = changes
+                    self.changed_enrollments.append(enrollment)
+            self.enrollments[student_number] = enrollment
+
+        assessments = {}
+        enrollment_ids = [enrollment.id for enrollment in self.enrollments.values() if enrollment.id]
+        for chunk in _chunks(enrollment_ids):
+            for sa in StudentAssessment.objects.filter(enrollment_id__in=chunk, assessment_component__course=course):
+                assessments[(sa.enrollment_id, sa.assessment_component_id)] = sa
+        self.new_scores = []
+        self.changed_scores = []
+        self.score_changes = []
+        self.unchanged_scores = 0
+        pending = {}
+        for student_number, entry in self.entries.items():
+            enrollment = self.enrollments[student_number]
+            for col_index, score in entry["scores"].items():
+                comp = self.component_by_column[col_index]
+                sa = assessments.get((enrollment.id, comp.id))
+                if sa is None:
+                    # Aynı bileşene bağlı ikinci sütun yeni satırı yinelememeli.
+                    sa = pending.get((id(enrollment), id(comp)))
+                    if sa is not None:
+                        sa.score = score
+                        continue
+                    sa = StudentAssessment(enrollment=enrollment, assessment_component=comp, score=score)
+                    pending[(id(enrollment), id(comp))] = sa
+                    self.new_scores.append(sa)
+                elif sa.score != score:
+                    self.score_changes.append((student_number, comp.name, sa.score, score))
+                    sa.score = score
+                    self.changed_scores.append(sa)
+                else:
+                    self.unchanged_scores += 1
+        self.planned = True
+        return self
+
+    def _create_students(self):
+        """Yeni öğrencileri ekler; başka bir dersin eşzamanlı içe aktarması aynı numarayı eklediyse onu kullanır.
+
+        Ders kilidi yalnızca aynı dersin içe aktarmalarını sıraya sokar. Çakışan satırlar atlandığından birincil
+        anahtarlar öğrenci numarasıyla yeniden okunur; kayıtlar bu nesneler üzerinden bağlanır.
+        """
+        Student.objects.bulk_create(self.new_students, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        ids = {}
+        for chunk in _chunks([student.student_number for student in self.new_students]):
+            ids.update(Student.objects.filter(student_number__in=chunk).values_list("student_number", "id"))
+        for student in self.new_students:
+            student.id = ids[student.student_number]
+            student._state.adding = False
+
+    @property
+    def summary(self):
+        return ImportSummary(
+            rows=self.row_count,
+            students_created=len(self.new_students),
+            students_updated=len(self.renamed_students),
+            enrollments_created=len(self.new_enrollments),
+            enrollments_updated=len(self.changed_enrollments),
+            inserted=len(self.new_scores),
+            updated=len(self.changed_scores),
+            unchanged=self.unchanged_scores,
+        )
+
+    def diff(self):
+        """Kuru çalıştırma raporu: `plan()` sonucunu şablon ve JSON için düz yapılara çevirir."""
+        if not self.planned:
+            self.plan()
+        touched = {student.student_number for student in self.new_students}
+        touched.update(self.previous_names, self.enrollment_changes)
+        touched.update(number for number, _, _, _ in self.score_changes)
+        number_by_enrollment = {id(enrollment): number for number, enrollment in self.enrollments.items()}
+        new_scores = []
+        for sa in self.new_scores:
+            student_number = number_by_enrollment[id(sa.enrollment)]
+            new_scores.append({"student_number": student_number, "component": sa.assessment_component.name, "score": sa.score})
+            touched.add(student_number)
+        return {
+            "summary": self.summary._asdict(),
+            "new_components": [{"name": comp.name, "weight": comp.weight_percent} for comp in self.new_components.values()],
+            "weight_changes": [{"name": comp.name, "old": old, "new": new} for comp, old, new in self.weight_changes],
+            "new_students": [
+                {"student_number": student.student_number, "full_name": student.full_name} for student in self.new_students
+            ],
+            "renamed_students": [
+                {"student_number": number, "old": old, "new": self.students[number].full_name}
+                for number, old in self.previous_names.items()
+            ],
+            "new_enrollments": [enrollment.student.student_number for enrollment in self.new_enrollments],
+            "changed_enrollments": [
+                {"student_number": number, "fields": {field: {"old": old, "new": new} for field, (old, new) in changes.items()}}
+                for number, changes in self.enrollment_changes.items()
+            ],
+            "new_scores": new_scores,
+            "changed_scores": [
+                {"student_number": number, "component": name, "old": old, "new": new}
+                for number, name, old, new in self.score_changes
+            ],
+            "unchanged_rows": len(self.entries) - len(touched),
+            "errors": self.errors,
+        }
+
+    def apply(self):
+        """Farkı ders kilidi altında yeniden hesaplayıp tek işlemde uygular ve özetini döner.
+
+        Önizlemeden sonra başka bir içe aktarma aynı öğrencileri oluşturmuş olabilir; işlem dışında yapılmış bir
+        plan bu yüzden kullanılmaz.
+        """
+        with transaction.atomic():
+            _lock_course(self.course)
+            self.plan()
+            AssessmentComponent.objects.bulk_create(self.new_components.values(), batch_size=BATCH_SIZE)
+            AssessmentComponent.objects.bulk_update(
+                [comp for comp, _, _ in self.weight_changes], ["weight_percent"], batch_size=BATCH_SIZE
+            )
+            self._create_students()
+            # bulk_create/bulk_update save() çağırmaz; search_name planlama sırasında doldurulur.
+            Student.objects.bulk_update(self.renamed_students, ["full_name", "search_name"], batch_size=BATCH_SIZE)
+            # bulk_create, yeni oluşan ilişkili nesnelerin birincil anahtarlarını FK alanlarına aktarır.
+            Enrollment.objects.bulk_create(self.new_enrollments, batch_size=BATCH_SIZE)
+            Enrollment.objects.bulk_update(
+                self.changed_enrollments, ["class_level", "entry_status", "letter_grade"], batch_size=BATCH_SIZE
+            )
+            StudentAssessment.objects.bulk_create(self.new_scores, batch_size=BATCH_SIZE)
+            StudentAssessment.objects.bulk_update(self.changed_scores, ["score"], batch_size=BATCH_SIZE)
+
+            # Toplu yazımlar sinyal tetiklemediği için önbellek ve başarım tabloları burada yenilenir.
+            # Yenileme, sürüm artışlarından önce planlanır (bkz. signals).
+            scored_enrollment_ids = {sa.enrollment_id for sa in self.new_scores + self.changed_scores}
+            if self.new_components or self.weight_changes:
+                schedule_refresh(course_ids=[self.course.id])
+            if scored_enrollment_ids:
+                schedule_refresh(enrollment_ids=scored_enrollment_ids)
+            if self.new_enrollments or self.changed_enrollments:
+                invalidate(course_roster_scope(self.course.id))
+            renamed_course_ids = set()
+            for chunk in _chunks(self.renamed_students):
+                renamed_course_ids.update(Enrollment.objects.filter(student__in=chunk).values_list("course_id", flat=True))
+            invalidate(*(course_roster_scope(course_id) for course_id in renamed_course_ids))
+            if self.new_components or self.weight_changes:
+                invalidate(course_scope(self.course.id))
+            if scored_enrollment_ids:
+                invalidate(course_scores_scope(self.course.id))
+            # Öğrenci sayfaları notları ve kayıtları ders kapsamlarıyla izler; öğrenci başına yalnızca ad değişince
+            # artırılır. Binlerce satırlık bir tabloda her öğrenci için ayrı sürüm yazmak paylaşılan önbelleği boğar.
+            invalidate(*(student_scope(student.id) for student in self.renamed_students))
+            if self.new_students or self.renamed_students:
+                invalidate(STUDENTS)
+        return self.summary
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .importing import GradeImport, GradeImportError
+from .models import GradeImportJob
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 200
+# Kalp atışı bu süre (sn) boyunca yenilenmeyen RUNNING iş sahipsiz sayılır. İçe aktarmanın tek yazma işlemi
+# sırasında SQLite kalp atışını da bekletir; süre en uzun yazmadan uzun tutulmalıdır.
+JOB_LEASE_SECONDS = getattr(settings, "ASSESSMENT_IMPORT_JOB_LEASE", 300)
+JOB_MAX_ATTEMPTS = getattr(settings, "ASSESSMENT_IMPORT_JOB_MAX_ATTEMPTS", 3)
+
+
+def enqueue_import(course, headers, rows, filename=""):
+    """Ayrıştırılmış tabloyu kuyruk tablosuna yazar; işçi süreç sırayla işler."""
+    return GradeImportJob.objects.create(
+        course=course, filename=filename, headers=headers, rows=rows, rows_total=len(rows)
+    )
+
+
+def reclaim_stale_jobs():
+    """Kirası dolan RUNNING işleri kuyruğa geri alır; deneme hakkı bitenleri hata olarak kapatır.
+
+    İşçi iş ortasında öldüğünde iş aksi halde sonsuza dek RUNNING kalırdı. Yarıda kalan içe aktarma tek işlemde
+    yazıldığından geri alınmıştır; GradeImport farka dayalı olduğu için yeniden çalıştırmak güvenlidir.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=JOB_LEASE_SECONDS)
+    stale = GradeImportJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff), status=GradeImportJob.RUNNING
+    )
+    # Boş bir UPDATE de SQLite yazma kilidi aldığından önce okunur.
+    if not stale.exists():
+        return 0, 0
+    failed = stale.filter(attempts__gte=JOB_MAX_ATTEMPTS).update(
+        status=GradeImportJob.FAILED,
+        finished_at=now,
+        errors=[{"message": f"İşçi {JOB_MAX_ATTEMPTS} denemede de yanıt vermedi; iş durduruldu."}],
+    )
+    requeued = stale.filter(attempts__lt=JOB_MAX_ATTEMPTS).update(status=GradeImportJob.QUEUED, heartbeat_at=None)
+    if requeued or failed:
+        logger.warning("Sahipsiz içe aktarma işleri: %s kuyruğa geri alındı, %s durduruldu.", requeued, failed)
+    return requeued, failed
+
+
+def claim_next_job():
+    """Sıradaki işi koşullu UPDATE ile sahiplenir; aynı iş iki işçiye düşmez."""
+    reclaim_stale_jobs()
+    while True:
+        job_id = (
+            GradeImportJob.objects.filter(status=GradeImportJob.QUEUED).order_by("id").values_list("id", flat=True).first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = GradeImportJob.objects.filter(id=job_id, status=GradeImportJob.QUEUED).update(
+            status=GradeImportJob.RUNNING, started_at=now, heartbeat_at=now, attempts=F("attempts") + 1
+        )
+        if claimed:
+            return GradeImportJob.objects.select_related("course").get(id=job_id)
+
+
+class _Heartbeat(threading.Thread):
+    """İş sürerken kira süresinin üçte birinde bir heartbeat_at alanını yeniler."""
+
+    def __init__(self, job):
+        super().__init__(name=f"grade-import-heartbeat-{job.id}", daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(JOB_LEASE_SECONDS / 3):
+                try:
+                    _owned(self.job).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    # Yazma kilidi içe aktarma işlemindeyse bir sonraki turda yeniden denenir.
+                    pass
+        finally:
+            connections.close_all()
+
+
+def _owned(job):
+    """İşin bu denemesine ait satır; iş geri alınıp başka işçiye geçtiyse boş döner."""
+    return GradeImportJob.objects.filter(id=job.id, status=GradeImportJob.RUNNING, attempts=job.attempts)
+
+
+def run_job(job):
+    def report(processed):
+        _owned(job).update(rows_processed=processed, heartbeat_at=timezone.now())
+
+    importer = GradeImport(job.course, job.headers, job.rows, progress=report)
+    heartbeat = _Heartbeat(job)
+    heartbeat.start()
+    try:
+        summary = importer.apply()
+    except GradeImportError as exc:
+        job.status = GradeImportJob.FAILED
+        job.errors = [{"message": str(exc)}]
+    except Exception as exc:
+        logger.exception("Not içe aktarma işi #%s başarısız oldu.", job.id)
+        job.status = GradeImportJob.FAILED
+        job.errors = importer.errors[:MAX_REPORTED_ERRORS] + [{"message": f"Beklenmeyen hata: {exc}"}]
+    else:
+        job.status = GradeImportJob.DONE
+        job.summary = summary._asdict()
+        job.errors = importer.errors[:MAX_REPORTED_ERRORS]
+        # Ham tablo yalnızca işlenene kadar gerekir.
+        job.rows = []
+    finally:
+        heartbeat.stopped.set()
+        heartbeat.join()
+    job.rows_processed = job.rows_total
+    job.finished_at = timezone.now()
+    fields = ["status", "summary", "errors", "rows", "rows_processed", "finished_at"]
+    if not _owned(job).update(**{field: getattr(job, field) for field in fields}):
+        logger.warning("İçe aktarma işi #%s bu işçiden geri alınmış; sonucu yazılmadı.", job.id)
+    return job
+
+
+def _worker_loop(stop_event, poll_interval, once):
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    return
+                stop_event.wait(poll_interval)
+                continue
+            run_job(job)
+    finally:
+        connections.close_all()
+
+
+def run_worker(workers=2, poll_interval=2.0, once=False, stop_event=None):
+    """Kuyruğu `workers` iş parçacığıyla işler; `once` ise kuyruk boşalınca döner."""
+    stop_event = stop_event or threading.Event()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grade-import") as pool:
+        futures = [pool.submit(_worker_loop, stop_event, poll_interval, once) for _ in range(workers)]
+        try:
+            while not all(future.done() for future in futures):
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            stop_event.set()
+        for future in futures:
+            future.result()
+
+
+def job_progress(job):
+    return {
+        "id": job.id,
+        "course": job.course_id,
+        "filename": job.filename,
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "rows_total": job.rows_total,
+        "rows_processed": job.rows_processed,
+        "errors": job.errors,
+        "error_count": len(job.errors),
+        "summary": job.summary,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
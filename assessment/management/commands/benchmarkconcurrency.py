@@ -0,0 +1,195 @@
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from queue import Empty
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+
+from assessment.importing import GradeImport
+from assessment.models import AssessmentComponent, Course, Enrollment, Student
+from assessment.structure import clear_structure_cache
+from assessment.views import enrollment_assessment_breakdown
+
+BATCH_SIZE = 5000
+PROFILES = [("Varsayılan", False), ("Üretim (WAL)", True)]
+
+
+def _read_loop(enrollment_ids, seed, stop, queue):
+    """Alt süreçte çalışır: içe aktarım bitene kadar öğrenci paneli sorgularını tekrarlar."""
+    rng = random.Random(seed)
+    latencies = []
+    errors = []
+    queue.put("ready")
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            enrollment = Enrollment.objects.select_related("student", "course").get(id=rng.choice(enrollment_ids))
+            enrollment_assessment_breakdown(enrollment)
+            Enrollment.objects.filter(course_id=enrollment.course_id).count()
+        except OperationalError as exc:
+            errors.append(str(exc))
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    queue.put((latencies, errors))
+
+
+def _benchmark_caches(tmp_dir):
+    """Ölçümün önbelleği: paylaşılan dosya önbelleği gibi davranır ama dağıtımın var/cache dizinine dokunmaz."""
+    return {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(Path(tmp_dir) / "cache"),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+
+def _reset_cache_state():
+    """Sürüm damgalarını ve onlara bağlı süreç içi yapıları boşaltır; profiller birbirinin önbelleğini görmez."""
+    cache.clear()
+    clear_structure_cache()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Toplu not içe aktarımı sürerken okuyucu gecikmesini varsayılan ve üretim SQLite profilleriyle ölçer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=3000, help="Ders başına içe aktarılan öğrenci sayısı.")
+        parser.add_argument("--courses", type=int, default=4, help="Sırayla içe aktarılan ders sayısı.")
+        parser.add_argument("--components", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4, help="Eşzamanlı okuyucu süreç sayısı.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Bu ölçüm SQLite için yazılmıştır.")
+        results = []
+        for label, profile in PROFILES:
+            with tempfile.TemporaryDirectory() as tmp_dir, override_settings(
+                ASSESSMENT_SQLITE_PROFILE=profile, CACHES=_benchmark_caches(tmp_dir)
+            ):
+                # Her profil ayrı bir dosya veritabanında ve ayrı bir önbellekte ölçülür; journal_mode dosyaya kalıcı
+                # yazılır, içe aktarımın sürüm artışları da dağıtımın önbelleğine düşmemelidir.
+                connection.close()
+                connection.settings_dict["TEST"]["NAME"] = str(Path(tmp_dir) / "concurrency.sqlite3")
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                _reset_cache_state()
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute("PRAGMA journal_mode")
+                        journal_mode = cursor.fetchone()[0]
+                    tables = self._prepare(options)
+                    results.append((label, journal_mode, self._run(tables, options)))
+                finally:
+                    _reset_cache_state()
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        self._report(results)
+
+    def _prepare(self, options):
+        rng = random.Random(options["seed"])
+        courses = Course.objects.bulk_create(
+            Course(code=f"BLG{500 + index}", name=f"Yük dersi {index}", search_name=f"yuk dersi {index}")
+            for index in range(options["courses"])
+        )
+        names = [f"Bileşen {index}" for index in range(options["components"])]
+        AssessmentComponent.objects.bulk_create(
+            AssessmentComponent(course=course, name=name, weight_percent=100 // len(names))
+            for course in courses
+            for name in names
+        )
+        # Okuyucuların sorguladığı, içe aktarımdan bağımsız mevcut kayıtlar.
+        readers = Student.objects.bulk_create(
+            Student(full_name=f"Okuyucu {index}", student_number=str(100000 + index), search_name=f"okuyucu {index}")
+            for index in range(200)
+        )
+        Enrollment.objects.bulk_create(
+            (Enrollment(student=student, course=course, year=2023) for student in readers for course in courses),
+            batch_size=BATCH_SIZE,
+        )
+        headers = ["Öğrenci No", "Adı", "Soyadı"] + [f"{name}(%{100 // len(names)})" for name in names]
+        tables = []
+        for course_index, course in enumerate(courses):
+            rows = [
+                [str(200000000 + course_index * 100000 + index), f"Öğrenci{index}", "Yük"]
+                + [str(rng.randint(0, 100)) for _ in names]
+                for index in range(options["students"])
+            ]
+            tables.append((course, headers, rows))
+        return tables
+
+    def _run(self, tables, options):
+        # Okuyucular ayrı süreçlerde çalışır; aynı süreçteki iş parçacıkları kilit için değil GIL için yarışır.
+        # Çatallanan süreçler ayarları ve test veritabanı adını devralır; bağlantı paylaşılmasın diye önce kapatılır.
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        queue = context.Queue()
+        enrollment_ids = list(Enrollment.objects.values_list("id", flat=True))
+        connection.close()
+        readers = [
+            context.Process(target=_read_loop, args=(enrollment_ids, seed, stop, queue), daemon=True)
+            for seed in range(options["readers"])
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            for _ in readers:
+                queue.get(timeout=60)
+        except Empty:
+            raise CommandError("Okuyucu süreçler başlatılamadı.")
+
+        write_errors = []
+        started = time.perf_counter()
+        for course, headers, rows in tables:
+            try:
+                GradeImport(course, headers, rows).apply()
+            except OperationalError as exc:
+                write_errors.append(str(exc))
+        write_seconds = time.perf_counter() - started
+        stop.set()
+
+        latencies = []
+        read_errors = []
+        for _ in readers:
+            reader_latencies, reader_errors = queue.get(timeout=60)
+            latencies.extend(reader_latencies)
+            read_errors.extend(reader_errors)
+        for reader in readers:
+            reader.join()
+        return {
+            "write_seconds": write_seconds,
+            "write_errors": write_errors,
+            "reads": len(latencies),
+            "read_errors": read_errors,
+            "p50": statistics.median(latencies) if latencies else 0.0,
+            "p95": _percentile(latencies, 0.95),
+            "max": max(latencies, default=0.0),
+        }
+
+    def _report(self, results):
+        self.stdout.write(
+            f"\n{'Profil':<16}{'journal':>9}{'Yazma (sn)':>12}{'Okuma':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+            f"{'max (ms)':>10}{'Kilit hatası':>14}"
+        )
+        for label, journal_mode, result in results:
+            self.stdout.write(
+                f"{label:<16}{journal_mode:>9}{result['write_seconds']:>12.2f}{result['reads']:>8}"
+                f"{result['p50']:>10.2f}{result['p95']:>10.2f}{result['max']:>10.2f}"
+                f"{len(result['read_errors']) + len(result['write_errors']):>14}"
+            )
+        for label, _, result in results:
+            for message in sorted(set(result["read_errors"] + result["write_errors"])):
+                self.stderr.write(f"{label}: {message}")
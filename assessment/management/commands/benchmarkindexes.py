@@ -0,0 +1,182 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+
+BEFORE_MIGRATION = "0009_grade_import_job"
+AFTER_MIGRATION = "0010_lookup_indexes"
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = "Sentetik büyük bir veritabanında arama dizinlerinin (0010) öncesi ve sonrası sorgu sürelerini ölçer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=10000)
+        parser.add_argument("--courses", type=int, default=60)
+        parser.add_argument("--courses-per-student", type=int, default=5)
+        parser.add_argument("--components", type=int, default=4, help="Ders başına bileşen sayısı.")
+        parser.add_argument("--repeat", type=int, default=5, help="Her ölçümün tekrar sayısı (en iyi süre raporlanır).")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Bu ölçüm SQLite için yazılmıştır.")
+        self.random = random.Random(options["seed"])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Ayrı bir dosya veritabanı kurulur; proje veritabanına dokunulmaz.
+            connection.settings_dict["TEST"]["NAME"] = str(Path(tmp_dir) / "benchmark.sqlite3")
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                call_command("migrate", "assessment", BEFORE_MIGRATION, verbosity=0)
+                # Güncel modeller sonraki göç adımlarında eklenen sütunları içerir; ölçüm, iki şemada da aynı
+                # sütunlara sahip olan 0010 anındaki tarihsel modellerle yapılır.
+                self.apps = MigrationLoader(connection).project_state(("assessment", AFTER_MIGRATION)).apps
+                started = time.perf_counter()
+                self._populate(options)
+                self.stdout.write(f"Sentetik veri {time.perf_counter() - started:.1f} sn'de oluşturuldu.")
+                before = self._measure(options["repeat"])
+                call_command("migrate", "assessment", AFTER_MIGRATION, verbosity=0)
+                after = self._measure(options["repeat"])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        self._report(before, after)
+
+    def _models(self, *names):
+        return [self.apps.get_model("assessment", name) for name in names]
+
+    def _populate(self, options):
+        AssessmentComponent, Course, Enrollment, ProgramOutcome, Student, StudentAssessment = self._models(
+            "AssessmentComponent", "Course", "Enrollment", "ProgramOutcome", "Student", "StudentAssessment"
+        )
+        pos = ProgramOutcome.objects.bulk_create(
+            ProgramOutcome(code=f"PO{index}", title=f"Program çıktısı {index}") for index in range(1, 13)
+        )
+        courses = Course.objects.bulk_create(
+            Course(code=f"BLG{100 + index}", name=f"Ders {index}") for index in range(options["courses"])
+        )
+        components = AssessmentComponent.objects.bulk_create(
+            AssessmentComponent(course=course, name=f"Bileşen {index}", weight_percent=100 // options["components"])
+            for course in courses
+            for index in range(options["components"])
+        )
+        components_by_course = {}
+        for component in components:
+            components_by_course.setdefault(component.course_id, []).append(component.id)
+        students = Student.objects.bulk_create(
+            (Student(full_name=f"Öğrenci {index}", student_number=str(210000000 + index)) for index in range(options["students"])),
+            batch_size=BATCH_SIZE,
+        )
+        enrollments = []
+        for student in students:
+            for course in self.random.sample(courses, options["courses_per_student"]):
+                enrollments.append(Enrollment(student=student, course=course, year=self.random.randint(2021, 2024)))
+        Enrollment.objects.bulk_create(enrollments, batch_size=BATCH_SIZE)
+        scores = []
+        for enrollment in enrollments:
+            for component_id in components_by_course[enrollment.course_id]:
+                scores.append(
+                    StudentAssessment(
+                        enrollment_id=enrollment.id, assessment_component_id=component_id, score=self.random.randint(0, 100)
+                    )
+                )
+            if len(scores) >= BATCH_SIZE:
+                StudentAssessment.objects.bulk_create(scores)
+                scores = []
+        StudentAssessment.objects.bulk_create(scores)
+        self.sample = {
+            "numbers": [student.student_number for student in self.random.sample(students, 500)],
+            "course_codes": [course.code for course in courses] * (200 // len(courses) + 1),
+            "po_codes": [po.code for po in pos] * (200 // len(pos) + 1),
+            "course_ids": [course.id for course in courses[:20]],
+            "pairs": [(e.student_id, e.course_id) for e in self.random.sample(enrollments, 200)],
+            "component_ids": [component.id for component in components[:50]],
+        }
+        self.stdout.write(
+            f"{len(students)} öğrenci, {len(courses)} ders, {len(enrollments)} kayıt, "
+            f"{StudentAssessment.objects.count()} not."
+        )
+
+    def _queries(self):
+        Course, Enrollment, ProgramOutcome, Student, StudentAssessment = self._models(
+            "Course", "Enrollment", "ProgramOutcome", "Student", "StudentAssessment"
+        )
+        sample = self.sample
+        return [
+            (
+                "Öğrenci no IN (500)",
+                lambda: list(Student.objects.filter(student_number__in=sample["numbers"])),
+                Student.objects.filter(student_number__in=sample["numbers"][:3]),
+            ),
+            (
+                "Öğrenci no tekil x200",
+                lambda: [Student.objects.get(student_number=number) for number in sample["numbers"][:200]],
+                Student.objects.filter(student_number=sample["numbers"][0]),
+            ),
+            (
+                "Ders kodu x200",
+                lambda: [Course.objects.filter(code=code).first() for code in sample["course_codes"][:200]],
+                Course.objects.filter(code=sample["course_codes"][0]),
+            ),
+            (
+                "PÇ kodu x200",
+                lambda: [ProgramOutcome.objects.filter(code=code).first() for code in sample["po_codes"][:200]],
+                ProgramOutcome.objects.filter(code=sample["po_codes"][0]),
+            ),
+            (
+                "Ders+yıl kayıtları x20",
+                lambda: [
+                    list(Enrollment.objects.filter(course_id=course_id, year=2023).values_list("id", flat=True))
+                    for course_id in sample["course_ids"]
+                ],
+                Enrollment.objects.filter(course_id=sample["course_ids"][0], year=2023).values_list("id", flat=True),
+            ),
+            (
+                "Öğrenci+ders kaydı x200",
+                lambda: [
+                    Enrollment.objects.filter(student_id=student_id, course_id=course_id).first()
+                    for student_id, course_id in sample["pairs"]
+                ],
+                Enrollment.objects.filter(student_id=sample["pairs"][0][0], course_id=sample["pairs"][0][1]),
+            ),
+            (
+                "Bileşen not taraması x50",
+                lambda: [
+                    list(StudentAssessment.objects.filter(assessment_component_id=component_id).values_list("enrollment_id", "score"))
+                    for component_id in sample["component_ids"]
+                ],
+                StudentAssessment.objects.filter(assessment_component_id=sample["component_ids"][0]).values_list(
+                    "enrollment_id", "score"
+                ),
+            ),
+        ]
+
+    def _measure(self, repeat):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        results = {}
+        for label, run, queryset in self._queries():
+            run()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            results[label] = (min(timings) * 1000, queryset.explain())
+        return results
+
+    def _report(self, before, after):
+        self.stdout.write(f"\n{'Sorgu':<28}{'Önce (ms)':>12}{'Sonra (ms)':>12}{'Hızlanma':>10}")
+        for label, (before_ms, _) in before.items():
+            after_ms = after[label][0]
+            speedup = before_ms / after_ms if after_ms else 0
+            self.stdout.write(f"{label:<28}{before_ms:>12.2f}{after_ms:>12.2f}{speedup:>9.1f}x")
+        self.stdout.write("\nSorgu planları:")
+        for label, (_, before_plan) in before.items():
+            self.stdout.write(f"- {label}\n    önce : {' | '.join(before_plan.splitlines())}")
+            self.stdout.write(f"    sonra: {' | '.join(after[label][1].splitlines())}")
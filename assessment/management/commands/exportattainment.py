@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.exports import stream_attainment_export
+from assessment.models import Course
+
+
+class Command(BaseCommand):
+    help = "Kayıt başına final, ÖÇ ve PÇ puanlarını ders başına bir sayfa olarak XLSX dosyasına yazar."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", metavar="DOSYA", help="Yazılacak .xlsx dosyası.")
+        parser.add_argument("--course", action="append", dest="courses", metavar="KOD", help="Sadece bu ders kodu (tekrarlanabilir).")
+
+    def handle(self, *args, **options):
+        courses = Course.objects.order_by("code")
+        if options["courses"]:
+            courses = courses.filter(code__in=options["courses"])
+            missing = set(options["courses"]) - {course.code for course in courses}
+            if missing:
+                raise CommandError(f"Ders bulunamadı: {', '.join(sorted(missing))}")
+        size = 0
+        with open(options["output"], "wb") as handle:
+            for chunk in stream_attainment_export(courses):
+                handle.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"{options['output']} yazıldı ({len(courses)} ders, {size // 1024} KB)."))
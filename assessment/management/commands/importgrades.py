@@ -0,0 +1,153 @@
+import glob
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.importing import GradeImport, GradeImportError, sheet_table
+from assessment.models import Course
+from assessment.xlsx import read_xlsx_rows
+
+DEFAULT_COURSE_PATTERN = r"(?P<code>[A-Za-zÇĞİÖŞÜçğıöşü]+[\s_-]?\d+)"
+
+
+def _normalize_code(code):
+    return re.sub(r"[\s_-]", "", code).upper()
+
+
+def _parse_file(path):
+    """Alt süreçte çalışır: dosyayı ayrıştırır, (başlıklar, satırlar, süre) döner."""
+    started = time.perf_counter()
+    headers, rows = sheet_table(read_xlsx_rows(path))
+    return headers, rows, time.perf_counter() - started
+
+
+def _collect_files(sources):
+    files = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = sorted(path.glob("*.xlsx"))
+        elif glob.has_magic(source):
+            matches = sorted(Path(match) for match in glob.glob(source, recursive=True))
+        else:
+            matches = [path]
+        files.extend(match for match in matches if not match.name.startswith("~$"))
+    return list(dict.fromkeys(files))
+
+
+class Command(BaseCommand):
+    help = "Bir klasördeki veya glob desenine uyan OBS not dosyalarını toplu içe aktarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("sources", nargs="+", metavar="KAYNAK", help="Klasör, .xlsx dosyası veya glob deseni.")
+        parser.add_argument("--course", metavar="KOD", help="Tüm dosyaları bu derse aktar.")
+        parser.add_argument(
+            "--course-pattern",
+            default=DEFAULT_COURSE_PATTERN,
+            help="Dosya adından ders kodunu çıkaran düzenli ifade; `code` adlı grup içermeli.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Yazmadan yalnızca yapılacak değişiklikleri raporla.")
+        parser.add_argument("--workers", type=int, default=None, help="Ayrıştırma süreç sayısı (varsayılan: CPU sayısı).")
+
+    def _course_resolver(self, options):
+        if options["course"]:
+            course = Course.objects.filter(code=options["course"]).first()
+            if course is None:
+                raise CommandError(f"Ders bulunamadı: {options['course']}")
+            return lambda path: course
+        try:
+            pattern = re.compile(options["course_pattern"])
+        except re.error as exc:
+            raise CommandError(f"Geçersiz --course-pattern: {exc}")
+        if "code" not in pattern.groupindex:
+            raise CommandError("--course-pattern `code` adlı bir grup içermeli.")
+        courses = {_normalize_code(course.code): course for course in Course.objects.all()}
+
+        def resolve(path):
+            for match in pattern.finditer(path.stem):
+                course = courses.get(_normalize_code(match.group("code")))
+                if course is not None:
+                    return course
+            return None
+
+        return resolve
+
+    def handle(self, *args, **options):
+        files = _collect_files(options["sources"])
+        if not files:
+            raise CommandError("İçe aktarılacak .xlsx dosyası bulunamadı.")
+        resolve_course = self._course_resolver(options)
+
+        failures = []
+        planned = []
+        for path in files:
+            course = resolve_course(path)
+            if course is None:
+                failures.append((path, "Dosya adından ders belirlenemedi."))
+            else:
+                planned.append((path, course))
+
+        imported = 0
+        totals = {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup) as pool:
+            futures = [(path, course, pool.submit(_parse_file, str(path))) for path, course in planned]
+            # Ayrıştırma paralel yürür; yazımlar tek süreçte, sırayla aynı toplu yoldan geçer.
+            for path, course, future in futures:
+                try:
+                    headers, rows, parse_seconds = future.result()
+                except Exception as exc:
+                    failures.append((path, f"Ayrıştırılamadı: {exc}"))
+                    continue
+                if not headers:
+                    failures.append((path, "Excel dosyası okunamadı."))
+                    continue
+                write_started = time.perf_counter()
+                importer = GradeImport(course, headers, rows)
+                try:
+                    summary = importer.plan().summary if options["dry_run"] else importer.apply()
+                except GradeImportError as exc:
+                    failures.append((path, str(exc)))
+                    continue
+                write_seconds = time.perf_counter() - write_started
+                elapsed = parse_seconds + write_seconds
+                imported += 1
+                for field in totals:
+                    totals[field] += getattr(summary, field)
+                self.stdout.write(
+                    f"{path.name} -> {course.code}: {summary.rows} satır, "
+                    f"ayrıştırma {parse_seconds:.2f} sn, yazma {write_seconds:.2f} sn, "
+                    f"{summary.rows / elapsed if elapsed else 0:.0f} satır/sn "
+                    f"(yeni not: {summary.inserted}, değişen: {summary.updated}, değişmeyen: {summary.unchanged}, "
+                    f"uyarı: {len(importer.errors)})"
+                )
+                if options["dry_run"]:
+                    for comp, old, new in importer.weight_changes:
+                        self.stdout.write(f"    ağırlık {comp.name}: %{old} -> %{new}")
+                    for comp in importer.new_components.values():
+                        self.stdout.write(f"    yeni bileşen {comp.name} (%{comp.weight_percent})")
+                    self.stdout.write(
+                        f"    yeni öğrenci: {summary.students_created}, yeni kayıt: {summary.enrollments_created}, "
+                        f"değişen kayıt: {summary.enrollments_updated}"
+                    )
+                for error in importer.errors[:5]:
+                    self.stdout.write(f"    satır {error['row']} / {error['column']}: {error['message']} ({error['value']})")
+
+        elapsed = time.perf_counter() - started
+        if options["dry_run"]:
+            self.stdout.write("Kuru çalıştırma: veritabanına yazılmadı.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{imported}/{len(files)} dosya, "
+                f"{totals['rows']} satır, {elapsed:.2f} sn "
+                f"(yeni not: {totals['inserted']}, değişen: {totals['updated']}, değişmeyen: {totals['unchanged']})."
+            )
+        )
+        for path, message in failures:
+            self.stderr.write(f"{path}: {message}")
+        if failures:
+            raise CommandError(f"{len(failures)} dosya içe aktarılamadı.")
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 
-from assessment.views import bootstrap_demo_data
+from assessment.demo import bootstrap_demo_data
 
 
 class Command(BaseCommand):
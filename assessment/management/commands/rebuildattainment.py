@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.attainment import rebuild_attainment
+from assessment.models import Course
+
+
+class Command(BaseCommand):
+    help = "ÖÇ ve PÇ başarım tablolarını mevcut notlardan toplu olarak yeniden kurar."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", action="append", dest="courses", metavar="KOD", help="Sadece bu ders kodu (tekrarlanabilir).")
+
+    def handle(self, *args, **options):
+        courses = None
+        if options["courses"]:
+            courses = list(Course.objects.filter(code__in=options["courses"]))
+            missing = set(options["courses"]) - {course.code for course in courses}
+            if missing:
+                raise CommandError(f"Ders bulunamadı: {', '.join(sorted(missing))}")
+        count = rebuild_attainment(courses=courses)
+        self.stdout.write(self.style.SUCCESS(f"Başarım tabloları yenilendi: {count} kayıt."))
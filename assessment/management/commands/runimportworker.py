@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from assessment.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Kuyruktaki not içe aktarma işlerini arka planda işler."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Eşzamanlı iş parçacığı sayısı.")
+        parser.add_argument("--poll", type=float, default=2.0, help="Kuyruk boşken bekleme süresi (sn).")
+        parser.add_argument("--once", action="store_true", help="Kuyruk boşalınca çık.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"İçe aktarma işçisi başladı ({options['workers']} iş parçacığı).")
+        run_worker(workers=max(1, options["workers"]), poll_interval=options["poll"], once=options["once"])
+        self.stdout.write(self.style.SUCCESS("İçe aktarma işçisi durdu."))
@@ -0,0 +1,104 @@
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger("assessment.queries")
+
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+TOP_SHAPES = 3
+BUDGETED_METHODS = {"GET", "HEAD"}
+
+
+class QueryBudgetExceeded(Exception):
+    """Görünüm, ayarlarda tanımlı sorgu sayısı ya da süresi bütçesini aştı."""
+
+
+def query_shape(sql):
+    """Parametreli SQL'in kalıbı; farklı uzunluktaki IN listeleri aynı kalıba iner."""
+    return IN_LIST.sub("IN (...)", sql)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+            self.shapes[query_shape(sql)] += 1
+
+    def repeated(self):
+        return [(shape, total) for shape, total in self.shapes.most_common(TOP_SHAPES) if total > 1]
+
+
+class QueryBudgetMiddleware:
+    """Her istek için SQL sorgu sayısını, toplam veritabanı süresini ve tekrarlanan kalıpları kaydeder.
+
+    ASSESSMENT_QUERY_BUDGETS, URL adına göre (ör. "assessment:dashboard") sorgu sayısı ya da
+    {"queries": n, "time_ms": t} bütçesi verir. ASSESSMENT_QUERY_BUDGET_STRICT açıksa (DEBUG ve
+    testler) bütçe aşımı QueryBudgetExceeded yükseltir, değilse uyarı olarak günlüğe yazılır.
+    ASSESSMENT_QUERY_HEADERS açıksa ölçümler X-Query-* yanıt başlıklarına eklenir. Akış halindeki
+    yanıtlarda yalnızca görünümün kendisi ölçülür.
+
+    Bütçeler yalnızca GET/HEAD isteklerine uygulanır. Yazan istekler ölçülüp günlüğe yazılır; görünüm
+    değişikliği kaydettikten sonra hata yükseltmek başarılı bir yazmayı 500 gibi gösterirdi.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        duration_ms = recorder.duration * 1000
+        repeated = recorder.repeated()
+        view_name = request.resolver_match.view_name if request.resolver_match else ""
+
+        logger.debug(
+            "%s %s: %d sorgu, %.1f ms; en çok tekrarlanan: %s",
+            request.method,
+            request.path,
+            recorder.count,
+            duration_ms,
+            "; ".join(f"{total}x {shape[:120]}" for shape, total in repeated) or "-",
+        )
+        if getattr(settings, "ASSESSMENT_QUERY_HEADERS", False):
+            response["X-Query-Count"] = str(recorder.count)
+            response["X-Query-Time-Ms"] = f"{duration_ms:.1f}"
+            if repeated:
+                response["X-Query-Top-Repeat"] = f"{repeated[0][1]}x {repeated[0][0][:200]}"
+
+        if request.method in BUDGETED_METHODS:
+            self._check_budget(request, view_name, recorder.count, duration_ms, repeated)
+        return response
+
+    def _check_budget(self, request, view_name, count, duration_ms, repeated):
+        budget = getattr(settings, "ASSESSMENT_QUERY_BUDGETS", {}).get(view_name)
+        if budget is None:
+            return
+        if isinstance(budget, int):
+            budget = {"queries": budget}
+        problems = []
+        if budget.get("queries") is not None and count > budget["queries"]:
+            problems.append(f"{count} sorgu > {budget['queries']}")
+        if budget.get("time_ms") is not None and duration_ms > budget["time_ms"]:
+            problems.append(f"{duration_ms:.1f} ms > {budget['time_ms']} ms")
+        if not problems:
+            return
+        message = f"{view_name} ({request.path}) sorgu bütçesini aştı: {', '.join(problems)}"
+        if repeated:
+            message += f"; en çok tekrarlanan: {repeated[0][1]}x {repeated[0][0][:200]}"
+        if getattr(settings, "ASSESSMENT_QUERY_BUDGET_STRICT", settings.DEBUG):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0006_enrollment_grade_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramOutcomeAttainment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weighted_total', models.FloatField(default=0)),
+                ('weight_total', models.PositiveIntegerField(default=0)),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='po_attainments', to='assessment.enrollment')),
+                ('program_outcome', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attainments', to='assessment.programoutcome')),
+            ],
+            options={
+                'verbose_name': 'PÇ başarımı',
+                'verbose_name_plural': 'PÇ başarımları',
+                'unique_together': {('enrollment', 'program_outcome')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LearningOutcomeAttainment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lo_attainments', to='assessment.enrollment')),
+                ('learning_outcome', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attainments', to='assessment.learningoutcome')),
+            ],
+            options={
+                'verbose_name': 'ÖÇ başarımı',
+                'verbose_name_plural': 'ÖÇ başarımları',
+                'unique_together': {('enrollment', 'learning_outcome')},
+            },
+        ),
+    ]
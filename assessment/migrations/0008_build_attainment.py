@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def build_attainment(apps, schema_editor):
+    LearningOutcomeContribution = apps.get_model("assessment", "LearningOutcomeContribution")
+    LearningOutcomeProgramOutcome = apps.get_model("assessment", "LearningOutcomeProgramOutcome")
+    StudentAssessment = apps.get_model("assessment", "StudentAssessment")
+    Enrollment = apps.get_model("assessment", "Enrollment")
+    LearningOutcomeAttainment = apps.get_model("assessment", "LearningOutcomeAttainment")
+    ProgramOutcomeAttainment = apps.get_model("assessment", "ProgramOutcomeAttainment")
+
+    contributions = defaultdict(list)
+    for contrib in LearningOutcomeContribution.objects.select_related("assessment_component").order_by("id"):
+        component = contrib.assessment_component
+        contributions[component.course_id].append(
+            (component.id, contrib.learning_outcome_id, component.weight_percent / 100, contrib.contribution_percent / 100)
+        )
+
+    links = defaultdict(list)
+    for link in LearningOutcomeProgramOutcome.objects.all():
+        links[link.learning_outcome_id].append((link.program_outcome_id, link.weight))
+
+    score_matrix = defaultdict(dict)
+    for sa in StudentAssessment.objects.all():
+        score_matrix[sa.enrollment_id][sa.assessment_component_id] = sa.score
+
+    lo_rows = []
+    po_rows = []
+    for enrollment in Enrollment.objects.all():
+        student_scores = score_matrix.get(enrollment.id, {})
+        lo_scores = {}
+        for component_id, lo_id, comp_weight, lo_weight in contributions.get(enrollment.course_id, ()):
+            if component_id not in student_scores:
+                continue
+            lo_scores[lo_id] = lo_scores.get(lo_id, 0) + student_scores[component_id] * comp_weight * lo_weight
+
+        po_totals = {}
+        for lo_id, score in lo_scores.items():
+            lo_rows.append(LearningOutcomeAttainment(enrollment_id=enrollment.id, learning_outcome_id=lo_id, score=score))
+            for po_id, weight in links.get(lo_id, ()):
+                total, weight_sum = po_totals.get(po_id, (0.0, 0))
+                po_totals[po_id] = (total + score * weight, weight_sum + weight)
+        for po_id, (total, weight_sum) in po_totals.items():
+            po_rows.append(
+                ProgramOutcomeAttainment(
+                    enrollment_id=enrollment.id, program_outcome_id=po_id, weighted_total=total, weight_total=weight_sum
+                )
+            )
+
+    LearningOutcomeAttainment.objects.bulk_create(lo_rows, batch_size=500)
+    ProgramOutcomeAttainment.objects.bulk_create(po_rows, batch_size=500)
+
+
+def clear_attainment(apps, schema_editor):
+    apps.get_model("assessment", "LearningOutcomeAttainment").objects.all().delete()
+    apps.get_model("assessment", "ProgramOutcomeAttainment").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("assessment", "0007_attainment"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_attainment, clear_attainment),
+    ]
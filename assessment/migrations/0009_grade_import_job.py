@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0008_build_attainment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('headers', models.JSONField(default=list)),
+                ('rows', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('queued', 'Sırada'), ('running', 'İşleniyor'), ('done', 'Tamamlandı'), ('failed', 'Hata')], default='queued', max_length=20)),
+                ('rows_total', models.PositiveIntegerField(default=0)),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('summary', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='assessment.course')),
+            ],
+            options={
+                'verbose_name': 'Not içe aktarma işi',
+                'verbose_name_plural': 'Not içe aktarma işleri',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='assessment__status_8ff8ba_idx')],
+            },
+        ),
+    ]
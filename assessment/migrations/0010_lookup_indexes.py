@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_student_numbers(apps, schema_editor):
+    Student = apps.get_model("assessment", "Student")
+    duplicates = list(
+        Student.objects.exclude(student_number="")
+        .values("student_number")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values_list("student_number", flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Aynı öğrenci numarasına sahip kayıtlar birleştirilmeden tekil kısıt eklenemez: " + ", ".join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0009_grade_import_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='code',
+            field=models.CharField(db_index=True, max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='programoutcome',
+            name='code',
+            field=models.CharField(db_index=True, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='student_number',
+            field=models.CharField(blank=True, db_index=True, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'year'], name='enrollment_course_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentassessment',
+            index=models.Index(fields=['assessment_component', 'enrollment', 'score'], name='sa_component_covering_idx'),
+        ),
+        migrations.RunPython(check_duplicate_student_numbers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='student',
+            constraint=models.UniqueConstraint(condition=models.Q(('student_number', ''), _negated=True), fields=('student_number',), name='unique_student_number'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+from assessment.search import normalize_search_text
+
+
+def fill_search_names(apps, schema_editor):
+    for model_name, source_field in (("Course", "name"), ("Student", "full_name")):
+        model = apps.get_model("assessment", model_name)
+        rows = list(model.objects.only("id", source_field))
+        for row in rows:
+            row.search_name = normalize_search_text(getattr(row, source_field))[:255]
+        model.objects.bulk_update(rows, ["search_name"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0010_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0012_import_job_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentassessment',
+            name='assessment_component',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='student_assessments', to='assessment.assessmentcomponent'),
+        ),
+    ]
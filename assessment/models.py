@@ -1,9 +1,13 @@
 from django.db import models
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
 from django.core.validators import MaxValueValidator, MinValueValidator
 
+from .search import normalize_search_text, prefix_q
+
 
 class ProgramOutcome(models.Model):
-    code = models.CharField(max_length=10)
+    code = models.CharField(max_length=10, db_index=True)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
 
@@ -14,10 +18,23 @@ class ProgramOutcome(models.Model):
         return f"{self.code} - {self.title}"
 
 
+class CourseQuerySet(models.QuerySet):
+    def search(self, query):
+        """Kodu veya normalize adı `query` ile başlayan dersler; iki koşul da dizinli aralık sorgusudur."""
+        key = normalize_search_text(query)
+        if not key:
+            return self.none()
+        return self.filter(prefix_q("code", query.strip().upper()) | prefix_q("search_name", key)).order_by("code", "id")
+
+
 class Course(models.Model):
-    code = models.CharField(max_length=15)
+    code = models.CharField(max_length=15, db_index=True)
     name = models.CharField(max_length=255)
     term = models.CharField(max_length=50, blank=True)
+    # Otomatik tamamlama için adın normalize biçimi (bkz. search.normalize_search_text); save() doldurur.
+    search_name = models.CharField(max_length=255, db_index=True, editable=False, default="")
+
+    objects = CourseQuerySet.as_manager()
 
     class Meta:
         ordering = ["code"]
@@ -25,6 +42,18 @@ class Course(models.Model):
     def __str__(self):
         return f"{self.code} {self.name}"
 
+    @property
+    def search_label(self):
+        """Otomatik tamamlama sonuçlarında ve seçili alanda gösterilen metin."""
+        return f"{self.code} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_search_text(self.name)[:255]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_name"}
+        super().save(*args, **kwargs)
+
 
 class LearningOutcome(models.Model):
     course = models.ForeignKey(Course, related_name="learning_outcomes", on_delete=models.CASCADE)
@@ -56,16 +85,65 @@ class LearningOutcomeProgramOutcome(models.Model):
         return f"{self.learning_outcome} -> {self.program_outcome} ({self.weight})"
 
 
+class StudentQuerySet(models.QuerySet):
+    def search(self, query):
+        """Numarası veya normalize adı `query` ile başlayan öğrenciler; iki koşul da dizinli aralık sorgusudur."""
+        key = normalize_search_text(query)
+        if not key:
+            return self.none()
+        return self.filter(prefix_q("student_number", query.strip()) | prefix_q("search_name", key)).order_by(
+            "search_name", "id"
+        )
+
+
 class Student(models.Model):
     full_name = models.CharField(max_length=255)
-    student_number = models.CharField(max_length=20, blank=True)
+    student_number = models.CharField(max_length=20, blank=True, db_index=True)
+    # Otomatik tamamlama için adın normalize biçimi (bkz. search.normalize_search_text); save() doldurur.
+    search_name = models.CharField(max_length=255, db_index=True, editable=False, default="")
+
+    objects = StudentQuerySet.as_manager()
 
     class Meta:
         ordering = ["full_name"]
+        constraints = [
+            # Numarası boş öğrenciler birden fazla olabilir; dolu numara tekildir. Kısmi dizin
+            # parametreli `student_number = ?` aramalarında kullanılamadığı için alanın ayrıca dizini var.
+            models.UniqueConstraint(
+                fields=["student_number"], condition=~Q(student_number=""), name="unique_student_number"
+            ),
+        ]
 
     def __str__(self):
         return self.full_name
 
+    @property
+    def search_label(self):
+        """Otomatik tamamlama sonuçlarında ve seçili alanda gösterilen metin."""
+        return f"{self.full_name} ({self.student_number})" if self.student_number else self.full_name
+
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_search_text(self.full_name)[:255]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "full_name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_name"}
+        super().save(*args, **kwargs)
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    def with_final_score(self):
+        """Σ not x ağırlık / 100 toplamını tek sorguda `final_total` olarak ekler."""
+        weighted = (
+            StudentAssessment.objects.filter(enrollment=OuterRef("pk"))
+            .order_by()
+            .values("enrollment")
+            .annotate(
+                total=Sum(F("score") * (Cast("assessment_component__weight_percent", FloatField()) / Value(100.0)))
+            )
+            .values("total")
+        )
+        return self.annotate(final_total=Coalesce(Subquery(weighted, output_field=FloatField()), Value(0.0)))
+
 
 class Enrollment(models.Model):
     student = models.ForeignKey(Student, related_name="enrollments", on_delete=models.CASCADE)
@@ -82,12 +160,29 @@ class Enrollment(models.Model):
     )
     result = models.CharField(max_length=20, choices=RESULT_CHOICES, default="in_progress")
 
+    objects = EnrollmentQuerySet.as_manager()
+
     class Meta:
         unique_together = ("student", "course", "year", "section")
+        # (student, course) aramalarını unique_together dizininin öneki karşılar.
+        indexes = [models.Index(fields=["course", "year"], name="enrollment_course_year_idx")]
 
     def __str__(self):
         return f"{self.student} - {self.course}"
 
+    @property
+    def final_score(self):
+        """with_final_score() toplamını views.final_score ile aynı kuralla yuvarlar.
+
+        Kayıt açıklamasız yüklendiyse toplam aynı alt sorguyla ayrıca okunur; listelerde with_final_score() kullanın.
+        """
+        total = getattr(self, "final_total", None)
+        if total is None:
+            total = (
+                Enrollment.objects.filter(pk=self.pk).with_final_score().values_list("final_total", flat=True).first()
+            )
+        return round(total, 1) if total else 0
+
 
 class AssessmentComponent(models.Model):
     course = models.ForeignKey(Course, related_name="assessments", on_delete=models.CASCADE)
@@ -125,13 +220,88 @@ class LearningOutcomeContribution(models.Model):
 
 class StudentAssessment(models.Model):
     enrollment = models.ForeignKey(Enrollment, related_name="assessments", on_delete=models.CASCADE)
+    # Tek sütunlu FK dizini yerine aynı sütunla başlayan sa_component_covering_idx kullanılır.
     assessment_component = models.ForeignKey(
-        AssessmentComponent, related_name="student_assessments", on_delete=models.CASCADE
+        AssessmentComponent, related_name="student_assessments", on_delete=models.CASCADE, db_index=False
     )
     score = models.FloatField(validators=[MinValueValidator(0), MaxValueValidator(100)], default=0)
 
     class Meta:
         unique_together = ("enrollment", "assessment_component")
+        # Bileşen bazlı not taramaları (istatistik, not matrisi) ve bileşene göre FK aramaları bu dizinden okunur.
+        indexes = [
+            models.Index(fields=["assessment_component", "enrollment", "score"], name="sa_component_covering_idx")
+        ]
 
     def __str__(self):
         return f"{self.enrollment} - {self.assessment_component}: {self.score}"
+
+
+class LearningOutcomeAttainment(models.Model):
+    enrollment = models.ForeignKey(Enrollment, related_name="lo_attainments", on_delete=models.CASCADE)
+    learning_outcome = models.ForeignKey(LearningOutcome, related_name="attainments", on_delete=models.CASCADE)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("enrollment", "learning_outcome")
+        verbose_name = "ÖÇ başarımı"
+        verbose_name_plural = "ÖÇ başarımları"
+
+    def __str__(self):
+        return f"{self.enrollment} - {self.learning_outcome}: {self.score:.1f}"
+
+
+class ProgramOutcomeAttainment(models.Model):
+    enrollment = models.ForeignKey(Enrollment, related_name="po_attainments", on_delete=models.CASCADE)
+    program_outcome = models.ForeignKey(ProgramOutcome, related_name="attainments", on_delete=models.CASCADE)
+    weighted_total = models.FloatField(default=0)
+    weight_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("enrollment", "program_outcome")
+        verbose_name = "PÇ başarımı"
+        verbose_name_plural = "PÇ başarımları"
+
+    @property
+    def score(self):
+        return self.weighted_total / self.weight_total if self.weight_total else 0
+
+    def __str__(self):
+        return f"{self.enrollment} - {self.program_outcome.code}: {self.score:.1f}"
+
+
+class GradeImportJob(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Sırada"),
+        (RUNNING, "İşleniyor"),
+        (DONE, "Tamamlandı"),
+        (FAILED, "Hata"),
+    )
+    course = models.ForeignKey(Course, related_name="import_jobs", on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255, blank=True)
+    headers = models.JSONField(default=list)
+    rows = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    summary = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # İşçi iş sürerken bu alanı yeniler; kira süresini aşan RUNNING işler yeniden kuyruğa alınır (bkz. jobs).
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "id"])]
+        verbose_name = "Not içe aktarma işi"
+        verbose_name_plural = "Not içe aktarma işleri"
+
+    def __str__(self):
+        return f"#{self.pk} {self.course.code} {self.filename} ({self.get_status_display()})"
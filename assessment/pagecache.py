@@ -0,0 +1,26 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+FRAGMENT_TIMEOUT = getattr(settings, "ASSESSMENT_FRAGMENT_CACHE_TIMEOUT", 24 * 60 * 60)
+
+
+def fragment_key(name, *parts):
+    """Parça anahtarı; sürüm damgaları ve filtreler `parts` içinde verilir."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f"assessment:fragment:{name}:{digest}"
+
+
+def cached_fragment(key, template_name, build_context):
+    """İşlenmiş şablon parçasını önbellekten döner; yoksa build_context() ile bir kez hesaplayıp işler.
+
+    Parçalar isteğe (oturum, mesajlar, CSRF) bağlı olmamalı; bu yüzden istek olmadan işlenir.
+    """
+    html = cache.get(key)
+    if html is None:
+        html = str(render_to_string(template_name, build_context()))
+        cache.set(key, html, FRAGMENT_TIMEOUT)
+    return mark_safe(html)
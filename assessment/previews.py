@@ -0,0 +1,152 @@
+import math
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .importing import STUDENT_NUMBER_HEADERS, component_columns, find_header_index, normalize_header
+
+PREVIEW_TTL = getattr(settings, "ASSESSMENT_PREVIEW_TTL", 60 * 60)
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+
+
+def _key(session_id):
+    return f"assessment:preview:{session_id}"
+
+
+def _parse_score(value):
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def inspect_table(headers, rows):
+    """Sütun istatistiklerini ve doğrulama hatalarını tek geçişte çıkarır.
+
+    Hata satırları GradeImport hatalarında olduğu gibi 1'den başlar; 0 tablonun bütününü gösterir.
+    """
+    columns = component_columns(headers)
+    header_map = {normalize_header(header): idx for idx, header in enumerate(headers)}
+    student_no_idx = find_header_index(header_map, STUDENT_NUMBER_HEADERS)
+    errors = []
+    if student_no_idx is None:
+        errors.append({"row": 0, "column": "", "value": "", "message": "Öğrenci No sütunu bulunamadı."})
+
+    values = {col_index: [] for col_index in columns}
+    blanks = dict.fromkeys(columns, 0)
+    first_seen = {}
+    for row_number, row in enumerate(rows, start=1):
+        if student_no_idx is not None:
+            student_number = (row[student_no_idx] or "").strip()
+            if not student_number:
+                if any((cell or "").strip() for cell in row):
+                    errors.append(
+                        {"row": row_number, "column": headers[student_no_idx], "value": "", "message": "Öğrenci No boş; satır atlanacak."}
+                    )
+                continue
+            if student_number in first_seen:
+                errors.append(
+                    {
+                        "row": row_number,
+                        "column": headers[student_no_idx],
+                        "value": student_number,
+                        "message": f"Öğrenci No {first_seen[student_number]}. satırda da var; son satır geçerli olur.",
+                    }
+                )
+            else:
+                first_seen[student_number] = row_number
+        for col_index in columns:
+            raw = (row[col_index] or "").strip()
+            if not raw:
+                blanks[col_index] += 1
+                continue
+            score = _parse_score(raw)
+            if score is None:
+                errors.append(
+                    {"row": row_number, "column": headers[col_index], "value": raw, "message": "Sayısal olmayan not atlanacak."}
+                )
+                continue
+            if not 0 <= score <= 100:
+                errors.append(
+                    {"row": row_number, "column": headers[col_index], "value": raw, "message": "Not 0-100 aralığı dışında."}
+                )
+            values[col_index].append(score)
+
+    stats = []
+    for col_index, info in sorted(columns.items()):
+        scores = values[col_index]
+        stats.append(
+            {
+                "column": col_index,
+                "name": info["name"],
+                "weight": info["weight"],
+                "count": len(scores),
+                "blank": blanks[col_index],
+                "mean": round(math.fsum(scores) / len(scores), 2) if scores else None,
+                "min": min(scores) if scores else None,
+                "max": max(scores) if scores else None,
+            }
+        )
+    return stats, errors
+
+
+def create_preview(headers, rows, filename=""):
+    """Ayrıştırılmış tabloyu TTL'li önbellek girdisine koyar ve oturum kimliğini döner.
+
+    Önbellek süreçler arasında paylaşılmıyorsa (LocMem) önizleme ve kayıt aynı süreçte çalışmalıdır.
+    """
+    stats, errors = inspect_table(headers, rows)
+    preview = {
+        "id": uuid.uuid4().hex,
+        "filename": filename,
+        "headers": headers,
+        "rows": rows,
+        "numeric_columns": [item["column"] for item in stats],
+        "stats": stats,
+        "errors": errors,
+    }
+    cache.set(_key(preview["id"]), preview, PREVIEW_TTL)
+    return preview
+
+
+def get_preview(session_id):
+    if not session_id:
+        return None
+    return cache.get(_key(session_id))
+
+
+def preview_exists(session_id):
+    return cache.has_key(_key(session_id))
+
+
+def discard_preview(session_id):
+    cache.delete(_key(session_id))
+
+
+def preview_summary(preview):
+    """Sayfalardan bağımsız özet: başlıklar, satır sayısı, istatistikler ve ilk hatalar."""
+    return {
+        "session": preview["id"],
+        "filename": preview["filename"],
+        "headers": preview["headers"],
+        "numeric_columns": preview["numeric_columns"],
+        "row_count": len(preview["rows"]),
+        "stats": preview["stats"],
+        "errors": preview["errors"][:MAX_REPORTED_ERRORS],
+        "error_count": len(preview["errors"]),
+    }
+
+
+def preview_page(preview, offset=0, limit=PAGE_SIZE):
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return {
+        "session": preview["id"],
+        "offset": offset,
+        "limit": limit,
+        "row_count": len(preview["rows"]),
+        "rows": preview["rows"][offset : offset + limit],
+    }
@@ -0,0 +1,44 @@
+from collections import defaultdict
+
+from .models import StudentAssessment
+from .structure import get_course_structures
+
+
+def load_contribution_matrix(course_ids):
+    """Bileşen x ÖÇ katkı matrisi; ders yapısı önbelleğinden gelir."""
+    structures = get_course_structures(course_ids)
+    return {course_id: structure.contribution_matrix for course_id, structure in structures.items()}
+
+
+def load_score_matrix(**filters):
+    """Öğrenci x bileşen not matrisini tek sorguda yükler: {enrollment_id: {component_id: not}}."""
+    matrix = defaultdict(dict)
+    rows = StudentAssessment.objects.filter(**filters).values_list("enrollment_id", "assessment_component_id", "score")
+    for enrollment_id, component_id, score in rows:
+        matrix[enrollment_id][component_id] = score
+    return matrix
+
+
+def compute_lo_scores(contributions, student_scores):
+    """Tek öğrencinin ÖÇ puanları; notu olmayan bileşenler atlanır."""
+    scores = {}
+    for component_id, lo_id, comp_weight, lo_weight in contributions:
+        student_score = student_scores.get(component_id)
+        if student_score is None:
+            continue
+        scores[lo_id] = scores.get(lo_id, 0) + student_score * comp_weight * lo_weight
+    return scores
+
+
+def lo_scores_for_enrollments(enrollments):
+    """Verilen kayıtların ÖÇ puanları, ders sayısından bağımsız olarak iki sorguda."""
+    enrollments = list(enrollments)
+    if not enrollments:
+        return {}
+    contributions = load_contribution_matrix({e.course_id for e in enrollments})
+    score_matrix = load_score_matrix(enrollment_id__in=[e.id for e in enrollments])
+    return {
+        e.id: compute_lo_scores(contributions.get(e.course_id, ()), score_matrix.get(e.id, {}))
+        for e in enrollments
+    }
+
@@ -0,0 +1,24 @@
+import unicodedata
+
+from django.db.models import Q
+
+# str.lower() "İ" harfini "i" + birleşik nokta yapar; Türkçe kuralıyla doğrudan küçültülür.
+_TURKISH_LOWER = str.maketrans({"İ": "i", "I": "ı"})
+
+
+def normalize_search_text(value):
+    """Arama anahtarı: Türkçe kurallarıyla küçültülmüş, aksanları atılmış, tek boşluklu metin.
+
+    Noktalı ve noktasız i aynı anahtara iner; "IŞIK", "ışık" ve "isik" birbirini bulur.
+    """
+    text = unicodedata.normalize("NFKD", (value or "").translate(_TURKISH_LOWER).lower())
+    text = "".join(char for char in text if not unicodedata.combining(char)).replace("ı", "i")
+    return " ".join(text.split())
+
+
+def prefix_q(field, prefix):
+    """`field` değeri `prefix` ile başlayan kayıtlar için aralık koşulu.
+
+    SQLite'ta LIKE büyük/küçük harf duyarsız çalıştığından alanın dizinini kullanamaz; >= / < aralığı kullanır.
+    """
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix[:-1] + chr(ord(prefix[-1]) + 1)})
@@ -0,0 +1,165 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .attainment import schedule_refresh
+from .models import (
+    AssessmentComponent,
+    Course,
+    Enrollment,
+    LearningOutcome,
+    LearningOutcomeContribution,
+    LearningOutcomeProgramOutcome,
+    ProgramOutcome,
+    Student,
+    StudentAssessment,
+)
+from .versioning import (
+    CURRICULUM,
+    PROGRAM_OUTCOMES,
+    STUDENTS,
+    course_roster_scope,
+    course_scope,
+    course_scores_scope,
+    invalidate,
+    student_scope,
+)
+
+
+def _loaded(instance, relation):
+    """Örnekte zaten yüklenmiş ilişkili nesne; yüklü değilse None (sorgu atılmaz)."""
+    return getattr(instance, relation) if getattr(type(instance), relation).is_cached(instance) else None
+
+
+def _component_course_id(instance):
+    component = _loaded(instance, "assessment_component")
+    if component is not None:
+        return component.course_id
+    return (
+        AssessmentComponent.objects.filter(id=instance.assessment_component_id).values_list("course_id", flat=True).first()
+    )
+
+
+def _learning_outcome_course_id(instance):
+    learning_outcome = _loaded(instance, "learning_outcome")
+    if learning_outcome is not None:
+        return learning_outcome.course_id
+    return LearningOutcome.objects.filter(id=instance.learning_outcome_id).values_list("course_id", flat=True).first()
+
+
+def _cascaded(sender, origin):
+    """Silme, başka bir modelin (ör. bileşen veya kayıt) silinmesinden zincirleme mi geliyor."""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return not issubclass(model, sender)
+
+
+def _enrollment_course_and_student(instance):
+    """Notun kaydına ait (ders, öğrenci) kimlikleri; kayıt yüklü değilse tek sorguda okunur."""
+    enrollment = _loaded(instance, "enrollment")
+    if enrollment is not None:
+        return enrollment.course_id, enrollment.student_id
+    row = Enrollment.objects.filter(id=instance.enrollment_id).values_list("course_id", "student_id").first()
+    return row or (None, None)
+
+
+# Başarım yenilemesi sürüm artışlarından önce planlanır: işlem sonunda tablolar güncellendikten sonra
+# sürümler artar, böylece yeni ETag'ler hiçbir zaman eski başarımlarla eşleşmez.
+
+
+@receiver(post_save, sender=StudentAssessment)
+@receiver(post_delete, sender=StudentAssessment)
+def student_assessment_changed(sender, instance, origin=None, **kwargs):
+    if _cascaded(sender, origin):
+        # Bileşen veya kayıt silinirken notlar satır satır gelir; o silmenin sinyali dersi bir kez işler.
+        return
+    schedule_refresh(enrollment_ids=[instance.enrollment_id])
+    # Kaydın dersi notun bileşeninin dersiyle aynıdır; ikisi de kayıttan okunur.
+    course_id, student_id = _enrollment_course_and_student(instance)
+    if course_id is not None:
+        invalidate(course_scores_scope(course_id))
+    if student_id is not None:
+        invalidate(student_scope(student_id))
+
+
+@receiver(post_save, sender=AssessmentComponent)
+def assessment_component_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "weight_percent" in update_fields:
+        schedule_refresh(course_ids=[instance.course_id])
+    invalidate(CURRICULUM, course_scope(instance.course_id))
+
+
+@receiver(post_delete, sender=AssessmentComponent)
+def assessment_component_deleted(sender, instance, **kwargs):
+    schedule_refresh(course_ids=[instance.course_id])
+    # Bileşenin notları da silinmiştir.
+    invalidate(CURRICULUM, course_scope(instance.course_id), course_scores_scope(instance.course_id))
+
+
+@receiver(post_save, sender=LearningOutcomeContribution)
+@receiver(post_delete, sender=LearningOutcomeContribution)
+def contribution_changed(sender, instance, **kwargs):
+    course_id = _component_course_id(instance)
+    if course_id is not None:
+        schedule_refresh(course_ids=[course_id])
+        invalidate(course_scope(course_id))
+    invalidate(CURRICULUM)
+
+
+@receiver(post_save, sender=LearningOutcomeProgramOutcome)
+@receiver(post_delete, sender=LearningOutcomeProgramOutcome)
+def program_link_changed(sender, instance, **kwargs):
+    course_id = _learning_outcome_course_id(instance)
+    if course_id is not None:
+        schedule_refresh(po_course_ids=[course_id])
+        invalidate(course_scope(course_id))
+    invalidate(CURRICULUM)
+
+
+@receiver(post_save, sender=LearningOutcome)
+@receiver(post_delete, sender=LearningOutcome)
+def learning_outcome_changed(sender, instance, **kwargs):
+    invalidate(CURRICULUM, course_scope(instance.course_id))
+
+
+@receiver(post_save, sender=ProgramOutcome)
+@receiver(post_delete, sender=ProgramOutcome)
+def program_outcome_changed(sender, **kwargs):
+    invalidate(CURRICULUM, PROGRAM_OUTCOMES)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, **kwargs):
+    # Ders kodu, adı ve dönemi müfredat sayfalarında (analiz haritası) görünür.
+    invalidate(CURRICULUM)
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, **kwargs):
+    invalidate(course_roster_scope(instance.course_id), student_scope(instance.student_id))
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    # Kaydın notları da silinmiştir.
+    invalidate(
+        course_roster_scope(instance.course_id),
+        course_scores_scope(instance.course_id),
+        student_scope(instance.student_id),
+    )
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created=False, **kwargs):
+    invalidate(STUDENTS, student_scope(instance.id))
+    if created:
+        return
+    course_ids = Enrollment.objects.filter(student=instance).values_list("course_id", flat=True).distinct()
+    invalidate(*(course_roster_scope(course_id) for course_id in course_ids))
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    invalidate(STUDENTS, student_scope(instance.id))
@@ -0,0 +1,94 @@
+import math
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from .models import StudentAssessment
+from .versioning import course_scores_scope, get_versions
+
+STATS_TIMEOUT = 60 * 60
+
+
+class ComponentStats(NamedTuple):
+    count: int
+    mean: float
+    minimum: float
+    maximum: float
+    stdev: float
+    p25: float
+    median: float
+    p75: float
+
+
+def _percentile(values, fraction):
+    """Sıralı listede doğrusal aradeğerlemeli yüzdelik."""
+    position = (len(values) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return values[lower]
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _summarize(values):
+    count = len(values)
+    mean = math.fsum(values) / count
+    variance = math.fsum((value - mean) ** 2 for value in values) / count
+    return ComponentStats(
+        count=count,
+        mean=mean,
+        minimum=values[0],
+        maximum=values[-1],
+        stdev=math.sqrt(variance),
+        p25=_percentile(values, 0.25),
+        median=_percentile(values, 0.5),
+        p75=_percentile(values, 0.75),
+    )
+
+
+def _compute(course_ids):
+    # Yüzdelikler sıralı değer gerektirdiğinden tüm istatistikler tek sıralı taramadan çıkarılır.
+    rows = (
+        StudentAssessment.objects.filter(assessment_component__course_id__in=course_ids)
+        .order_by("assessment_component_id", "score")
+        .values_list("assessment_component__course_id", "assessment_component_id", "score")
+    )
+    grouped = {course_id: {} for course_id in course_ids}
+    for course_id, component_id, score in rows:
+        grouped[course_id].setdefault(component_id, []).append(score)
+    return {
+        course_id: {component_id: _summarize(values) for component_id, values in components.items()}
+        for course_id, components in grouped.items()
+    }
+
+
+def component_stats_for_courses(course_ids):
+    """Birden çok dersin bileşen istatistikleri: {course_id: {component_id: ComponentStats}}.
+
+    Önbellekte olmayan dersler tek sorguda birlikte hesaplanır.
+    """
+    course_ids = list(course_ids)
+    versions = get_versions(*(course_scores_scope(course_id) for course_id in course_ids))
+    keys = {course_id: f"assessment:stats:{course_id}:{version}" for course_id, version in zip(course_ids, versions)}
+    cached = cache.get_many(keys.values())
+    stats = {course_id: cached[key] for course_id, key in keys.items() if key in cached}
+    missing = [course_id for course_id in keys if course_id not in stats]
+    if missing:
+        computed = _compute(missing)
+        cache.set_many({keys[course_id]: computed[course_id] for course_id in missing}, STATS_TIMEOUT)
+        stats.update(computed)
+    return stats
+
+
+def course_component_stats(course):
+    """Dersin bileşen istatistikleri: {component_id: ComponentStats}; not sürümü değişene kadar önbellekte."""
+    course_id = getattr(course, "id", course)
+    return component_stats_for_courses([course_id])[course_id]
+
+
+def course_mean(stats):
+    """Bileşen istatistiklerinden dersin tüm notlar üzerinden ortalaması."""
+    count = sum(item.count for item in stats.values())
+    if not count:
+        return None
+    return math.fsum(item.mean * item.count for item in stats.values()) / count
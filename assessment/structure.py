@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .models import (
+    AssessmentComponent,
+    LearningOutcome,
+    LearningOutcomeContribution,
+    LearningOutcomeProgramOutcome,
+)
+from .versioning import PROGRAM_OUTCOMES, course_scope, get_versions
+
+STRUCTURE_CACHE_SIZE = getattr(settings, "ASSESSMENT_STRUCTURE_CACHE_SIZE", 256)
+
+
+class ComponentInfo(NamedTuple):
+    id: int
+    name: str
+    weight_percent: int
+
+
+class OutcomeInfo(NamedTuple):
+    id: int
+    code: str
+    description: str
+
+
+class ProgramOutcomeInfo(NamedTuple):
+    id: int
+    code: str
+    title: str
+
+
+class ContributionInfo(NamedTuple):
+    id: int
+    assessment_component: ComponentInfo
+    learning_outcome: OutcomeInfo
+    contribution_percent: int
+
+
+class ProgramLinkInfo(NamedTuple):
+    id: int
+    learning_outcome: OutcomeInfo
+    program_outcome: ProgramOutcomeInfo
+    weight: int
+
+
+class CourseStructure(NamedTuple):
+    """Bir dersin bileşen, ÖÇ, katkı ve ÖÇ–PÇ yapısı; sürüm başına bir kez kurulur."""
+
+    course_id: int
+    components: tuple
+    learning_outcomes: tuple
+    contributions: tuple
+    program_links: tuple
+    contribution_matrix: tuple
+
+    @property
+    def max_weight(self):
+        return max((comp.weight_percent for comp in self.components), default=0)
+
+
+# (ders, ders sürümü, PÇ sürümü) -> CourseStructure; en eski kullanılan yapı önce atılır.
+_structures = OrderedDict()
+_structures_lock = threading.Lock()
+
+
+def _build_structures(course_ids):
+    """Derslerin yapılarını ders sayısından bağımsız olarak dört sorguda kurar."""
+    components = {course_id: {} for course_id in course_ids}
+    component_course = {}
+    for comp in AssessmentComponent.objects.filter(course_id__in=course_ids).order_by("id"):
+        components[comp.course_id][comp.id] = ComponentInfo(comp.id, comp.name, comp.weight_percent)
+        component_course[comp.id] = comp.course_id
+    outcomes = {course_id: {} for course_id in course_ids}
+    outcome_course = {}
+    for lo in LearningOutcome.objects.filter(course_id__in=course_ids).order_by("code"):
+        outcomes[lo.course_id][lo.id] = OutcomeInfo(lo.id, lo.code, lo.description)
+        outcome_course[lo.id] = lo.course_id
+    contributions = {course_id: [] for course_id in course_ids}
+    contribution_rows = LearningOutcomeContribution.objects.filter(assessment_component__course_id__in=course_ids)
+    for contrib in contribution_rows.order_by("id"):
+        course_id = component_course[contrib.assessment_component_id]
+        contributions[course_id].append(
+            ContributionInfo(
+                contrib.id,
+                components[course_id][contrib.assessment_component_id],
+                outcomes[course_id][contrib.learning_outcome_id],
+                contrib.contribution_percent,
+            )
+        )
+    program_links = {course_id: [] for course_id in course_ids}
+    for link in (
+        LearningOutcomeProgramOutcome.objects.filter(learning_outcome__course_id__in=course_ids)
+        .select_related("program_outcome")
+        .order_by("id")
+    ):
+        course_id = outcome_course[link.learning_outcome_id]
+        program_links[course_id].append(
+            ProgramLinkInfo(
+                link.id,
+                outcomes[course_id][link.learning_outcome_id],
+                ProgramOutcomeInfo(link.program_outcome.id, link.program_outcome.code, link.program_outcome.title),
+                link.weight,
+            )
+        )
+    return {
+        course_id: CourseStructure(
+            course_id=course_id,
+            components=tuple(components[course_id].values()),
+            learning_outcomes=tuple(outcomes[course_id].values()),
+            contributions=tuple(contributions[course_id]),
+            program_links=tuple(program_links[course_id]),
+            contribution_matrix=tuple(
+                (
+                    c.assessment_component.id,
+                    c.learning_outcome.id,
+                    c.assessment_component.weight_percent / 100,
+                    c.contribution_percent / 100,
+                )
+                for c in contributions[course_id]
+            ),
+        )
+        for course_id in course_ids
+    }
+
+
+def get_course_structures(courses):
+    """Derslerin derlenmiş yapıları: {course_id: CourseStructure}.
+
+    Ders veya PÇ sürümü değişene kadar bellekten gelir; eksik olanlar birlikte kurulur.
+    """
+    course_ids = list(dict.fromkeys(getattr(course, "id", course) for course in courses))
+    po_version, *course_versions = get_versions(
+        PROGRAM_OUTCOMES, *(course_scope(course_id) for course_id in course_ids)
+    )
+    keys = {course_id: (course_id, version, po_version) for course_id, version in zip(course_ids, course_versions)}
+    found = {}
+    with _structures_lock:
+        for course_id, key in keys.items():
+            if key in _structures:
+                _structures.move_to_end(key)
+                found[course_id] = _structures[key]
+    missing = [course_id for course_id in course_ids if course_id not in found]
+    if missing:
+        built = _build_structures(missing)
+        with _structures_lock:
+            for course_id in missing:
+                _structures[keys[course_id]] = built[course_id]
+            while len(_structures) > STRUCTURE_CACHE_SIZE:
+                _structures.popitem(last=False)
+        found.update(built)
+    return found
+
+
+def get_course_structure(course):
+    """Dersin derlenmiş yapısı; ders veya PÇ sürümü değişene kadar bellekten gelir."""
+    course_id = getattr(course, "id", course)
+    return get_course_structures([course_id])[course_id]
+
+
+def clear_structure_cache():
+    """Süreç içi yapı önbelleğini boşaltır; sürüm damgaları başka bir önbelleğe taşındığında kullanılır."""
+    with _structures_lock:
+        _structures.clear()
@@ -1,3 +1,936 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import attainment, urls, versioning, views, xlsx
+from .attainment import lo_scores_from_attainment, po_performance_from_attainment
+from .curriculum import course_po_weights
+from .importing import GradeImport, GradeImportError, ImportSummary, decode_grade_table
+from .jobs import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, claim_next_job, enqueue_import, run_job
+from .middleware import QueryBudgetExceeded
+from .models import (
+    AssessmentComponent,
+    Course,
+    Enrollment,
+    GradeImportJob,
+    LearningOutcome,
+    LearningOutcomeContribution,
+    LearningOutcomeProgramOutcome,
+    ProgramOutcome,
+    Student,
+    StudentAssessment,
+)
+from .previews import MAX_PAGE_SIZE, PAGE_SIZE, create_preview, discard_preview, inspect_table
+from .scoring import lo_scores_for_enrollments
+from .search import normalize_search_text
+from .versioning import course_scores_scope, get_version, student_scope
+from .xlsx import iter_xlsx_rows, read_xlsx_rows, stream_xlsx
+from .views import calculate_po_performance, final_score
+
+
+class DashboardQueryCountTests(TestCase):
+    """Panel sorgu sayısı ders ve ÖÇ sayısıyla büyümemeli."""
+
+    def _dashboard_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("assessment:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def _add_courses(self, student, count, outcomes_per_course=4):
+        program_outcomes = list(ProgramOutcome.objects.all())
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                course = Course.objects.create(code=f"TST{index:03d}", name=f"Test dersi {index}", term="Güz")
+                components = [
+                    AssessmentComponent.objects.create(course=course, name="Vize", weight_percent=40),
+                    AssessmentComponent.objects.create(course=course, name="Final", weight_percent=60),
+                ]
+                for lo_index in range(outcomes_per_course):
+                    lo = LearningOutcome.objects.create(course=course, code=f"LO{lo_index + 1}", description="Test")
+                    for po in program_outcomes[:2]:
+                        LearningOutcomeProgramOutcome.objects.create(learning_outcome=lo, program_outcome=po, weight=3)
+                    for comp in components:
+                        LearningOutcomeContribution.objects.create(
+                            assessment_component=comp, learning_outcome=lo, contribution_percent=25
+                        )
+                enrollment = Enrollment.objects.create(student=student, course=course, year=2023)
+                for comp in components:
+                    StudentAssessment.objects.create(enrollment=enrollment, assessment_component=comp, score=70)
+
+    def test_dashboard_query_count_is_constant(self):
+        student = Student.objects.first()
+        self.assertIsNotNone(student)
+        baseline, _ = self._dashboard_queries()
+
+        self._add_courses(student, 8)
+        queries, response = self._dashboard_queries()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.context["enrollments"]), student.enrollments.count())
+        self.assertContains(response, "TST007")
+
+
+class QueryBudgetTests(TestCase):
+    """Her adlandırılmış adres katı kipte, soğuk önbellekle sorgu bütçesini aşmadan yanıt vermeli."""
+
+    def setUp(self):
+        self.course = Course.objects.first()
+        self.student = Student.objects.first()
+        job = enqueue_import(self.course, ["Öğrenci No"], [], filename="bos.xlsx")
+        preview = create_preview(["Öğrenci No", "Vize(%40)"], [["1001", "50"]])
+        self.addCleanup(discard_preview, preview["id"])
+        self.url_kwargs = {"session_id": preview["id"], "job_id": job.id}
+
+    def test_every_named_url_stays_within_budget(self):
+        self.assertTrue(settings.ASSESSMENT_QUERY_BUDGET_STRICT)
+        budgets = settings.ASSESSMENT_QUERY_BUDGETS
+        query = {"course": self.course.id, "student": self.student.id, "q": "a"}
+        for pattern in urls.urlpatterns:
+            view_name = f"{urls.app_name}:{pattern.name}"
+            with self.subTest(view_name):
+                kwargs = {name: self.url_kwargs[name] for name in pattern.pattern.converters}
+                cache.clear()
+                # Bütçe aşımı QueryBudgetExceeded olarak istemciye yükselir.
+                response = self.client.get(reverse(view_name, kwargs=kwargs), query)
+                self.assertLess(response.status_code, 500)
+                if response.status_code != 405:
+                    self.assertIn(view_name, budgets, "GET ile açılan her görünümün bir bütçesi olmalı.")
+
+    def test_writes_are_not_budgeted(self):
+        url = reverse("assessment:course_planner") + f"?student={self.student.id}"
+        course = Course.objects.create(code="TST400", name="Bütçe", term="Güz")
+        with override_settings(ASSESSMENT_QUERY_BUDGETS={"assessment:course_planner": 0}):
+            response = self.client.post(url, {"action": "add", "course": course.id})
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(Enrollment.objects.filter(student=self.student, course=course).exists())
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(url)
+
+
+class AttainmentRefreshTests(TestCase):
+    """Başarım tabloları not, bileşen ağırlığı ve ÖÇ–PÇ değişikliklerinden sonra hesaplanan değerlerle aynı kalmalı."""
+
+    def setUp(self):
+        self.score = StudentAssessment.objects.select_related("enrollment", "assessment_component").first()
+        self.enrollment = self.score.enrollment
+
+    def _stored(self, enrollment):
+        return lo_scores_from_attainment([enrollment])[enrollment.id], po_performance_from_attainment([enrollment])
+
+    def assertAttainmentCurrent(self, enrollment):
+        expected = lo_scores_for_enrollments([enrollment])[enrollment.id]
+        lo_scores, po_performance = self._stored(enrollment)
+        self.assertEqual(lo_scores.keys(), expected.keys())
+        for lo_id, score in expected.items():
+            self.assertAlmostEqual(lo_scores[lo_id], score)
+        self.assertEqual(po_performance, calculate_po_performance(expected))
+
+    def test_score_change_refreshes_enrollment(self):
+        before = self._stored(self.enrollment)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.score.score = 0 if self.score.score else 100
+            self.score.save()
+        self.assertNotEqual(self._stored(self.enrollment), before)
+        self.assertAttainmentCurrent(self.enrollment)
+
+    def test_weight_change_rebuilds_course(self):
+        component = self.score.assessment_component
+        with self.captureOnCommitCallbacks(execute=True):
+            component.weight_percent = 100 if component.weight_percent != 100 else 10
+            component.save(update_fields=["weight_percent"])
+        for enrollment in Enrollment.objects.filter(course_id=component.course_id):
+            self.assertAttainmentCurrent(enrollment)
+
+    def test_program_link_change_refreshes_program_outcomes(self):
+        link = LearningOutcomeProgramOutcome.objects.filter(learning_outcome__course_id=self.enrollment.course_id).first()
+        before = self._stored(self.enrollment)[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            link.weight = 1 if link.weight != 1 else 5
+            link.save()
+        self.assertNotEqual(self._stored(self.enrollment)[1], before)
+        self.assertAttainmentCurrent(self.enrollment)
+
+    def test_rolled_back_changes_do_not_leak_into_next_flush(self):
+        other = StudentAssessment.objects.exclude(enrollment=self.enrollment).first()
+        with mock.patch.object(attainment, "refresh_enrollments", wraps=attainment.refresh_enrollments) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    self.score.score = 1
+                    self.score.save()
+                    raise RuntimeError
+                other.score = 2
+                other.save()
+        refreshed = {enrollment.id for call in refresh.call_args_list for enrollment in call.args[0]}
+        self.assertEqual(refreshed, {other.enrollment_id})
+        self.assertAttainmentCurrent(other.enrollment)
+
+
+class FinalScoreAnnotationTests(TestCase):
+    """with_final_score() ile views.final_score aynı sonucu vermeli."""
+
+    def test_annotation_matches_python_final_score(self):
+        course = Course.objects.create(code="TST100", name="Test dersi", term="Güz")
+        vize = AssessmentComponent.objects.create(course=course, name="Vize", weight_percent=40)
+        final = AssessmentComponent.objects.create(course=course, name="Final", weight_percent=60)
+        students = [
+            Student.objects.create(full_name=f"Test {index}", student_number=f"9900{index}") for index in range(4)
+        ]
+        full, partial, empty, fractional = (
+            Enrollment.objects.create(student=student, course=course, year=2023) for student in students
+        )
+        StudentAssessment.objects.create(enrollment=full, assessment_component=vize, score=55)
+        StudentAssessment.objects.create(enrollment=full, assessment_component=final, score=80)
+        StudentAssessment.objects.create(enrollment=partial, assessment_component=final, score=70)
+        StudentAssessment.objects.create(enrollment=fractional, assessment_component=vize, score=72.5)
+        StudentAssessment.objects.create(enrollment=fractional, assessment_component=final, score=33.3)
+
+        annotated = {enrollment.id: enrollment.final_score for enrollment in Enrollment.objects.with_final_score()}
+        for enrollment in Enrollment.objects.all():
+            self.assertEqual(annotated[enrollment.id], final_score(enrollment), enrollment)
+        self.assertEqual(annotated[full.id], 70.0)
+        self.assertEqual(annotated[partial.id], 42.0)
+        self.assertEqual(annotated[empty.id], 0)
+
+        plain = Enrollment.objects.get(id=fractional.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(plain.final_score, annotated[fractional.id])
+        self.assertEqual(Enrollment(student=students[0], course=course).final_score, 0)
+
+
+class ScoreSignalTests(TestCase):
+    """Not kaydı sinyali, yüklü kayıt ilişkisini kullanmalı ve ders/öğrenci sürümlerini artırmalı."""
+
+    def _versions(self, enrollment):
+        return get_version(course_scores_scope(enrollment.course_id)), get_version(student_scope(enrollment.student_id))
+
+    def test_loaded_enrollment_adds_no_queries(self):
+        score = StudentAssessment.objects.select_related("enrollment").first()
+        before = self._versions(score.enrollment)
+        score.score = 1
+        with self.assertNumQueries(1):
+            score.save()
+        after = self._versions(score.enrollment)
+        self.assertNotEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+
+    def test_unloaded_enrollment_is_read_once(self):
+        score = StudentAssessment.objects.first()
+        score.score = 1
+        with self.assertNumQueries(2):
+            score.save()
+
+    def test_attainment_refresh_runs_before_commit_bumps(self):
+        score = StudentAssessment.objects.select_related("enrollment__student").first()
+        calls = []
+        refresh = attainment.refresh_enrollments
+        bump = versioning.bump_version
+        with mock.patch.object(
+            attainment, "refresh_enrollments", side_effect=lambda *args: calls.append("refresh") or refresh(*args)
+        ), mock.patch.object(versioning, "bump_version", side_effect=lambda scope: calls.append("bump") or bump(scope)):
+            with self.captureOnCommitCallbacks(execute=True):
+                # Önce yalnızca sürüm artıran bir değişiklik: işlemin artış kancası yenilemeden önce kaydedilir.
+                score.enrollment.student.save()
+                score.score = 1
+                score.save()
+                calls.append("commit")
+        self.assertIn("refresh", calls[calls.index("commit") :])
+        after_commit = calls[calls.index("commit") :]
+        self.assertNotIn("bump", after_commit[: after_commit.index("refresh")])
+
+    def _component_with_scores(self, count):
+        # Kurulumun sürüm artışları ölçümden önce onaylanır; ölçülen kanca yalnızca silmenin kapsamlarını taşır.
+        with self.captureOnCommitCallbacks(execute=True):
+            course = Course.objects.create(code=f"TSZ{count:03d}", name="Zincirleme silme", term="Güz")
+            component = AssessmentComponent.objects.create(course=course, name="Vize", weight_percent=40)
+        students = Student.objects.bulk_create(
+            Student(full_name=f"Silme {index}", student_number=f"97{count:03d}{index:04d}") for index in range(count)
+        )
+        enrollments = Enrollment.objects.bulk_create(
+            Enrollment(student=student, course=course, year=2023) for student in students
+        )
+        StudentAssessment.objects.bulk_create(
+            StudentAssessment(enrollment=enrollment, assessment_component=component, score=60) for enrollment in enrollments
+        )
+        return component
+
+    def _delete_cost(self, component):
+        with mock.patch.object(FileBasedCache, "set", autospec=True, side_effect=FileBasedCache.set) as cache_set:
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                component.delete()
+        return len(queries), cache_set.call_count
+
+    def test_cascade_delete_cost_does_not_grow_with_scores(self):
+        small = self._delete_cost(self._component_with_scores(3))
+        large = self._delete_cost(self._component_with_scores(120))
+        # SQLite silmeleri 100'lük parçalara böler; bunun dışında maliyet not sayısından bağımsızdır.
+        self.assertLessEqual(large[0], small[0] + 1)
+        self.assertLessEqual(large[1], small[1])
+        # Müfredat, ders yapısı ve ders notları kapsamları: her biri bir kez hemen, bir kez onayda.
+        self.assertLessEqual(large[1], 6)
+
+
+def _workbook(rows_xml, shared_strings=None):
+    """Yalnızca ilk sayfa ve isteğe bağlı paylaşılan dizelerden oluşan en küçük .xlsx içeriği."""
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zfile:
+        zfile.writestr("xl/worksheets/sheet1.xml", f'<worksheet xmlns="{ns}"><sheetData>{rows_xml}</sheetData></worksheet>')
+        if shared_strings is not None:
+            items = "".join(shared_strings)
+            zfile.writestr("xl/sharedStrings.xml", f'<sst xmlns="{ns}">{items}</sst>')
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+class XlsxRowTests(SimpleTestCase):
+    """iter_xlsx_rows hücreleri `r` referansına göre yerleştirmeli ve paylaşılan dizeleri çözmeli."""
+
+    def test_sparse_cells_are_placed_by_reference(self):
+        rows = list(
+            iter_xlsx_rows(
+                _workbook(
+                    '<row r="1"><c r="A1"><v>1</v></c><c r="D1"><v>4</v></c></row>'
+                    '<row r="2"><c r="C2"><v>3</v></c><c r="AB2"><v>28</v></c></row>'
+                    '<row r="3"><c><v>x</v></c><c><v>y</v></c><c r="E3"/></row>'
+                )
+            )
+        )
+        self.assertEqual(rows[0], ["1", "", "", "4"])
+        self.assertEqual(rows[1], ["", "", "3"] + [""] * 24 + ["28"])
+        self.assertEqual(rows[2], ["x", "y", "", "", ""])
+
+    def test_shared_and_inline_strings(self):
+        rows = list(
+            iter_xlsx_rows(
+                _workbook(
+                    '<row r="1"><c r="A1" t="s"><v>1</v></c><c r="B1" t="s"><v>0</v></c>'
+                    '<c r="C1" t="inlineStr"><is><t>Satır içi</t></is></c><c r="D1" t="s"><v>9</v></c></row>',
+                    shared_strings=["<si><t>Öğrenci No</t></si>", "<si><r><t>Vize</t></r><r><t>(%40)</t></r></si>"],
+                )
+            )
+        )
+        self.assertEqual(rows, [["Vize(%40)", "Öğrenci No", "Satır içi", ""]])
+
+    def test_max_rows_stops_early(self):
+        rows_xml = "".join(f'<row r="{index}"><c r="A{index}"><v>{index}</v></c></row>' for index in range(1, 6))
+        self.assertEqual(list(iter_xlsx_rows(_workbook(rows_xml), max_rows=2)), [["1"], ["2"]])
+
+
+class XlsxParseCacheTests(SimpleTestCase):
+    """cached_xlsx_rows bellek katmanını giriş sayısıyla değil toplam satırla sınırlamalı."""
+
+    def setUp(self):
+        xlsx.clear_parse_cache()
+        self.addCleanup(xlsx.clear_parse_cache)
+
+    def _source(self, start, count):
+        rows_xml = "".join(
+            f'<row r="{index}"><c r="A{index}"><v>{start + index}</v></c></row>' for index in range(1, count + 1)
+        )
+        return _workbook(rows_xml).fp.getvalue()
+
+    @mock.patch.object(xlsx, "PARSE_CACHE_ROWS", 5)
+    def test_memory_layer_is_bounded_by_total_rows(self):
+        small, medium, large = self._source(0, 2), self._source(100, 3), self._source(200, 6)
+        with mock.patch.object(xlsx, "read_xlsx_rows", wraps=xlsx.read_xlsx_rows) as read:
+            rows = xlsx.cached_xlsx_rows(small)
+            xlsx.cached_xlsx_rows(medium)
+            self.assertIs(xlsx.cached_xlsx_rows(small), rows)
+            self.assertEqual(read.call_count, 2)
+
+            # Sınırdan büyük tablo bellekte tutulmaz ve küçükleri çıkarmaz.
+            self.assertEqual(len(xlsx.cached_xlsx_rows(large)), 6)
+            xlsx.cached_xlsx_rows(large)
+            self.assertEqual(read.call_count, 4)
+            xlsx.cached_xlsx_rows(small)
+            xlsx.cached_xlsx_rows(medium)
+            self.assertEqual(read.call_count, 4)
+
+            # Yeni tablo toplamı aştırınca en eski kullanılan çıkarılır.
+            xlsx.cached_xlsx_rows(self._source(300, 1))
+            xlsx.cached_xlsx_rows(medium)
+            self.assertEqual(read.call_count, 5)
+            xlsx.cached_xlsx_rows(small)
+            self.assertEqual(read.call_count, 6)
+
+
+class GradeImportTests(TestCase):
+    """GradeImport farkı doğru hesaplamalı ve uyguladığı sayılar veritabanıyla tutmalı."""
+
+    HEADERS = ["Öğrenci No", "Adı", "Soyadı", "Vize(%30)", "Final(%60)", "Harf Notu"]
+
+    def setUp(self):
+        self.course = Course.objects.create(code="TST200", name="İçe aktarım", term="Güz")
+        self.vize = AssessmentComponent.objects.create(course=self.course, name="Vize", weight_percent=40)
+        self.student = Student.objects.create(full_name="Eski Ad", student_number="99001")
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course, year=2023)
+        StudentAssessment.objects.create(enrollment=self.enrollment, assessment_component=self.vize, score=50)
+
+    def _rows(self, existing_final="70"):
+        return [
+            ["99001", "Yeni", "Ad", "50", existing_final, "BB"],
+            ["", "Boş", "Satır", "10", "10", ""],
+            ["99002", "Ayşe", "Yıldız", "80", "x", ""],
+        ]
+
+    def test_plan_and_diff_do_not_write(self):
+        grade_import = GradeImport(self.course, self.HEADERS, self._rows()).plan()
+        self.assertEqual(
+            grade_import.summary,
+            ImportSummary(
+                rows=2,
+                students_created=1,
+                students_updated=1,
+                enrollments_created=1,
+                enrollments_updated=1,
+                inserted=2,
+                updated=0,
+                unchanged=1,
+            ),
+        )
+        diff = grade_import.diff()
+        self.assertEqual(diff["new_components"], [{"name": "Final", "weight": 60}])
+        self.assertEqual(diff["weight_changes"], [{"name": "Vize", "old": 40, "new": 30}])
+        self.assertEqual(diff["renamed_students"], [{"student_number": "99001", "old": "Eski Ad", "new": "Yeni Ad"}])
+        self.assertEqual(diff["new_students"], [{"student_number": "99002", "full_name": "Ayşe Yıldız"}])
+        self.assertEqual(diff["changed_enrollments"][0]["fields"], {"letter_grade": {"old": "", "new": "BB"}})
+        self.assertEqual(len(diff["errors"]), 1)
+        self.assertEqual(diff["errors"][0]["column"], "Final(%60)")
+        self.assertEqual(diff["unchanged_rows"], 0)
+
+        self.assertFalse(Student.objects.filter(student_number="99002").exists())
+        self.assertEqual(Student.objects.get(id=self.student.id).full_name, "Eski Ad")
+        self.assertEqual(AssessmentComponent.objects.get(id=self.vize.id).weight_percent, 40)
+
+    def test_apply_writes_the_planned_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = GradeImport(self.course, self.HEADERS, self._rows()).apply()
+        self.assertEqual((summary.inserted, summary.updated, summary.unchanged), (2, 0, 1))
+
+        self.assertEqual(AssessmentComponent.objects.get(id=self.vize.id).weight_percent, 30)
+        final = AssessmentComponent.objects.get(course=self.course, name="Final")
+        self.assertEqual(final.weight_percent, 60)
+        self.assertEqual(Student.objects.get(id=self.student.id).full_name, "Yeni Ad")
+        new_student = Student.objects.get(student_number="99002")
+        self.assertEqual(new_student.search_name, "ayse yildiz")
+        self.assertEqual(Enrollment.objects.get(id=self.enrollment.id).letter_grade, "BB")
+        scores = StudentAssessment.objects.filter(enrollment__course=self.course).values_list(
+            "enrollment__student__student_number", "assessment_component__name", "score"
+        )
+        self.assertEqual(set(scores), {("99001", "Vize", 50), ("99001", "Final", 70), ("99002", "Vize", 80)})
+
+        again = GradeImport(self.course, self.HEADERS, self._rows(existing_final="75")).apply()
+        self.assertEqual(
+            again,
+            ImportSummary(
+                rows=2,
+                students_created=0,
+                students_updated=0,
+                enrollments_created=0,
+                enrollments_updated=0,
+                inserted=0,
+                updated=1,
+                unchanged=2,
+            ),
+        )
+        self.assertEqual(StudentAssessment.objects.get(enrollment=self.enrollment, assessment_component=final).score, 75)
+
+    def test_overlapping_imports_replan_under_the_course_lock(self):
+        first = GradeImport(self.course, self.HEADERS, self._rows()).plan()
+        second = GradeImport(self.course, self.HEADERS, self._rows(existing_final="75")).plan()
+        self.assertEqual((first.summary.students_created, second.summary.students_created), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.apply()
+            summary = second.apply()
+        self.assertEqual((summary.students_created, summary.enrollments_created, summary.inserted), (0, 0, 0))
+        self.assertEqual(summary.updated, 1)
+        self.assertEqual(Student.objects.filter(student_number="99002").count(), 1)
+        self.assertEqual(Enrollment.objects.filter(course=self.course, student__student_number="99002").count(), 1)
+        self.assertEqual(len(second.errors), 1)
+
+    def test_student_created_by_another_course_import_is_reused(self):
+        other = Course.objects.create(code="TST201", name="Diğer", term="Güz")
+        grade_import = GradeImport(other, self.HEADERS, self._rows()).plan()
+        rival = Student.objects.create(full_name="Ayşe Yıldız", student_number="99002")
+
+        grade_import._create_students()
+        self.assertEqual([student.id for student in grade_import.new_students], [rival.id])
+        self.assertEqual(Student.objects.filter(student_number="99002").count(), 1)
+
+
+class ImportGradesCommandTests(TestCase):
+    """importgrades klasördeki dosyaları ad ile derse eşleyip yazmalı ve dosya başına özet basmalı."""
+
+    HEADERS = ["Öğrenci No", "Adı", "Soyadı", "Vize(%40)", "Final(%60)"]
+
+    def setUp(self):
+        self.first = Course.objects.create(code="TST400", name="Birinci", term="Güz")
+        self.second = Course.objects.create(code="TST401", name="İkinci", term="Güz")
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.folder = Path(tmp_dir.name)
+        tables = {
+            "TST400-notlar.xlsx": [["99400", "Ali", "Can", "50", "70"], ["99401", "Ece", "Su", "80", "x"]],
+            "TST 401.xlsx": [["99400", "Ali", "Can", "", "65"]],
+        }
+        for name, rows in tables.items():
+            (self.folder / name).write_bytes(b"".join(stream_xlsx([("Notlar", [self.HEADERS] + rows)])))
+
+    def _call(self, *args):
+        out = io.StringIO()
+        call_command("importgrades", str(self.folder), "--workers", "1", *args, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_imports_each_file_into_its_course(self):
+        output = self._call()
+        self.assertIn("TST400-notlar.xlsx -> TST400: 2 satır", output)
+        self.assertIn("(yeni not: 3, değişen: 0, değişmeyen: 0, uyarı: 1)", output)
+        self.assertIn("TST 401.xlsx -> TST401: 1 satır", output)
+        self.assertIn("(yeni not: 1, değişen: 0, değişmeyen: 0, uyarı: 0)", output)
+        self.assertIn("satır 2 / Final(%60): Sayısal olmayan not atlandı. (x)", output)
+        self.assertIn("2/2 dosya, 3 satır", output)
+
+        scores = StudentAssessment.objects.filter(enrollment__course__in=[self.first, self.second]).values_list(
+            "enrollment__course__code", "enrollment__student__student_number", "assessment_component__name", "score"
+        )
+        self.assertEqual(
+            set(scores),
+            {
+                ("TST400", "99400", "Vize", 50),
+                ("TST400", "99400", "Final", 70),
+                ("TST400", "99401", "Vize", 80),
+                ("TST401", "99400", "Final", 65),
+            },
+        )
+        self.assertEqual(Student.objects.filter(student_number="99400").count(), 1)
+
+        again = self._call()
+        self.assertIn("(yeni not: 0, değişen: 0, değişmeyen: 3, uyarı: 1)", again)
+
+    def test_dry_run_reports_without_writing(self):
+        output = self._call("--dry-run")
+        self.assertIn("yeni bileşen Vize (%40)", output)
+        self.assertIn("yeni öğrenci: 2, yeni kayıt: 2, değişen kayıt: 0", output)
+        self.assertIn("Kuru çalıştırma: veritabanına yazılmadı.", output)
+        self.assertFalse(Student.objects.filter(student_number__in=["99400", "99401"]).exists())
+        self.assertFalse(AssessmentComponent.objects.filter(course__in=[self.first, self.second]).exists())
+
+
+class DecodeGradeTableTests(SimpleTestCase):
+    """decode_grade_table tam tabloyu ve temel tabloya göre değişiklikleri çözmeli, bozuk yükü reddetmeli."""
+
+    BASES = {"template": (["Öğrenci No", "Vize(%40)"], [["1001", "50"], ["1002", ""]])}
+
+    def _decode(self, payload):
+        return decode_grade_table(payload if isinstance(payload, str) else json.dumps(payload), self.BASES)
+
+    def test_full_table_is_trimmed_and_padded(self):
+        headers, rows = self._decode({"headers": [" Öğrenci No ", "Vize(%40)"], "rows": [["1001", 55, "fazla"], [None]]})
+        self.assertEqual(headers, ["Öğrenci No", "Vize(%40)"])
+        self.assertEqual(rows, [["1001", "55"], ["", ""]])
+
+    def test_changes_apply_to_a_copy_of_the_base(self):
+        headers, rows = self._decode({"base": "template", "changes": [[1, 1, 72.5], [0, 1, " 60 "]]})
+        self.assertEqual(rows, [["1001", "60"], ["1002", "72.5"]])
+        self.assertEqual(self.BASES["template"][1], [["1001", "50"], ["1002", ""]])
+
+    def test_rejects_malformed_payloads(self):
+        cases = {
+            "okunamadı": ["", "{bozuk", "[1, 2]", {"headers": "Öğrenci No", "rows": []}, {"headers": ["A"], "rows": ["1"]}],
+            "kaynağı bulunamadı": [{"base": "eski", "changes": []}],
+            "Geçersiz hücre": [
+                {"base": "template", "changes": [[0, 1]]},
+                {"base": "template", "changes": [[2, 0, "x"]]},
+                {"base": "template", "changes": [[0, -1, "x"]]},
+                {"base": "template", "changes": [["0", 1, "x"]]},
+            ],
+            "yalnızca metin veya sayı": [
+                {"headers": ["A"], "rows": [[True]]},
+                {"base": "template", "changes": [[0, 1, {"v": 1}]]},
+            ],
+            "başlıkları bulunamadı": [{"headers": [], "rows": [["1001"]]}],
+        }
+        for message, payloads in cases.items():
+            for payload in payloads:
+                with self.subTest(payload=payload), self.assertRaisesMessage(GradeImportError, message):
+                    self._decode(payload)
+
+
+class PreviewPaginationTests(TestCase):
+    """Önizleme satırları sayfa sayfa dönmeli; hata satırları GradeImport ile aynı biçimde 1'den başlamalı."""
+
+    def setUp(self):
+        rows = [[str(1000 + index), str(index % 101)] for index in range(PAGE_SIZE * 2 + 50)]
+        self.preview = create_preview(["Öğrenci No", "Vize(%40)"], rows, filename="onizleme.xlsx")
+        self.url = reverse("assessment:grade_preview_rows", args=[self.preview["id"]])
+
+    def tearDown(self):
+        discard_preview(self.preview["id"])
+
+    def _page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_cover_rows_in_order(self):
+        first = self._page()
+        self.assertEqual((first["offset"], first["limit"], first["row_count"]), (0, PAGE_SIZE, PAGE_SIZE * 2 + 50))
+        self.assertEqual(first["rows"][0], ["1000", "0"])
+        last = self._page(offset=PAGE_SIZE * 2, limit=PAGE_SIZE)
+        self.assertEqual(len(last["rows"]), 50)
+        self.assertEqual(last["rows"][-1], [str(1000 + PAGE_SIZE * 2 + 49), str((PAGE_SIZE * 2 + 49) % 101)])
+        self.assertEqual(self._page(offset=PAGE_SIZE * 3)["rows"], [])
+
+    def test_offset_and_limit_are_clamped(self):
+        page = self._page(offset=-5, limit=MAX_PAGE_SIZE + 1)
+        self.assertEqual((page["offset"], page["limit"], len(page["rows"])), (0, MAX_PAGE_SIZE, PAGE_SIZE * 2 + 50))
+        self.assertEqual(self._page(limit=0)["limit"], 1)
+
+    def test_errors_and_conditional_requests(self):
+        self.assertEqual(self.client.get(self.url, {"offset": "x"}).status_code, 400)
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        discard_preview(self.preview["id"])
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_error_rows_are_one_based(self):
+        _, errors = inspect_table(["Öğrenci No", "Vize(%40)"], [["1001", "50"], ["1002", "x"], ["1001", "120"]])
+        self.assertEqual(
+            [(error["row"], error["message"]) for error in errors],
+            [
+                (2, "Sayısal olmayan not atlanacak."),
+                (3, "Öğrenci No 1. satırda da var; son satır geçerli olur."),
+                (3, "Not 0-100 aralığı dışında."),
+            ],
+        )
+        _, errors = inspect_table(["Ad"], [["Ayşe"]])
+        self.assertEqual(errors[0]["row"], 0)
+
+
+class ConditionalResponseTests(TestCase):
+    """Veri değişmedikçe 304 dönmeli; not kaydı ve içe aktarma ETag'i değiştirmeli."""
+
+    def setUp(self):
+        self.url = reverse("assessment:dashboard")
+        self.enrollment = Enrollment.objects.filter(student=Student.objects.first()).select_related("student").first()
+
+    def _etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_unchanged_data_is_not_modified(self):
+        etag = self._etag()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_score_save_changes_etag(self):
+        etag = self._etag()
+        score = self.enrollment.assessments.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            score.score = 100 - score.score if score.score != 50 else 60
+            score.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_import_changes_etag_of_enrolled_student(self):
+        etag = self._etag()
+        letter = "AA" if self.enrollment.letter_grade != "AA" else "BA"
+        with self.captureOnCommitCallbacks(execute=True):
+            GradeImport(
+                self.enrollment.course, ["Öğrenci No", "Harf Notu"], [[self.enrollment.student.student_number, letter]]
+            ).apply()
+        self.assertEqual(Enrollment.objects.get(id=self.enrollment.id).letter_grade, letter)
+        self.assertNotEqual(self._etag(), etag)
+
+    def test_per_process_cache_serves_unconditionally(self):
+        etag = self._etag()
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class AnalyticsTests(TestCase):
+    """Analiz haritası ders x PÇ ortalamalarını gruplu sorgudan doldurmalı ve ders alt kümesine daralmalı."""
+
+    TERM = "Test Güz"
+
+    def setUp(self):
+        # Kurulumun geçersiz kılmaları test işleminde bekletilmesin; sonraki kayıtlar sürümü hemen artırmalı.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.po1 = ProgramOutcome.objects.create(code="TPÇ1", title="Birinci")
+            self.po2 = ProgramOutcome.objects.create(code="TPÇ2", title="İkinci")
+            self.first = Course.objects.create(code="TAN100", name="Analiz bir", term=self.TERM)
+            self.second = Course.objects.create(code="TAN200", name="Analiz iki", term="Test Bahar")
+            self.empty = Course.objects.create(code="TAN300", name="Bağlantısız", term=self.TERM)
+            lo1 = LearningOutcome.objects.create(course=self.first, code="ÖÇ1", description="Bir")
+            lo2 = LearningOutcome.objects.create(course=self.first, code="ÖÇ2", description="İki")
+            lo3 = LearningOutcome.objects.create(course=self.second, code="ÖÇ1", description="Üç")
+            for lo, po, weight in [(lo1, self.po1, 2), (lo2, self.po1, 5), (lo1, self.po2, 3), (lo3, self.po2, 4)]:
+                LearningOutcomeProgramOutcome.objects.create(learning_outcome=lo, program_outcome=po, weight=weight)
+        self.course_ids = [self.first.id, self.second.id, self.empty.id]
+
+    def _cells(self, context):
+        return {
+            (row["course"].id, value["po"].id): (value["value"], value["count"], value["percent"])
+            for row in context["heatmap"]
+            for value in row["values"]
+            if value["po"] in (self.po1, self.po2)
+        }
+
+    def test_course_po_weights_averages_each_cell_in_one_query(self):
+        with self.assertNumQueries(1):
+            weights = course_po_weights(self.course_ids)
+        self.assertEqual(
+            weights,
+            {
+                (self.first.id, self.po1.id): (3.5, 2),
+                (self.first.id, self.po2.id): (3.0, 1),
+                (self.second.id, self.po2.id): (4.0, 1),
+            },
+        )
+        self.assertEqual(
+            course_po_weights(Course.objects.filter(term=self.TERM)),
+            {(self.first.id, self.po1.id): (3.5, 2), (self.first.id, self.po2.id): (3.0, 1)},
+        )
+
+    def test_context_is_limited_to_the_filtered_courses(self):
+        context = views._analytics_context(self.TERM, [])
+        self.assertEqual([row["course"] for row in context["heatmap"]], [self.first, self.empty])
+        self.assertEqual(
+            self._cells(context),
+            {
+                (self.first.id, self.po1.id): (3.5, 2, 70),
+                (self.first.id, self.po2.id): (3.0, 1, 60),
+                (self.empty.id, self.po1.id): (0, 0, 0),
+                (self.empty.id, self.po2.id): (0, 0, 0),
+            },
+        )
+        self.assertEqual({edge["course"] for edge in context["edges"]}, {self.first})
+        self.assertEqual(len(context["edges"]), 3)
+        self.assertEqual(context["export_query"], f"course={self.first.id}&course={self.empty.id}")
+
+        context = views._analytics_context("", [self.second.id])
+        self.assertEqual([row["course"] for row in context["heatmap"]], [self.second])
+        self.assertEqual(
+            self._cells(context), {(self.second.id, self.po1.id): (0, 0, 0), (self.second.id, self.po2.id): (4.0, 1, 80)}
+        )
+        self.assertEqual([(edge["lo"].code, edge["weight"]) for edge in context["edges"]], [("ÖÇ1", 4)])
+
+    def test_course_parameter_ignores_non_digits(self):
+        cache.clear()
+        with mock.patch.object(views, "_analytics_context", wraps=views._analytics_context) as build:
+            response = self.client.get(
+                reverse("assessment:analytics"),
+                {"term": self.TERM, "course": [str(self.second.id), "abc", "-1", "", "1.5", str(self.first.id)]},
+            )
+        self.assertEqual(response.status_code, 200)
+        build.assert_called_once_with(self.TERM, sorted([self.first.id, self.second.id]))
+        self.assertContains(response, 'data-value="3.5" data-count="2"')
+
+    def _page(self):
+        response = self.client.get(reverse("assessment:analytics"), {"term": self.TERM})
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_saving_curriculum_rows_drops_the_cached_fragment(self):
+        cache.clear()
+        self.assertIn('data-value="3.5" data-count="2"', self._page())
+        link = LearningOutcomeProgramOutcome.objects.get(learning_outcome__code="ÖÇ2", program_outcome=self.po1)
+
+        # Sinyalsiz güncelleme parçayı düşürmez; sayfa önbellekten gelir.
+        LearningOutcomeProgramOutcome.objects.filter(id=link.id).update(weight=1)
+        self.assertIn('data-value="3.5" data-count="2"', self._page())
+
+        link.weight = 1
+        with self.captureOnCommitCallbacks(execute=True):
+            link.save()
+        page = self._page()
+        self.assertIn('data-value="1.5" data-count="2"', page)
+        self.assertNotIn('data-value="3.5"', page)
+
+        self.po1.code = "TPÇ9"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.po1.save()
+        self.assertIn(">TPÇ9<", self._page())
+
+        self.first.code = "TAN101"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.save()
+        page = self._page()
+        self.assertIn(">TAN101<", page)
+        self.assertNotIn(">TAN100<", page)
+
+
+class AttainmentExportTests(TestCase):
+    """Akış halindeki başarım dışa aktarımı ders başına bir sayfa ve hesaplananla aynı puanları içermeli."""
+
+    def test_export_reads_back_with_one_sheet_per_course(self):
+        courses = list(Course.objects.filter(learning_outcomes__isnull=False).distinct().order_by("code")[:2])
+        response = self.client.get(reverse("assessment:attainment_export"), {"course": [c.id for c in courses] + ["x"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        workbook = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+        sheets = sorted(name for name in workbook.namelist() if name.startswith("xl/worksheets/"))
+        self.assertEqual(sheets, ["xl/worksheets/sheet1.xml", "xl/worksheets/sheet2.xml"])
+        workbook_xml = workbook.read("xl/workbook.xml").decode()
+        for course in courses:
+            self.assertIn(f'<sheet name="{course.code}"', workbook_xml)
+
+        course = courses[0]
+        los = list(LearningOutcome.objects.filter(course=course).order_by("code"))
+        pos = list(ProgramOutcome.objects.filter(learning_links__learning_outcome__course=course).distinct())
+        header, *rows = iter_xlsx_rows(workbook)
+        self.assertEqual(
+            header, ["Öğrenci No", "Ad Soyad", "Yıl", "Şube", "Final"] + [lo.code for lo in los] + [po.code for po in pos]
+        )
+        enrollments = Enrollment.objects.filter(course=course).select_related("student")
+        self.assertEqual(len(rows), enrollments.count())
+
+        enrollment = enrollments.order_by("student__student_number", "year", "id").first()
+        values = dict(zip(header, rows[0] + [""] * (len(header) - len(rows[0]))))
+        self.assertEqual(values["Öğrenci No"], enrollment.student.student_number)
+        self.assertEqual(values["Final"], str(final_score(enrollment)))
+        lo_scores = lo_scores_for_enrollments([enrollment])[enrollment.id]
+        for lo in los:
+            self.assertAlmostEqual(float(values[lo.code] or 0), round(lo_scores.get(lo.id, 0), 1), places=1, msg=lo.code)
+        for item in calculate_po_performance(lo_scores):
+            self.assertAlmostEqual(float(values[item["program_outcome"].code]), item["score"], places=1)
+
+
+class GradeTemplateRoundTripTests(TestCase):
+    """İndirilen ders şablonu doldurulup önizleme ve kayıt adımlarından geçince notlar yazılmalı."""
+
+    def setUp(self):
+        self.addCleanup(xlsx.clear_parse_cache)
+        self.course = Course.objects.create(code="TST300", name="Şablon", term="Güz")
+        self.vize = AssessmentComponent.objects.create(course=self.course, name="Vize", weight_percent=40)
+        self.student = Student.objects.create(full_name="Deniz Kaya", student_number="99300")
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course, year=2023)
+
+    def test_filled_template_is_previewed_and_applied(self):
+        response = self.client.get(reverse("assessment:grade_template_download"), {"course": self.course.id})
+        self.assertEqual(response.status_code, 200)
+        header, *rows = read_xlsx_rows(response.content)
+        self.assertEqual(header, ["No", "Öğrenci No", "Adı", "Soyadı", "Snf", "Girme Durum", "Vize(%40)", "Harf Notu"])
+        self.assertEqual(rows, [["1", "99300", "Deniz", "Kaya"]])
+
+        rows[0] += [""] * (len(header) - len(rows[0]))
+        rows[0][header.index("Vize(%40)")] = "72,5"
+        upload = SimpleUploadedFile("TST300-not-sablonu.xlsx", b"".join(stream_xlsx([("TST300", [header] + rows)])))
+        preview = self.client.post(reverse("assessment:grade_preview"), {"grades_file": upload}).json()
+        self.assertEqual((preview["row_count"], preview["error_count"]), (1, 0))
+        self.assertFalse(StudentAssessment.objects.filter(enrollment=self.enrollment).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("assessment:grade_upload"),
+                {
+                    "form_type": "save_grades",
+                    "course": self.course.id,
+                    "preview_session": preview["session"],
+                    "grades_json": json.dumps({"base": f"preview:{preview['session']}", "changes": []}),
+                },
+            )
+        self.assertEqual(response.status_code, 200)
+        score = StudentAssessment.objects.get(enrollment=self.enrollment)
+        self.assertEqual((score.assessment_component, score.score), (self.vize, 72.5))
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 1)
+
+
+class SearchTests(TestCase):
+    """Arama anahtarı Türkçe i/ı ve aksanları katlamalı; uçlar sayfadakiyle aynı etiketleri dönmeli."""
+
+    def test_normalize_search_text_folds_turkish_letters_and_accents(self):
+        self.assertEqual(normalize_search_text("  İLKER   IŞIK "), "ilker isik")
+        self.assertEqual(normalize_search_text("ılık İğde"), "ilik igde")
+        self.assertEqual(normalize_search_text("Çağlar Öztürk Şen"), "caglar ozturk sen")
+        self.assertEqual(normalize_search_text("José Müller"), "jose muller")
+        self.assertEqual(normalize_search_text(None), "")
+
+    def _labels(self, name, query):
+        response = self.client.get(reverse(f"assessment:{name}"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [item["label"] for item in response.json()["results"]]
+
+    def test_student_search_matches_folded_name_and_number_prefix(self):
+        student = Student.objects.create(full_name="İlker Işık", student_number="77001")
+        Student.objects.create(full_name="Ilgın Çelik", student_number="")
+        self.assertIn(student.search_label, self._labels("student_search", "ilker ISIK"))
+        self.assertEqual(self._labels("student_search", "7700"), ["İlker Işık (77001)"])
+        self.assertEqual(self._labels("student_search", "ılgın çel"), ["Ilgın Çelik"])
+        self.assertEqual(self._labels("student_search", "   "), [])
+
+    def test_course_search_and_selected_text_use_the_same_label(self):
+        course = Course.objects.create(code="ZZT101", name="Işık ve Görüntü", term="Güz")
+        self.assertEqual(self._labels("course_search", "zzt1"), ["ZZT101 - Işık ve Görüntü"])
+        self.assertIn("ZZT101 - Işık ve Görüntü", self._labels("course_search", "isik ve gor"))
+        response = self.client.get(reverse("assessment:instructor_panel"), {"course": course.id})
+        self.assertContains(response, 'value="ZZT101 - Işık ve Görüntü"')
+
+
+class ImportJobLeaseTests(TestCase):
+    """Kalp atışı kesilen işler yeniden kuyruğa alınmalı; geri alınan işin eski işçisi sonucu yazmamalı."""
+
+    def setUp(self):
+        self.course = Course.objects.create(code="TST300", name="Kuyruk", term="Güz")
+        self.job = enqueue_import(self.course, ["Öğrenci No", "Vize(%40)"], [["99100", "50"]], filename="kuyruk.xlsx")
+
+    def _mark_running(self, attempts, heartbeat_age):
+        GradeImportJob.objects.filter(id=self.job.id).update(
+            status=GradeImportJob.RUNNING,
+            attempts=attempts,
+            started_at=timezone.now() - heartbeat_age,
+            heartbeat_at=timezone.now() - heartbeat_age,
+        )
+
+    def test_stale_job_is_requeued_and_claimed_again(self):
+        self._mark_running(attempts=1, heartbeat_age=timedelta(seconds=JOB_LEASE_SECONDS + 60))
+        job = claim_next_job()
+        self.assertEqual((job.id, job.status, job.attempts), (self.job.id, GradeImportJob.RUNNING, 2))
+
+    def test_live_job_is_left_alone(self):
+        self._mark_running(attempts=1, heartbeat_age=timedelta(seconds=5))
+        self.assertIsNone(claim_next_job())
+        self.assertEqual(GradeImportJob.objects.get(id=self.job.id).status, GradeImportJob.RUNNING)
+
+    def test_job_out_of_attempts_fails(self):
+        self._mark_running(attempts=JOB_MAX_ATTEMPTS, heartbeat_age=timedelta(seconds=JOB_LEASE_SECONDS + 60))
+        self.assertIsNone(claim_next_job())
+        job = GradeImportJob.objects.get(id=self.job.id)
+        self.assertEqual(job.status, GradeImportJob.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_reclaimed_job_keeps_the_new_owner_state(self):
+        job = claim_next_job()
+        GradeImportJob.objects.filter(id=job.id).update(attempts=job.attempts + 1)
+        run_job(job)
+        self.assertEqual(GradeImportJob.objects.get(id=job.id).status, GradeImportJob.RUNNING)
+
+        job = GradeImportJob.objects.select_related("course").get(id=job.id)
+        run_job(job)
+        job = GradeImportJob.objects.get(id=job.id)
+        self.assertEqual(job.status, GradeImportJob.DONE)
+        # İlk deneme notu zaten yazmıştı; içe aktarma farka dayalı olduğundan yeniden çalıştırmak güvenlidir.
+        self.assertEqual((job.summary["inserted"], job.summary["unchanged"]), (0, 1))
+        self.assertEqual(StudentAssessment.objects.filter(enrollment__course=self.course).count(), 1)
@@ -7,11 +7,17 @@ app_name = "assessment"
 urlpatterns = [
     path("", views.dashboard, name="dashboard"),
     path("student/", views.student_panel, name="student_panel"),
+    path("students/search/", views.student_search, name="student_search"),
     path("instructor/", views.instructor_panel, name="instructor_panel"),
+    path("courses/search/", views.course_search, name="course_search"),
     path("instructor/grades/", views.grade_upload, name="grade_upload"),
     path("instructor/grades/preview/", views.grade_preview, name="grade_preview"),
+    path("instructor/grades/preview/<str:session_id>/rows/", views.grade_preview_rows, name="grade_preview_rows"),
+    path("instructor/grades/jobs/", views.grade_import_enqueue, name="grade_import_enqueue"),
+    path("instructor/grades/jobs/<int:job_id>/", views.grade_import_status, name="grade_import_status"),
     path("instructor/grades/template/", views.grade_template_download, name="grade_template_download"),
     path("analytics/", views.analytics_panel, name="analytics"),
+    path("analytics/export/", views.attainment_export, name="attainment_export"),
     path("planner/", views.course_planner, name="course_planner"),
     path("schema/", views.schema_overview, name="schema_overview"),
 ]
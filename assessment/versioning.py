@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CURRICULUM = "curriculum"
+PROGRAM_OUTCOMES = "program_outcomes"
+STUDENTS = "students"
+
+# İşlem boyunca geçersiz kılınan kapsamlar; onayda her biri bir kez artırılır.
+_pending = threading.local()
+_before_bumps = []
+
+
+def _key(scope):
+    return f"assessment:version:{scope}"
+
+
+def course_scope(course_id):
+    return f"course:{course_id}"
+
+
+def course_scores_scope(course_id):
+    return f"course_scores:{course_id}"
+
+
+def course_roster_scope(course_id):
+    return f"course_roster:{course_id}"
+
+
+def student_scope(student_id):
+    return f"student:{student_id}"
+
+
+def get_version(scope):
+    """Kapsamın güncel sürüm damgası; önbellekten düşmüşse yeni bir damga başlatır."""
+    version = cache.get(_key(scope))
+    if version is None:
+        # Zaman tabanlı başlangıç, düşen anahtarın eski bir sürümle çakışmasını önler.
+        cache.add(_key(scope), time.time_ns() // 1000, None)
+        version = cache.get(_key(scope))
+    return version
+
+
+def get_versions(*scopes):
+    """Birden çok kapsamın sürümleri tek önbellek okumasıyla; düşmüş olanlar yeniden başlatılır."""
+    found = cache.get_many([_key(scope) for scope in scopes])
+    return [found[_key(scope)] if _key(scope) in found else get_version(scope) for scope in scopes]
+
+
+def bump_version(scope):
+    """Sürümü artırır; damga en az şimdiki zamana (mikrosaniye) ilerlediği için Last-Modified olarak da okunur.
+
+    Sürümler tüm süreçlerin paylaştığı önbellekte tutulur (bkz. settings.CACHES); dosya önbelleğinde incr
+    atomik olmadığından ve varsayılan zaman aşımını uyguladığından değer doğrudan süresiz yazılır. Eşzamanlı iki
+    artıştan biri kaybolsa da damga yine daha önce görülmemiş bir değere geçer.
+    """
+    key = _key(scope)
+    current = cache.get(key)
+    if current is None:
+        return get_version(scope)
+    version = max(current + 1, time.time_ns() // 1000)
+    cache.set(key, version, None)
+    return version
+
+
+def _pending_scopes():
+    scopes = getattr(_pending, "scopes", None)
+    if scopes is not None and not any(
+        func is _bump_pending for _, func, *_ in transaction.get_connection().run_on_commit
+    ):
+        # İşlem geri alındıysa onay kancası düşmüştür; kapsamlar sonraki işleme taşınmaz (bkz. attainment).
+        scopes = None
+    if scopes is None:
+        scopes = _pending.scopes = set()
+    return scopes
+
+
+def before_pending_bumps(func):
+    """`func`, işlem sonundaki sürüm artışlarından önce çağrılır (bkz. attainment._flush).
+
+    Onay kancası işlem başına bir kez kaydedildiğinden, sonradan planlanan işler de artıştan önce biter.
+    """
+    _before_bumps.append(func)
+    return func
+
+
+def _bump_pending():
+    scopes = getattr(_pending, "scopes", None)
+    if scopes is None:
+        return
+    for func in _before_bumps:
+        func()
+    del _pending.scopes
+    for scope in scopes:
+        bump_version(scope)
+
+
+def invalidate(*scopes):
+    """Sürümleri hemen ve işlem onaylandığında yeniden artırır.
+
+    İkinci artış, işlem sırasında eski veriyle kurulan önbellek girdilerini de geçersiz kılar. Bir işlemde
+    aynı kapsam kaç kez geçersiz kılınırsa kılınsın bir kez hemen, bir kez de onayda artırılır; zincirleme
+    silmelerde satır başına önbellek yazılmaz.
+    """
+    scopes = list(dict.fromkeys(scopes))
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        for scope in scopes:
+            bump_version(scope)
+        return
+    pending = _pending_scopes()
+    # Boş küme, işlemin onay kancasının henüz kaydedilmediğini gösterir.
+    register = not pending
+    for scope in scopes:
+        if scope not in pending:
+            bump_version(scope)
+            pending.add(scope)
+    if register and pending:
+        transaction.on_commit(_bump_pending)
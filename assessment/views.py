@@ -1,21 +1,23 @@
-from collections import defaultdict
-import io
+import json
+from functools import lru_cache
 from pathlib import Path
-import re
-import zipfile
-import xml.etree.ElementTree as ET
 
 from django.conf import settings
-from django.db.models import Avg, Max
-from django.shortcuts import render, redirect
+from django.db.models import Avg, Prefetch
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
-from django.http import FileResponse, Http404, JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.views.decorators.http import condition, require_GET, require_POST
 
+from .importing import GradeImport, GradeImportError, component_columns, decode_grade_table, sheet_table
 from .models import (
     AssessmentComponent,
     Course,
     Enrollment,
+    GradeImportJob,
     LearningOutcome,
     LearningOutcomeContribution,
     LearningOutcomeProgramOutcome,
@@ -31,367 +33,224 @@ from .forms import (
     LearningOutcomeProgramOutcomeForm,
     ProgramOutcomeForm,
 )
+from .attainment import lo_scores_from_attainment, po_performance_from_attainment
+from .conditional import versioned
+from .curriculum import course_po_weights, get_lo_po_map
+from .demo import ensure_demo_data
+from .exports import XLSX_CONTENT_TYPE, course_grade_template, stream_attainment_export
+from .jobs import enqueue_import, job_progress
+from .pagecache import cached_fragment, fragment_key
+from .previews import (
+    PAGE_SIZE,
+    create_preview,
+    discard_preview,
+    get_preview,
+    preview_exists,
+    preview_page,
+    preview_summary,
+)
+from .scoring import lo_scores_for_enrollments
+from .stats import component_stats_for_courses, course_component_stats, course_mean
+from .structure import get_course_structure, get_course_structures
+from .versioning import (
+    CURRICULUM,
+    STUDENTS,
+    course_roster_scope,
+    course_scope,
+    course_scores_scope,
+    get_version,
+    student_scope,
+)
+from .xlsx import cached_xlsx_rows
 
-
-def bootstrap_demo_data():
-    """Create richer demo data: 6 ders, ortak ÖÇ/PO haritası, bileşenler ve notlar."""
-    if Course.objects.exists():
-        return
-
-    po_map = {
-        "PO1": ProgramOutcome.objects.create(code="PO1", title="Analitik Problem Çözme"),
-        "PO2": ProgramOutcome.objects.create(code="PO2", title="İletişim ve Sunum"),
-        "PO3": ProgramOutcome.objects.create(code="PO3", title="Takım Çalışması ve Liderlik"),
-        "PO4": ProgramOutcome.objects.create(code="PO4", title="Etik ve Mesleki Sorumluluk"),
-    }
-
-    courses_data = [
-        {
-            "code": "BLG101",
-            "name": "Girişimci Yazılım",
-            "term": "Güz",
-            "los": [
-                ("LO1", "Temel yazılım kavramlarını açıklar."),
-                ("LO2", "Basit bir web uygulamasını tasarlar."),
-                ("LO3", "Takım içinde planlama ve iletişim yürütür."),
-            ],
-            "lo_po": [("LO1", "PO1", 4), ("LO2", "PO1", 5), ("LO2", "PO2", 3), ("LO3", "PO3", 4), ("LO3", "PO2", 2)],
-            "assessments": [("Vize", 40), ("Proje", 60)],
-            "lo_contrib": [("Vize", "LO1", 60), ("Vize", "LO2", 40), ("Proje", "LO2", 60), ("Proje", "LO3", 40)],
-        },
-        {
-            "code": "BLG201",
-            "name": "Veri Yapıları",
-            "term": "Güz",
-            "los": [
-                ("LO1", "Liste, yığın ve kuyruk veri yapılarını uygular."),
-                ("LO2", "Ağaç ve grafik algoritmalarını uygular."),
-                ("LO3", "Karmaşıklık analizi yapar."),
-            ],
-            "lo_po": [("LO1", "PO1", 5), ("LO2", "PO1", 4), ("LO2", "PO2", 2), ("LO3", "PO1", 3), ("LO3", "PO3", 3)],
-            "assessments": [("Vize", 40), ("Proje", 40), ("Final", 20)],
-            "lo_contrib": [
-                ("Vize", "LO1", 60),
-                ("Vize", "LO3", 40),
-                ("Proje", "LO2", 60),
-                ("Proje", "LO3", 40),
-                ("Final", "LO1", 30),
-                ("Final", "LO2", 40),
-                ("Final", "LO3", 30),
-            ],
-        },
-        {
-            "code": "BLG205",
-            "name": "Veritabanı Sistemleri",
-            "term": "Bahar",
-            "los": [
-                ("LO1", "İlişkisel veri modelini kurar."),
-                ("LO2", "SQL ile veri işlemleri yapar."),
-                ("LO3", "Performans ve bütünlük kontrollerini uygular."),
-            ],
-            "lo_po": [("LO1", "PO1", 4), ("LO2", "PO1", 4), ("LO2", "PO2", 3), ("LO3", "PO4", 3)],
-            "assessments": [("Vize", 40), ("Lab", 30), ("Proje", 30)],
-            "lo_contrib": [
-                ("Vize", "LO1", 50),
-                ("Vize", "LO2", 50),
-                ("Lab", "LO2", 60),
-                ("Lab", "LO3", 40),
-                ("Proje", "LO1", 30),
-                ("Proje", "LO3", 70),
-            ],
-        },
-        {
-            "code": "BLG301",
-            "name": "Yazılım Mühendisliği",
-            "term": "Bahar",
-            "los": [
-                ("LO1", "Süreç modellerini uygular."),
-                ("LO2", "Gereksinim ve tasarım dokümantasyonu yazar."),
-                ("LO3", "Çevik ortamda takım çalışması yürütür."),
-            ],
-            "lo_po": [("LO1", "PO1", 3), ("LO2", "PO2", 4), ("LO3", "PO3", 5), ("LO3", "PO2", 3)],
-            "assessments": [("Proje", 50), ("Ara Rapor", 20), ("Sunum", 30)],
-            "lo_contrib": [
-                ("Proje", "LO1", 30),
-                ("Proje", "LO2", 40),
-                ("Proje", "LO3", 30),
-                ("Ara Rapor", "LO2", 60),
-                ("Ara Rapor", "LO3", 40),
-                ("Sunum", "LO2", 40),
-                ("Sunum", "LO3", 60),
-            ],
-        },
-        {
-            "code": "BLG310",
-            "name": "Web Teknolojileri",
-            "term": "Bahar",
-            "los": [
-                ("LO1", "Ön yüz bileşenlerini kodlar."),
-                ("LO2", "Arka uç servisleri yazar."),
-                ("LO3", "Güvenli dağıtım ve test süreçlerini uygular."),
-            ],
-            "lo_po": [("LO1", "PO1", 3), ("LO1", "PO2", 3), ("LO2", "PO1", 4), ("LO3", "PO4", 4)],
-            "assessments": [("Vize", 30), ("Lab", 30), ("Proje", 40)],
-            "lo_contrib": [
-                ("Vize", "LO1", 50),
-                ("Vize", "LO2", 50),
-                ("Lab", "LO1", 40),
-                ("Lab", "LO2", 40),
-                ("Lab", "LO3", 20),
-                ("Proje", "LO2", 50),
-                ("Proje", "LO3", 50),
-            ],
-        },
-        {
-            "code": "IST210",
-            "name": "Veri Bilimi Giriş",
-            "term": "Güz",
-            "los": [
-                ("LO1", "Python ile veri hazırlama ve görselleştirme yapar."),
-                ("LO2", "Basit makine öğrenmesi modelleri kurar."),
-                ("LO3", "Etik ve veri gizliliği konularını gözetir."),
-            ],
-            "lo_po": [("LO1", "PO1", 3), ("LO2", "PO1", 4), ("LO2", "PO2", 2), ("LO3", "PO4", 5)],
-            "assessments": [("Vize", 30), ("Lab", 30), ("Proje", 40)],
-            "lo_contrib": [
-                ("Vize", "LO1", 60),
-                ("Vize", "LO2", 40),
-                ("Lab", "LO1", 50),
-                ("Lab", "LO2", 30),
-                ("Lab", "LO3", 20),
-                ("Proje", "LO2", 60),
-                ("Proje", "LO3", 40),
-            ],
-        },
-    ]
-
-    courses = []
-    lo_lookup = {}
-    comp_lookup = {}
-
-    for data in courses_data:
-        course = Course.objects.create(code=data["code"], name=data["name"], term=data["term"])
-        courses.append(course)
-        for code, desc in data["los"]:
-            lo = LearningOutcome.objects.create(course=course, code=code, description=desc)
-            lo_lookup[(course.code, code)] = lo
-        for name, weight in data["assessments"]:
-            comp = AssessmentComponent.objects.create(course=course, name=name, weight_percent=weight)
-            comp_lookup[(course.code, name)] = comp
-
-    for data in courses_data:
-        course = next(c for c in courses if c.code == data["code"])
-        LearningOutcomeProgramOutcome.objects.bulk_create(
-            [
-                LearningOutcomeProgramOutcome(
-                    learning_outcome=lo_lookup[(course.code, lo_code)],
-                    program_outcome=po_map[po_code],
-                    weight=weight,
-                )
-                for lo_code, po_code, weight in data["lo_po"]
-            ]
-        )
-        LearningOutcomeContribution.objects.bulk_create(
-            [
-                LearningOutcomeContribution(
-                    assessment_component=comp_lookup[(course.code, comp_name)],
-                    learning_outcome=lo_lookup[(course.code, lo_code)],
-                    contribution_percent=percent,
-                )
-                for comp_name, lo_code, percent in data["lo_contrib"]
-            ]
-        )
-
-    ayse = Student.objects.create(full_name="Ayşe Demir", student_number="20231234")
-    ali = Student.objects.create(full_name="Ali Can", student_number="20231235")
-
-    enrollments = []
-    for student in (ayse, ali):
-        for course in courses:
-            enrollments.append(Enrollment(student=student, course=course, year=2023))
-    Enrollment.objects.bulk_create(enrollments)
-
-    default_scores = {"Vize": 78, "Proje": 85, "Final": 82, "Lab": 80, "Quiz": 75, "Ara Rapor": 83, "Sunum": 86}
-    student_assessments = []
-    for enrollment in Enrollment.objects.all().select_related("course"):
-        for comp in AssessmentComponent.objects.filter(course=enrollment.course):
-            score = default_scores.get(comp.name, 80)
-            # Ayşe biraz yüksek, Ali biraz daha düşük not alsın.
-            if enrollment.student.full_name.startswith("Ali"):
-                score = max(0, score - 8)
-            student_assessments.append(
-                StudentAssessment(enrollment=enrollment, assessment_component=comp, score=score)
-            )
-    StudentAssessment.objects.bulk_create(student_assessments)
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
 
 
 def calculate_learning_outcome_scores(enrollment: Enrollment):
     """Aggregate öğrenci ÖÇ puanlarını hesapla."""
-    scores = {}
-    contributions = (
-        LearningOutcomeContribution.objects.select_related("assessment_component", "learning_outcome")
-        .filter(assessment_component__course=enrollment.course)
-        .all()
-    )
-
-    for contribution in contributions:
-        try:
-            student_score = StudentAssessment.objects.get(
-                enrollment=enrollment, assessment_component=contribution.assessment_component
-            ).score
-        except StudentAssessment.DoesNotExist:
-            continue
-
-        comp_weight = contribution.assessment_component.weight_percent / 100
-        lo_weight = contribution.contribution_percent / 100
-        total = scores.get(contribution.learning_outcome_id, 0)
-        scores[contribution.learning_outcome_id] = total + student_score * comp_weight * lo_weight
-
-    return scores
+    return lo_scores_for_enrollments([enrollment])[enrollment.id]
 
 
 def calculate_po_performance(lo_scores):
     """PO performansını, ÖÇ ağırlıklarıyla normalize ederek hesaplar."""
-    po_scores = defaultdict(lambda: {"total": 0.0, "weight": 0.0, "po": None})
-    mappings = LearningOutcomeProgramOutcome.objects.select_related("program_outcome", "learning_outcome")
-    for mapping in mappings:
-        score = lo_scores.get(mapping.learning_outcome_id)
-        if score is None:
-            continue
-        po_scores[mapping.program_outcome_id]["total"] += score * mapping.weight
-        po_scores[mapping.program_outcome_id]["weight"] += mapping.weight
-        po_scores[mapping.program_outcome_id]["po"] = mapping.program_outcome
-
+    lo_po_map = get_lo_po_map()
     results = []
-    for item in po_scores.values():
-        normalized = item["total"] / item["weight"] if item["weight"] else 0
-        results.append({"program_outcome": item["po"], "score": round(normalized, 1)})
+    for po_id, (total, weight) in lo_po_map.po_totals(lo_scores).items():
+        normalized = total / weight if weight else 0
+        results.append({"program_outcome": lo_po_map.program_outcomes[po_id], "score": round(normalized, 1)})
     return sorted(results, key=lambda x: x["program_outcome"].code)
 
 
 def final_score(enrollment: Enrollment):
     """Genel ders puanı: bileşen notu x bileşen ağırlığı."""
+    if hasattr(enrollment, "final_total"):
+        return enrollment.final_score
+    scores = dict(
+        StudentAssessment.objects.filter(enrollment=enrollment).values_list("assessment_component_id", "score")
+    )
     total = 0
-    for comp in AssessmentComponent.objects.filter(course=enrollment.course):
-        sa = StudentAssessment.objects.filter(enrollment=enrollment, assessment_component=comp).first()
-        if not sa:
+    for comp in get_course_structure(enrollment.course_id).components:
+        if comp.id not in scores:
             continue
-        total += sa.score * (comp.weight_percent / 100)
+        total += scores[comp.id] * (comp.weight_percent / 100)
     return round(total, 1) if total else 0
 
 
-def enrollment_assessment_breakdown(enrollment: Enrollment):
-    course_assessments = (
-        AssessmentComponent.objects.filter(course=enrollment.course)
-        .annotate(class_avg=Avg("student_assessments__score"))
-        .all()
-    )
-    assessments = []
-    for comp in course_assessments:
-        student_score = StudentAssessment.objects.filter(
-            enrollment=enrollment, assessment_component=comp
-        ).first()
-        assessments.append(
+def _assessment_rows(components, scores, stats):
+    rows = []
+    for comp in components:
+        student_score = scores.get(comp.id)
+        comp_stats = stats.get(comp.id)
+        rows.append(
             {
                 "name": comp.name,
                 "weight": comp.weight_percent,
-                "score": round(student_score.score, 1) if student_score else None,
-                "class_avg": round(comp.class_avg, 1) if comp.class_avg else None,
+                "score": round(student_score, 1) if student_score is not None else None,
+                "class_avg": round(comp_stats.mean, 1) if comp_stats and comp_stats.mean else None,
+                "stats": comp_stats,
             }
         )
-    return assessments
+    return rows
 
 
-def dashboard(request):
-    bootstrap_demo_data()
-    student = Student.objects.first()
-    if not student:
-        return render(request, "assessment/dashboard.html", {"student": None, "enrollments": []})
+def enrollment_assessment_breakdown(enrollment: Enrollment):
+    scores = dict(
+        StudentAssessment.objects.filter(enrollment=enrollment).values_list("assessment_component_id", "score")
+    )
+    return _assessment_rows(
+        get_course_structure(enrollment.course_id).components, scores, course_component_stats(enrollment.course_id)
+    )
 
-    enrollments = (
-        Enrollment.objects.filter(student=student)
-        .select_related("course")
-        .prefetch_related("course__learning_outcomes__program_links__program_outcome")
+
+def with_panel_prefetches(enrollments):
+    """Öğrenci panellerinin ihtiyaç duyduğu ders, bileşen, ÖÇ, ÖÇ–PÇ ve not verisini sabit sayıda sorguda getirir."""
+    return enrollments.select_related("course").prefetch_related(
+        Prefetch("course__assessments", queryset=AssessmentComponent.objects.order_by("id"), to_attr="panel_components"),
+        Prefetch(
+            "course__learning_outcomes",
+            queryset=LearningOutcome.objects.order_by("code").prefetch_related(
+                Prefetch("program_links", queryset=LearningOutcomeProgramOutcome.objects.select_related("program_outcome"))
+            ),
+            to_attr="panel_outcomes",
+        ),
+        Prefetch(
+            "assessments",
+            queryset=StudentAssessment.objects.only("enrollment_id", "assessment_component_id", "score"),
+            to_attr="panel_scores",
+        ),
     )
 
-    enrollment_data = []
-    lo_scores = {}
-    for enrollment in enrollments:
-        lo_score_map = calculate_learning_outcome_scores(enrollment)
-        lo_scores.update(lo_score_map)
-        outcomes = []
-        for lo in enrollment.course.learning_outcomes.all():
-            mappings = lo.program_links.select_related("program_outcome")
-            outcomes.append(
-                {
-                    "obj": lo,
-                    "mappings": mappings,
-                    "score": round(lo_score_map.get(lo.id, 0), 1),
-                }
-            )
 
-        enrollment_data.append(
+def build_enrollment_panels(enrollments):
+    """Kayıt kartları ve PÇ performansı; `with_panel_prefetches` ile gelen kayıtlardan hesaplanır.
+
+    Ders ve ÖÇ sayısından bağımsız olarak sabit sayıda sorgu çalıştırır.
+    """
+    enrollments = list(enrollments)
+    lo_score_maps = lo_scores_from_attainment(enrollments)
+    stats_by_course = component_stats_for_courses({enrollment.course_id for enrollment in enrollments})
+    panels = []
+    for enrollment in enrollments:
+        course = enrollment.course
+        scores = {sa.assessment_component_id: sa.score for sa in enrollment.panel_scores}
+        lo_score_map = lo_score_maps[enrollment.id]
+        panels.append(
             {
-                "course": enrollment.course,
-                "assessments": enrollment_assessment_breakdown(enrollment),
-                "learning_outcomes": outcomes,
+                "course": course,
+                "assessments": _assessment_rows(course.panel_components, scores, stats_by_course[course.id]),
+                "learning_outcomes": [
+                    {"obj": lo, "mappings": lo.program_links.all(), "score": round(lo_score_map.get(lo.id, 0), 1)}
+                    for lo in course.panel_outcomes
+                ],
             }
         )
+    po_performance = po_performance_from_attainment(enrollments) if enrollments else []
+    return panels, po_performance
+
+
+def _dashboard_student(request):
+    if not hasattr(request, "_dashboard_student"):
+        request._dashboard_student = Student.objects.first()
+    return request._dashboard_student
+
+
+def _dashboard_scopes(request):
+    student = _dashboard_student(request)
+    if student is None:
+        return None
+    course_ids = sorted(set(Enrollment.objects.filter(student=student).values_list("course_id", flat=True)))
+    # Kayıt satırları (harf notu, sınıf) ders listesi kapsamıyla izlenir; toplu içe aktarma öğrenci başına artırmaz.
+    return [STUDENTS, CURRICULUM, student_scope(student.id)] + [
+        scope
+        for course_id in course_ids
+        for scope in (course_scope(course_id), course_scores_scope(course_id), course_roster_scope(course_id))
+    ]
 
-    po_performance = calculate_po_performance(lo_scores)
-    program_outcomes = ProgramOutcome.objects.all()
-    learning_outcome_links = LearningOutcomeProgramOutcome.objects.select_related(
-        "learning_outcome", "program_outcome"
-    )
 
+@versioned(_dashboard_scopes)
+def dashboard(request):
+    ensure_demo_data()
+    student = _dashboard_student(request)
+    if not student:
+        return render(request, "assessment/dashboard.html", {"student": None, "enrollments": []})
+
+    enrollment_data, po_performance = build_enrollment_panels(
+        with_panel_prefetches(Enrollment.objects.filter(student=student))
+    )
     context = {
         "student": student,
         "enrollments": enrollment_data,
-        "program_outcomes": program_outcomes,
-        "learning_outcome_links": learning_outcome_links,
+        "learning_outcome_links": LearningOutcomeProgramOutcome.objects.select_related(
+            "learning_outcome__course", "program_outcome"
+        ),
         "po_performance": po_performance,
-        "courses": Course.objects.all(),
     }
     return render(request, "assessment/dashboard.html", context)
 
 
+def _student_panel_selection(request):
+    if not hasattr(request, "_student_panel_selection"):
+        students = Student.objects.all()
+        courses = Course.objects.all()
+        request._student_panel_selection = (
+            students.filter(id=request.GET.get("student")).first() or students.first(),
+            courses.filter(id=request.GET.get("course")).first() or courses.first(),
+        )
+    return request._student_panel_selection
+
+
+def _student_panel_scopes(request):
+    selected_student, selected_course = _student_panel_selection(request)
+    if not (selected_student and selected_course):
+        return None
+    return [
+        CURRICULUM,
+        student_scope(selected_student.id),
+        course_scope(selected_course.id),
+        course_scores_scope(selected_course.id),
+        course_roster_scope(selected_course.id),
+    ]
+
+
+@versioned(_student_panel_scopes)
 def student_panel(request):
-    bootstrap_demo_data()
-    students = Student.objects.all()
-    courses = Course.objects.all()
-    selected_student = students.filter(id=request.GET.get("student")).first() or students.first()
-    selected_course = courses.filter(id=request.GET.get("course")).first() or courses.first()
+    ensure_demo_data()
+    selected_student, selected_course = _student_panel_selection(request)
 
     enrollment_data = []
     po_performance = []
 
     if selected_student and selected_course:
-        enrollment = (
-            Enrollment.objects.filter(student=selected_student, course=selected_course)
-            .select_related("course")
-            .prefetch_related("course__learning_outcomes__program_links__program_outcome")
-            .first()
-        )
-        if enrollment:
-            lo_score_map = calculate_learning_outcome_scores(enrollment)
-            outcomes = []
-            for lo in enrollment.course.learning_outcomes.all():
-                mappings = lo.program_links.select_related("program_outcome")
-                outcomes.append({"obj": lo, "mappings": mappings, "score": round(lo_score_map.get(lo.id, 0), 1)})
-
-            enrollment_data.append(
-                {
-                    "course": enrollment.course,
-                    "assessments": enrollment_assessment_breakdown(enrollment),
-                    "learning_outcomes": outcomes,
-                }
+        # Aynı derse birden çok yıl/şube kaydı olabilir; önceki davranışla uyumlu olarak ilki gösterilir.
+        enrollment_data, po_performance = build_enrollment_panels(
+            with_panel_prefetches(
+                Enrollment.objects.filter(student=selected_student, course=selected_course).order_by("id")[:1]
             )
-            po_performance = calculate_po_performance(lo_score_map)
+        )
 
     context = {
         "student": selected_student,
-        "students": students,
-        "courses": courses,
         "selected_course": selected_course,
         "enrollments": enrollment_data,
         "po_performance": po_performance,
@@ -404,8 +263,36 @@ def student_panel(request):
     return render(request, "assessment/student_panel.html", context)
 
 
+def _autocomplete_limit(request):
+    """İstenen sonuç sayısı; varsayılanı ayardan gelir, üst sınırı AUTOCOMPLETE_MAX_LIMIT'tir."""
+    default = getattr(settings, "ASSESSMENT_AUTOCOMPLETE_LIMIT", AUTOCOMPLETE_LIMIT)
+    try:
+        limit = int(request.GET.get("limit", default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+
+@require_GET
+@versioned(lambda request: [STUDENTS])
+def student_search(request):
+    """Numarası veya adı `q` ile başlayan öğrenciler (otomatik tamamlama)."""
+    students = Student.objects.search(request.GET.get("q", "")).only("id", "full_name", "student_number")
+    results = [{"id": student.id, "label": student.search_label} for student in students[: _autocomplete_limit(request)]]
+    return JsonResponse({"results": results})
+
+
+@require_GET
+@versioned(lambda request: [CURRICULUM])
+def course_search(request):
+    """Kodu veya adı `q` ile başlayan dersler (otomatik tamamlama)."""
+    courses = Course.objects.search(request.GET.get("q", "")).only("id", "code", "name")
+    results = [{"id": course.id, "label": course.search_label} for course in courses[: _autocomplete_limit(request)]]
+    return JsonResponse({"results": results})
+
+
 def instructor_panel(request):
-    bootstrap_demo_data()
+    ensure_demo_data()
     courses = Course.objects.all()
     selected_course = courses.filter(id=request.GET.get("course")).first() or courses.first()
 
@@ -555,7 +442,6 @@ def instructor_panel(request):
             "assessment/instructor_panel.html",
             _instructor_context(
                 selected_course,
-                courses,
                 course_form,
                 learning_outcome_form,
                 program_outcome_form,
@@ -573,7 +459,6 @@ def instructor_panel(request):
         "assessment/instructor_panel.html",
         _instructor_context(
             selected_course,
-            courses,
             course_form,
             learning_outcome_form,
             program_outcome_form,
@@ -589,7 +474,6 @@ def instructor_panel(request):
 
 def _instructor_context(
     selected_course,
-    courses,
     course_form,
     learning_outcome_form,
     program_outcome_form,
@@ -600,9 +484,9 @@ def _instructor_context(
     edit_contrib_id=None,
     edit_lopo_id=None,
 ):
+    structure = get_course_structure(selected_course) if selected_course else None
     return {
         "selected_course": selected_course,
-        "courses": courses,
         "course_form": course_form,
         "learning_outcome_form": learning_outcome_form,
         "program_outcome_form": program_outcome_form,
@@ -612,97 +496,23 @@ def _instructor_context(
         "edit_component_id": edit_component_id,
         "edit_contrib_id": edit_contrib_id,
         "edit_lopo_id": edit_lopo_id,
-        "assessments": AssessmentComponent.objects.filter(course=selected_course) if selected_course else [],
-        "lo_contributions": LearningOutcomeContribution.objects.select_related(
-            "assessment_component", "learning_outcome"
-        ).filter(assessment_component__course=selected_course)
-        if selected_course
-        else [],
-        "lo_links": LearningOutcomeProgramOutcome.objects.select_related("learning_outcome", "program_outcome").filter(
-            learning_outcome__course=selected_course
-        )
-        if selected_course
-        else [],
+        "assessments": sorted(structure.components, key=lambda comp: comp.name) if structure else [],
+        "lo_contributions": structure.contributions if structure else [],
+        "lo_links": structure.program_links if structure else [],
     }
 
 
-def _read_xlsx_preview_from_zip(zfile, max_rows=None):
-    sheet_names = [name for name in zfile.namelist() if name.startswith("xl/worksheets/sheet")]
-    if not sheet_names:
-        return []
-    sheet = sheet_names[0]
-    shared = []
-    ns = {"a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
-    if "xl/sharedStrings.xml" in zfile.namelist():
-        root = ET.fromstring(zfile.read("xl/sharedStrings.xml"))
-        for item in root.findall("a:si", ns):
-            texts = [node.text or "" for node in item.findall(".//a:t", ns)]
-            shared.append("".join(texts))
-    root = ET.fromstring(zfile.read(sheet))
-    rows = root.findall("a:sheetData/a:row", ns)
-    preview = []
-    row_block = rows if max_rows is None else rows[:max_rows]
-    for row in row_block:
-        values = []
-        for cell in row.findall("a:c", ns):
-            value = cell.find("a:v", ns)
-            if value is None:
-                values.append("")
-                continue
-            if cell.get("t") == "s":
-                index = int(value.text)
-                values.append(shared[index] if index < len(shared) else "")
-            else:
-                values.append(value.text)
-        preview.append(values)
-    return preview
-
-
-def _read_xlsx_preview(path: Path, max_rows=None):
-    try:
-        with zipfile.ZipFile(path) as zfile:
-            return _read_xlsx_preview_from_zip(zfile, max_rows=max_rows)
-    except Exception:
-        return []
-
-
-def _read_xlsx_preview_from_bytes(data, max_rows=None):
-    try:
-        with zipfile.ZipFile(io.BytesIO(data)) as zfile:
-            return _read_xlsx_preview_from_zip(zfile, max_rows=max_rows)
-    except Exception:
-        return []
-
-
-def _normalize_header(header):
-    if not header:
-        return ""
-    return header.split("_")[0].strip()
-
-
-def _component_columns(headers):
-    columns = {}
-    pattern = re.compile(r"^(?P<name>.+)\(%(?P<weight>\d+)\)$")
-    for index, header in enumerate(headers):
-        clean = _normalize_header(header)
-        match = pattern.match(clean)
-        if not match:
-            continue
-        weight = int(match.group("weight"))
-        if weight < 0 or weight > 100:
-            continue
-        columns[index] = {"name": match.group("name").strip(), "weight": weight}
-    return columns
-
-
-def _find_header_index(header_map, candidates):
-    for candidate in candidates:
-        if candidate in header_map:
-            return header_map[candidate]
-    return None
-
-
 def grade_template_download(request):
+    """`?course=` verilirse dersin öğrenci listeli şablonunu, yoksa örnek OBS dosyasını indirir."""
+    course_id = request.GET.get("course")
+    if course_id:
+        course = Course.objects.filter(id=course_id).first() if course_id.isdigit() else None
+        if course is None:
+            raise Http404("Ders bulunamadı.")
+        response = HttpResponse(course_grade_template(course), content_type=XLSX_CONTENT_TYPE)
+        response["Content-Disposition"] = f'attachment; filename="{course.code}-not-sablonu.xlsx"'
+        return response
+
     template_name = "Sample Excel Format from OBS.xlsx"
     template_path = Path(settings.BASE_DIR) / template_name
     if not template_path.exists():
@@ -714,38 +524,89 @@ def grade_template_download(request):
     )
 
 
+def _preview_payload(preview):
+    payload = preview_summary(preview)
+    payload["rows_url"] = reverse("assessment:grade_preview_rows", args=[preview["id"]])
+    payload["page"] = preview_page(preview, 0, PAGE_SIZE)
+    return payload
+
+
 @require_POST
 def grade_preview(request):
+    """Yüklenen tabloyu önizleme oturumuna alır; yalnızca özet ve ilk sayfayı döner."""
     uploaded = request.FILES.get("grades_file")
     if not uploaded:
         return JsonResponse({"error": "Excel dosyası bulunamadı."}, status=400)
 
-    preview = _read_xlsx_preview_from_bytes(uploaded.read())
-    if not preview:
+    headers, rows = sheet_table(cached_xlsx_rows(uploaded))
+    if not headers:
         return JsonResponse({"error": "Excel dosyası okunamadı. Lütfen .xlsx formatı kullanın."}, status=400)
+    return JsonResponse(_preview_payload(create_preview(headers, rows, filename=uploaded.name)))
 
-    raw_headers = preview[0]
-    headers = [_normalize_header(header) for header in raw_headers]
-    header_len = len(headers)
-    rows = []
-    for row in preview[1:]:
-        if len(row) < header_len:
-            row = row + [""] * (header_len - len(row))
-        rows.append(row[:header_len])
 
-    numeric_columns = sorted(_component_columns(headers).keys())
-    return JsonResponse(
-        {
-            "filename": uploaded.name,
-            "headers": headers,
-            "rows": rows,
-            "numeric_columns": numeric_columns,
-        }
-    )
+def _preview_etag(request, session_id):
+    # Önizleme oturumu değişmez; aynı oturumun aynı sayfası her zaman aynı yanıtı verir.
+    return session_id if preview_exists(session_id) else None
+
+
+@require_GET
+@condition(etag_func=_preview_etag)
+def grade_preview_rows(request, session_id):
+    preview = get_preview(session_id)
+    if preview is None:
+        return JsonResponse({"error": "Önizleme oturumu bulunamadı veya süresi doldu."}, status=404)
+    try:
+        offset = int(request.GET.get("offset", 0))
+        limit = int(request.GET.get("limit", PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "offset ve limit tam sayı olmalıdır."}, status=400)
+    return JsonResponse(preview_page(preview, offset, limit))
+
+
+def _enqueue_uploaded_file(course, uploaded):
+    headers, rows = sheet_table(cached_xlsx_rows(uploaded))
+    if not headers:
+        return None
+    return enqueue_import(course, headers, rows, filename=uploaded.name)
+
+
+@require_POST
+def grade_import_enqueue(request):
+    """Yüklenen tabloyu veya önizleme oturumunu arka plan kuyruğuna alır; ilerleme adresini döner."""
+    course = Course.objects.filter(id=request.POST.get("course")).first()
+    if course is None:
+        return JsonResponse({"error": "Ders bulunamadı."}, status=400)
+    session_id = request.POST.get("session")
+    uploaded = request.FILES.get("grades_file")
+    if session_id:
+        preview = get_preview(session_id)
+        if preview is None:
+            return JsonResponse({"error": "Önizleme oturumu bulunamadı veya süresi doldu."}, status=404)
+        job = enqueue_import(course, preview["headers"], preview["rows"], filename=preview["filename"])
+    elif uploaded:
+        job = _enqueue_uploaded_file(course, uploaded)
+        if job is None:
+            return JsonResponse({"error": "Excel dosyası okunamadı. Lütfen .xlsx formatı kullanın."}, status=400)
+    else:
+        return JsonResponse({"error": "Excel dosyası bulunamadı."}, status=400)
+    progress_url = reverse("assessment:grade_import_status", args=[job.id])
+    return JsonResponse({"job": job.id, "status": job.status, "progress_url": progress_url}, status=202)
+
+
+def _job_etag(request, job_id):
+    state = GradeImportJob.objects.filter(id=job_id).values_list("status", "rows_processed", "finished_at").first()
+    return "-".join(str(value) for value in (job_id, *state)) if state else None
+
+
+@require_GET
+@condition(etag_func=_job_etag)
+def grade_import_status(request, job_id):
+    job = get_object_or_404(GradeImportJob.objects.defer("headers", "rows"), id=job_id)
+    return JsonResponse(job_progress(job))
 
 
 def grade_upload(request):
-    bootstrap_demo_data()
+    ensure_demo_data()
     courses = Course.objects.all()
     selected_course = courses.filter(id=request.GET.get("course")).first() or courses.first()
 
@@ -756,25 +617,20 @@ def grade_upload(request):
     template_available = template_path.exists()
     table_headers = []
     table_rows = []
-    raw_headers = []
+    table_base = ""
+    preview = None
+    diff = None
     if template_available:
-        raw_rows = _read_xlsx_preview(template_path)
-        if raw_rows:
-            raw_headers = raw_rows[0]
-            table_headers = [_normalize_header(header) for header in raw_headers]
-            header_len = len(table_headers)
-            for row in raw_rows[1:]:
-                if len(row) < header_len:
-                    row = row + [""] * (header_len - len(row))
-                table_rows.append(row[:header_len])
-
-    component_columns = _component_columns(table_headers)
-    numeric_columns = sorted(component_columns.keys())
+        table_headers, table_rows = sheet_table(cached_xlsx_rows(template_path))
+        table_base = "template"
+
+    numeric_columns = sorted(component_columns(table_headers).keys())
 
     if request.method == "POST":
         selected_course = courses.filter(id=request.POST.get("course")).first() or selected_course
         form_type = request.POST.get("form_type")
         if form_type == "upload":
+            # Yalnızca dosyayı onaylar; içe aktarma "Arka planda içe aktar" (grade_import_enqueue) ile kuyruğa alınır.
             uploaded = request.FILES.get("grades_file")
             if uploaded:
                 uploaded_filename = uploaded.name
@@ -782,112 +638,36 @@ def grade_upload(request):
             else:
                 messages.error(request, "Lütfen bir Excel dosyası seçin.")
         elif form_type == "save_grades" and selected_course:
+            bases = {"template": (table_headers, table_rows)}
+            session_id = request.POST.get("preview_session")
+            source = get_preview(session_id)
+            if source is not None:
+                bases[f"preview:{session_id}"] = (source["headers"], source["rows"])
+            dry_run = bool(request.POST.get("dry_run"))
             try:
-                row_count = int(request.POST.get("row_count", 0))
-                col_count = int(request.POST.get("col_count", len(table_headers)))
-            except ValueError:
-                row_count = 0
-                col_count = len(table_headers)
-            if not table_headers and col_count:
-                table_headers = [request.POST.get(f"header_{idx}", "") for idx in range(col_count)]
-
-            table_rows = []
-            for row_index in range(row_count):
-                row = []
-                for col_index in range(col_count):
-                    row.append(request.POST.get(f"cell_{row_index}_{col_index}", "").strip())
-                table_rows.append(row)
-
-            if not table_headers:
-                messages.error(request, "Tablo başlıkları bulunamadı; kayıt yapılamadı.")
-            else:
-                component_columns = _component_columns(table_headers)
-                numeric_columns = sorted(component_columns.keys())
-                component_map = {}
-                for col_index, info in component_columns.items():
-                    component, _ = AssessmentComponent.objects.get_or_create(
-                        course=selected_course, name=info["name"]
-                    )
-                    if component.weight_percent != info["weight"]:
-                        component.weight_percent = info["weight"]
-                        component.save(update_fields=["weight_percent"])
-                    component_map[col_index] = component
-
-                header_map = {_normalize_header(header): idx for idx, header in enumerate(table_headers)}
-                student_no_idx = _find_header_index(
-                    header_map, ["Öğrenci No", "Ogrenci No", "Student No"]
-                )
-                name_idx = _find_header_index(header_map, ["Adı", "Adi", "Name"])
-                surname_idx = _find_header_index(header_map, ["Soyadı", "Soyadi", "Surname"])
-                class_idx = _find_header_index(header_map, ["Snf", "Sınıf", "Sinif", "Class"])
-                entry_idx = _find_header_index(
-                    header_map, ["Girme Durum", "Girme Durumu", "Entry Status"]
-                )
-                letter_idx = _find_header_index(
-                    header_map, ["Harf Notu", "Harf Not", "Letter Grade"]
-                )
-
-                if student_no_idx is None:
-                    messages.error(request, "Öğrenci No sütunu bulunamadı; kayıt yapılamadı.")
+                saved_headers, saved_rows = decode_grade_table(request.POST.get("grades_json"), bases=bases)
+                importer = GradeImport(selected_course, saved_headers, saved_rows)
+                if dry_run:
+                    diff = importer.diff()
                 else:
-                    updated = 0
-                    for row in table_rows:
-                        if student_no_idx >= len(row):
-                            continue
-                        student_number = row[student_no_idx].strip()
-                        if not student_number:
-                            continue
-
-                        first = row[name_idx].strip() if name_idx is not None and name_idx < len(row) else ""
-                        last = row[surname_idx].strip() if surname_idx is not None and surname_idx < len(row) else ""
-                        full_name = f"{first} {last}".strip()
-
-                        student, _ = Student.objects.get_or_create(
-                            student_number=student_number,
-                            defaults={"full_name": full_name or student_number},
-                        )
-                        if full_name and student.full_name != full_name:
-                            student.full_name = full_name
-                            student.save(update_fields=["full_name"])
-
-                        enrollment = Enrollment.objects.filter(
-                            student=student, course=selected_course
-                        ).first()
-                        if not enrollment:
-                            enrollment = Enrollment.objects.create(
-                                student=student, course=selected_course, year=2023
-                            )
-
-                        if class_idx is not None and class_idx < len(row):
-                            class_val = row[class_idx].strip()
-                            enrollment.class_level = int(class_val) if class_val.isdigit() else None
-                        if entry_idx is not None and entry_idx < len(row):
-                            enrollment.entry_status = row[entry_idx].strip()
-                        if letter_idx is not None and letter_idx < len(row):
-                            enrollment.letter_grade = row[letter_idx].strip()
-                        enrollment.save()
-
-                        for col_index, component in component_map.items():
-                            if col_index >= len(row):
-                                continue
-                            raw_score = row[col_index].strip()
-                            if not raw_score:
-                                continue
-                            try:
-                                score = float(raw_score.replace(",", "."))
-                            except ValueError:
-                                continue
-                            assessment, _ = StudentAssessment.objects.get_or_create(
-                                enrollment=enrollment, assessment_component=component
-                            )
-                            if assessment.score != score:
-                                assessment.score = score
-                                assessment.save(update_fields=["score"])
-                        updated += 1
+                    summary = importer.apply()
+            except GradeImportError as exc:
+                messages.error(request, str(exc))
+                if source is not None:
+                    preview = _preview_payload(source)
+            else:
+                if not dry_run:
                     messages.success(
                         request,
-                        f"Notlar kaydedildi. Güncellenen öğrenci sayısı: {updated}",
+                        f"Notlar kaydedildi. Güncellenen öğrenci sayısı: {summary.rows} "
+                        f"(yeni not: {summary.inserted}, değişen: {summary.updated}, değişmeyen: {summary.unchanged}).",
                     )
+                # Kaydedilen ya da incelenen tablo yeni bir önizleme oturumu olarak sayfalı gösterilir;
+                # kuru çalıştırmadan sonra "Uygula" aynı oturumu değişiklik olmadan gönderir.
+                if source is not None:
+                    discard_preview(session_id)
+                filename = source["filename"] if source else template_name
+                preview = _preview_payload(create_preview(saved_headers, saved_rows, filename=filename))
 
     context = {
         "courses": courses,
@@ -898,34 +678,43 @@ def grade_upload(request):
         "table_headers": table_headers,
         "table_rows": table_rows,
         "numeric_columns": numeric_columns,
-        "row_count": len(table_rows),
-        "col_count": len(table_headers),
+        "table_base": table_base,
+        "preview": preview,
+        "diff": diff,
     }
     return render(request, "assessment/grade_upload.html", context)
 
 
-def analytics_panel(request):
-    """LO-PO bağlantılarını grafik/harita görünümünde sunar."""
-    bootstrap_demo_data()
-    courses = Course.objects.all()
-    program_outcomes = ProgramOutcome.objects.all()
-    links = (
-        LearningOutcomeProgramOutcome.objects.select_related("learning_outcome", "program_outcome", "learning_outcome__course")
-        .all()
-    )
-
-    # Heatmap: ders x PO, değer ortalama ağırlık
+def _analytics_context(selected_term, selected_course_ids):
+    all_courses = Course.objects.all()
+    terms = all_courses.exclude(term="").order_by("term").values_list("term", flat=True).distinct()
+    courses = all_courses
+    if selected_term:
+        courses = courses.filter(term=selected_term)
+    if selected_course_ids:
+        courses = courses.filter(id__in=selected_course_ids)
+    filtered = bool(selected_term or selected_course_ids)
+    course_filter = courses if filtered else None
+    program_outcomes = list(ProgramOutcome.objects.all())
+
+    # Heatmap: ders x PO, değer ortalama ağırlık; tek gruplu sorgudan doldurulur.
+    weights = course_po_weights(course_filter)
     heatmap = []
     for course in courses:
         row = {"course": course, "values": []}
         for po in program_outcomes:
-            weights = [link.weight for link in links if link.learning_outcome.course_id == course.id and link.program_outcome_id == po.id]
-            avg_weight = round(sum(weights) / len(weights), 2) if weights else 0
+            avg_weight, link_count = weights.get((course.id, po.id), (0, 0))
+            avg_weight = round(avg_weight, 2) if avg_weight else 0
             percent = int((avg_weight / 5) * 100) if avg_weight else 0
-            row["values"].append({"po": po, "value": avg_weight, "percent": percent})
+            row["values"].append({"po": po, "value": avg_weight, "count": link_count, "percent": percent})
         heatmap.append(row)
 
     # Kenar listesi: LO -> PO bağlantıları
+    links = LearningOutcomeProgramOutcome.objects.select_related(
+        "learning_outcome", "program_outcome", "learning_outcome__course"
+    )
+    if filtered:
+        links = links.filter(learning_outcome__course__in=course_filter)
     edges = [
         {
             "course": link.learning_outcome.course,
@@ -937,26 +726,58 @@ def analytics_panel(request):
     ]
 
     # Not bileşeni katkıları
-    contribs = (
-        LearningOutcomeContribution.objects.select_related(
-            "assessment_component", "learning_outcome", "assessment_component__course"
-        )
-        .order_by("assessment_component__course__code", "assessment_component__name")
-        .all()
-    )
+    contribs = LearningOutcomeContribution.objects.select_related(
+        "assessment_component", "learning_outcome", "assessment_component__course"
+    ).order_by("assessment_component__course__code", "assessment_component__name")
+    if filtered:
+        contribs = contribs.filter(assessment_component__course__in=course_filter)
 
-    context = {
-        "courses": courses,
+    return {
+        "courses": all_courses,
+        "terms": terms,
+        "selected_term": selected_term,
+        "selected_course_ids": selected_course_ids,
+        "export_query": urlencode([("course", row["course"].id) for row in heatmap]) if filtered else "",
         "program_outcomes": program_outcomes,
         "heatmap": heatmap,
         "edges": edges,
         "contribs": contribs,
     }
-    return render(request, "assessment/analytics.html", context)
 
 
-def schema_overview(request):
-    """Veritabanı şemasını alan tipleri ve ilişkilerle birlikte gösterir."""
+@versioned(lambda request: [CURRICULUM])
+def analytics_panel(request):
+    """LO-PO bağlantılarını grafik/harita görünümünde sunar; ?term= ve ?course= ile ders alt kümesine daraltılır.
+
+    İçerik müfredat sürümü ve filtreye göre önbelleklenir; eşleme verisi değişene kadar sorgu çalışmaz.
+    """
+    ensure_demo_data()
+    selected_term = request.GET.get("term", "")
+    selected_course_ids = sorted({int(value) for value in request.GET.getlist("course") if value.isdigit()})
+    content = cached_fragment(
+        fragment_key("analytics", get_version(CURRICULUM), selected_term, selected_course_ids),
+        "assessment/analytics_content.html",
+        lambda: _analytics_context(selected_term, selected_course_ids),
+    )
+    return render(request, "assessment/analytics.html", {"content": content})
+
+
+@require_GET
+def attainment_export(request):
+    """Kayıt başına final, ÖÇ ve PÇ puanlarını ders başına bir sayfa olarak akış halinde indirir."""
+    courses = Course.objects.order_by("code")
+    course_ids = request.GET.getlist("course")
+    if course_ids:
+        courses = courses.filter(id__in=[value for value in course_ids if value.isdigit()])
+    filename = f"basarim-{timezone.localdate():%Y%m%d}.xlsx"
+    response = StreamingHttpResponse(stream_attainment_export(courses), content_type=XLSX_CONTENT_TYPE)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@lru_cache(maxsize=None)
+def _schema_models():
+    """Model alanlarının özeti; model tanımları süreç boyunca değişmediğinden bir kez çıkarılır."""
     models = [
         Course,
         LearningOutcome,
@@ -991,27 +812,48 @@ def schema_overview(request):
                 }
             )
         model_rows.append({"model": model.__name__, "fields": fields})
+    return model_rows
 
-    return render(request, "assessment/schema.html", {"models": model_rows})
+
+def schema_overview(request):
+    """Veritabanı şemasını alan tipleri ve ilişkilerle birlikte gösterir."""
+    model_rows = _schema_models()
+    # Anahtar şemanın özetini içerir; kalıcı bir önbellekte dağıtım sonrası eski şema gösterilmez.
+    content = cached_fragment(
+        fragment_key("schema", json.dumps(model_rows, sort_keys=True)),
+        "assessment/schema_content.html",
+        lambda: {"models": model_rows},
+    )
+    return render(request, "assessment/schema.html", {"content": content})
 
 
-def course_difficulty(course, student=None):
-    """Heuristik zorluk tahmini ve gerekçeleri (öğrenci geçmişi varsa ona göre)."""
-    class_avg = (
-        StudentAssessment.objects.filter(enrollment__course=course).aggregate(avg=Avg("score")).get("avg") or 80
+def student_course_averages(student, courses):
+    """Öğrencinin verilen derslerdeki not ortalamaları tek sorguda: {course_id: ortalama}."""
+    return dict(
+        StudentAssessment.objects.filter(enrollment__student=student, enrollment__course__in=courses)
+        .values_list("enrollment__course_id")
+        .annotate(avg=Avg("score"))
     )
+
+
+def course_difficulty(course, student=None, *, structure=None, stats=None, history=None):
+    """Heuristik zorluk tahmini ve gerekçeleri (öğrenci geçmişi varsa ona göre).
+
+    Birden çok ders için çağıran, yapıyı, istatistikleri ve `student_course_averages` geçmişini önceden verir.
+    """
+    if stats is None:
+        stats = course_component_stats(course)
+    class_avg = course_mean(stats) or 80
     personal_avg = None
     if student:
-        personal_avg = (
-            StudentAssessment.objects.filter(enrollment__course=course, enrollment__student=student)
-            .aggregate(avg=Avg("score"))
-            .get("avg")
-        )
+        if history is None:
+            history = student_course_averages(student, [course])
+        personal_avg = history.get(course.id)
 
-    max_weight = (
-        AssessmentComponent.objects.filter(course=course).aggregate(m=Max("weight_percent")).get("m") or 0
-    )
-    lo_po_count = LearningOutcomeProgramOutcome.objects.filter(learning_outcome__course=course).count()
+    if structure is None:
+        structure = get_course_structure(course)
+    max_weight = structure.max_weight
+    lo_po_count = len(structure.program_links)
 
     reasons = []
     score = 0
@@ -1058,7 +900,7 @@ def course_difficulty(course, student=None):
 
 def course_planner(request):
     """Öğrencilerin ders alıp bırakabileceği ve zorluk tahminlerini göreceği sayfa."""
-    bootstrap_demo_data()
+    ensure_demo_data()
     students = Student.objects.all()
     selected_student = students.filter(id=request.GET.get("student")).first() or students.first()
 
@@ -1085,6 +927,7 @@ def course_planner(request):
     enrolled = (
         Enrollment.objects.filter(student=selected_student)
         .select_related("course")
+        .with_final_score()
         .order_by("course__code")
         if selected_student
         else []
@@ -1094,19 +937,21 @@ def course_planner(request):
         for e in enrolled
     ]
     enrolled_ids = [e.course_id for e in enrolled]
-    available_courses = Course.objects.exclude(id__in=enrolled_ids)
+    available_courses = list(Course.objects.exclude(id__in=enrolled_ids))
+    # Yapılar, istatistikler ve öğrenci geçmişi ders sayısından bağımsız olarak birlikte yüklenir.
+    structures = get_course_structures(available_courses)
+    stats_by_course = component_stats_for_courses([course.id for course in available_courses])
+    history = student_course_averages(selected_student, available_courses) if selected_student else {}
 
     passed_los = LearningOutcome.objects.filter(
         course__enrollments__student=selected_student, course__enrollments__result="passed"
     )
     passed_lo_codes_global = set(passed_los.values_list("code", flat=True))
 
-    def lo_coverage(course, known_codes):
+    def lo_coverage(structure, known_codes):
         total = 0
         covered = 0
-        for contrib in LearningOutcomeContribution.objects.select_related("assessment_component", "learning_outcome").filter(
-            assessment_component__course=course
-        ):
+        for contrib in structure.contributions:
             weight = contrib.assessment_component.weight_percent * contrib.contribution_percent / 100
             total += weight
             if contrib.learning_outcome.code in known_codes:
@@ -1115,11 +960,14 @@ def course_planner(request):
 
     available_data = []
     for course in available_courses:
-        diff = course_difficulty(course, selected_student)
-        course_los = list(course.learning_outcomes.all())
+        structure = structures[course.id]
+        diff = course_difficulty(
+            course, selected_student, structure=structure, stats=stats_by_course[course.id], history=history
+        )
+        course_los = structure.learning_outcomes
         known = [lo.code for lo in course_los if lo.code in passed_lo_codes_global]
         missing = [lo.code for lo in course_los if lo.code not in passed_lo_codes_global]
-        coverage = lo_coverage(course, passed_lo_codes_global)
+        coverage = lo_coverage(structure, passed_lo_codes_global)
         if coverage >= 50:
             if diff["label"] == "Orta":
                 diff["label"] = "Kolay"
@@ -1139,7 +987,6 @@ def course_planner(request):
         )
 
     context = {
-        "students": students,
         "student": selected_student,
         "enrolled": enrolled_data,
         "available": available_data,
@@ -0,0 +1,351 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+# Bellek katmanı giriş sayısıyla değil toplam satırla sınırlanır; tek bir büyük tablo küçük olanları da taşımaz.
+PARSE_CACHE_ROWS = getattr(settings, "ASSESSMENT_XLSX_CACHE_ROWS", 20000)
+PARSE_CACHE_DIR = getattr(settings, "ASSESSMENT_XLSX_CACHE_DIR", None)
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+SHARED_STRINGS = "xl/sharedStrings.xml"
+
+
+def column_index(ref):
+    """Hücre referansının sütun sırası: "A1" -> 0, "AB12" -> 27."""
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _first_sheet(zfile):
+    sheet_names = [name for name in zfile.namelist() if name.startswith("xl/worksheets/sheet")]
+    return sheet_names[0] if sheet_names else None
+
+
+def _iter_shared_strings(zfile):
+    with zfile.open(SHARED_STRINGS) as handle:
+        for _, elem in ET.iterparse(handle):
+            if elem.tag == f"{NS}si":
+                yield "".join(node.text or "" for node in elem.iter(f"{NS}t"))
+                elem.clear()
+
+
+def _cell_value(cell, shared):
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(node.text or "" for node in cell.iter(f"{NS}t"))
+    value = cell.find(f"{NS}v")
+    if value is None:
+        return ""
+    if cell_type == "s":
+        index = int(value.text)
+        return shared[index] if index < len(shared) else ""
+    return value.text or ""
+
+
+def iter_xlsx_rows(zfile, max_rows=None):
+    """İlk sayfanın satırlarını akış halinde üretir.
+
+    Hücreler `r` referansındaki sütuna yerleştirilir; atlanan hücreler "" olur. İşlenen
+    satırlar ağaçtan silindiği için bellek kullanımı sayfa boyutundan bağımsızdır.
+    """
+    sheet = _first_sheet(zfile)
+    if sheet is None:
+        return
+    shared = list(_iter_shared_strings(zfile)) if SHARED_STRINGS in zfile.namelist() else []
+    emitted = 0
+    with zfile.open(sheet) as handle:
+        sheet_data = None
+        for event, elem in ET.iterparse(handle, events=("start", "end")):
+            if event == "start":
+                if elem.tag == f"{NS}sheetData":
+                    sheet_data = elem
+                continue
+            if elem.tag != f"{NS}row":
+                continue
+            values = []
+            for cell in elem.findall(f"{NS}c"):
+                ref = cell.get("r")
+                index = column_index(ref) if ref else len(values)
+                if index > len(values):
+                    values.extend([""] * (index - len(values)))
+                value = _cell_value(cell, shared)
+                if index < len(values):
+                    values[index] = value
+                else:
+                    values.append(value)
+            if sheet_data is not None:
+                sheet_data.clear()
+            yield values
+            emitted += 1
+            if max_rows is not None and emitted >= max_rows:
+                return
+
+
+def read_xlsx_rows(source, max_rows=None):
+    """Yol, bayt veya dosya nesnesinden satır listesi; okunamayan dosyada boş liste."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        with zipfile.ZipFile(source) as zfile:
+            return list(iter_xlsx_rows(zfile, max_rows=max_rows))
+    except Exception:
+        return []
+
+
+# anahtar -> satırlar; _parse_cache_rows bellekteki toplam satır sayısıdır.
+_parse_cache = OrderedDict()
+_parse_cache_rows = 0
+_parse_cache_lock = threading.Lock()
+
+
+def _source_key(source):
+    """Yol için (yol, mtime, boyut), bayt ve dosya nesneleri için içerik SHA-256 anahtarı."""
+    if isinstance(source, (str, os.PathLike)):
+        path = Path(source).resolve()
+        stat = path.stat()
+        digest = hashlib.sha256(f"{path}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+        return f"path-{digest}"
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(1 << 16), b""):
+            digest.update(chunk)
+        source.seek(0)
+    return f"sha256-{digest.hexdigest()}"
+
+
+def _disk_path(key):
+    return Path(PARSE_CACHE_DIR) / f"{key}.json" if PARSE_CACHE_DIR else None
+
+
+def _disk_get(key):
+    path = _disk_path(key)
+    if path is None:
+        return None
+    try:
+        with path.open(encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _disk_put(key, rows):
+    path = _disk_path(key)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(rows, handle, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def cached_xlsx_rows(source):
+    """`read_xlsx_rows` sonucunu bellekte (toplam satırla sınırlı LRU) ve isteğe bağlı diskte saklar.
+
+    Yollar mtime/boyut ile, yüklenen dosyalar içerik özeti ile anahtarlanır; aynı dosyanın
+    tekrar önizlenmesi yeniden ayrıştırılmaz. Sınırdan büyük tablolar bellekte tutulmaz.
+    Dönen liste paylaşılır, değiştirilmemelidir.
+    """
+    global _parse_cache_rows
+    try:
+        key = _source_key(source)
+    except OSError:
+        return []
+    with _parse_cache_lock:
+        rows = _parse_cache.get(key)
+        if rows is not None:
+            _parse_cache.move_to_end(key)
+            return rows
+    rows = _disk_get(key)
+    if rows is None:
+        rows = read_xlsx_rows(source)
+        if rows:
+            _disk_put(key, rows)
+    if len(rows) > PARSE_CACHE_ROWS:
+        return rows
+    with _parse_cache_lock:
+        if key not in _parse_cache:
+            _parse_cache[key] = rows
+            _parse_cache_rows += len(rows)
+        _parse_cache.move_to_end(key)
+        while _parse_cache_rows > PARSE_CACHE_ROWS:
+            _, evicted = _parse_cache.popitem(last=False)
+            _parse_cache_rows -= len(evicted)
+    return rows
+
+
+def clear_parse_cache():
+    global _parse_cache_rows
+    with _parse_cache_lock:
+        _parse_cache.clear()
+        _parse_cache_rows = 0
+
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    "{sheets}"
+    "</Types>"
+)
+SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheets>{sheets}</sheets></workbook>"
+)
+WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>'
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "{sheets}</Relationships>"
+)
+WORKBOOK_REL = (
+    '<Relationship Id="rId{index}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{index}.xml"/>'
+)
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = "</sheetData></worksheet>"
+INVALID_SHEET_CHARS = re.compile(r"[\\/?*\[\]:]")
+# XML 1.0'da izin verilmeyen denetim karakterleri hücre metninden atılır.
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+FLUSH_ROWS = 200
+
+
+def column_letter(index):
+    """Sütun sırasının harf karşılığı: 0 -> "A", 27 -> "AB"."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref, value):
+    if value is None or value == "":
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(INVALID_XML_CHARS.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row_xml(row_number, values):
+    cells = "".join(_cell_xml(f"{column_letter(index)}{row_number}", value) for index, value in enumerate(values))
+    return f'<row r="{row_number}">{cells}</row>'
+
+
+def _sheet_names(names):
+    seen = set()
+    for name in names:
+        clean = INVALID_SHEET_CHARS.sub("", name).strip()[:31] or "Sayfa"
+        candidate, suffix = clean, 2
+        while candidate.lower() in seen:
+            candidate = f"{clean[:28]}~{suffix}"
+            suffix += 1
+        seen.add(candidate.lower())
+        yield candidate
+
+
+class _ChunkSink:
+    """zipfile'ın yazdığı baytları biriktirir; üretici her parçadan sonra boşaltır."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_xlsx(sheets):
+    """(sayfa adı, satırlar) çiftlerinden XLSX baytlarını parça parça üretir.
+
+    Satırlar yazıldıkça sıkıştırılıp dışarı verilir; bellek kullanımı satır sayısından
+    bağımsızdır. Sayfa listesi sonda bilindiği için çalışma kitabı parçaları en son yazılır.
+    """
+    sink = _ChunkSink()
+    names = []
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zfile:
+        for index, (name, rows) in enumerate(sheets, start=1):
+            names.append(name)
+            with zfile.open(f"xl/worksheets/sheet{index}.xml", "w") as handle:
+                handle.write(SHEET_START.encode())
+                buffer = []
+                for row_number, values in enumerate(rows, start=1):
+                    buffer.append(_row_xml(row_number, values))
+                    if len(buffer) >= FLUSH_ROWS:
+                        handle.write("".join(buffer).encode())
+                        buffer.clear()
+                        data = sink.drain()
+                        if data:
+                            yield data
+                handle.write(("".join(buffer) + SHEET_END).encode())
+            yield sink.drain()
+        if not names:
+            names.append("Sayfa")
+            zfile.writestr("xl/worksheets/sheet1.xml", SHEET_START + SHEET_END)
+        indexes = range(1, len(names) + 1)
+        sheet_names = list(_sheet_names(names))
+        zfile.writestr(
+            "[Content_Types].xml", CONTENT_TYPES.format(sheets="".join(SHEET_CONTENT_TYPE.format(index=i) for i in indexes))
+        )
+        zfile.writestr("_rels/.rels", ROOT_RELS)
+        zfile.writestr(
+            "xl/workbook.xml",
+            WORKBOOK.format(
+                sheets="".join(
+                    WORKBOOK_SHEET.format(name=escape(name, {'"': "&quot;"}), index=i) for i, name in zip(indexes, sheet_names)
+                )
+            ),
+        )
+        zfile.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS.format(sheets="".join(WORKBOOK_REL.format(index=i) for i in indexes)))
+    yield sink.drain()
@@ -10,6 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import atexit
+import shutil
+import sys
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +31,8 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Application definition
 
@@ -41,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'assessment.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +85,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Persistent connections. When DEBUG is off, assessment.database applies the
+        # WAL/synchronous/busy timeout/mmap/cache PRAGMAs per connection (ASSESSMENT_SQLITE_*).
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# The assessment version stamps (assessment.versioning) and everything keyed on them -- course
+# structures, statistics, page fragments, ETags, preview sessions -- must be shared by every
+# process: web workers, `runimportworker` and `importgrades`. LocMemCache is per-process, so
+# writes from one process would never invalidate another. Use a file cache here (or Redis /
+# Memcached in production). Remove var/cache after replacing db.sqlite3 by hand.
+# Tests get a throwaway directory so they never see stamps from the development database.
+
+if TESTING:
+    CACHE_DIR = tempfile.mkdtemp(prefix='kisilim-test-cache-')
+    atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+else:
+    CACHE_DIR = BASE_DIR / 'var' / 'cache'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
@@ -123,3 +159,29 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Per-request SQL query budgets (assessment.middleware.QueryBudgetMiddleware).
+# Keys are URL names; values are a query count or {"queries": n, "time_ms": t}.
+# Budgets apply to GET/HEAD requests only; writes are measured and logged but never fail after committing.
+# Budgets raise in DEBUG and under `manage.py test`, and only log a warning otherwise.
+# Values are the cold-cache counts measured on the project database plus a few queries of headroom;
+# none of these views should grow with the number of courses, students or outcomes.
+
+ASSESSMENT_QUERY_BUDGET_STRICT = DEBUG or TESTING
+ASSESSMENT_QUERY_HEADERS = DEBUG
+ASSESSMENT_QUERY_BUDGETS = {
+    'assessment:dashboard': 14,  # measured 11
+    'assessment:student_panel': 15,  # 12
+    'assessment:student_search': 3,  # 1
+    'assessment:instructor_panel': 16,  # 13
+    'assessment:course_search': 3,  # 1
+    'assessment:grade_upload': 5,  # 3
+    'assessment:grade_preview_rows': 2,  # 0
+    'assessment:grade_import_status': 4,  # 2
+    'assessment:grade_template_download': 8,  # 6
+    'assessment:analytics': 8,  # 6
+    'assessment:attainment_export': 4,  # 1, streaming body not counted
+    'assessment:course_planner': 14,  # 11
+    'assessment:schema_overview': 3,  # 0
+}
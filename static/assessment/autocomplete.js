@@ -0,0 +1,53 @@
+// Otomatik tamamlama alanları (assessment/autocomplete_field.html): yazılan metin sunucuda aranır,
+// listeden seçilen kaydın kimliği gizli alana yazılır.
+document.querySelectorAll("[data-autocomplete]").forEach((input) => {
+    const hidden = input.form.elements[input.dataset.field];
+    const options = document.getElementById(input.getAttribute("list"));
+    // Sayfayla gelen seçim, sonuç listesi yenilense de metni değişmedikçe geçerli kalır.
+    const ids = new Map();
+    const initial = [input.value, hidden.value];
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener("input", () => {
+        const id = input.value === initial[0] ? initial[1] : ids.get(input.value);
+        // Metin bir sonuç etiketiyle eşleşmiyorsa önceki seçim gönderilmez.
+        hidden.value = id === undefined ? "" : id;
+        if (id !== undefined) {
+            return;
+        }
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (!query) {
+            return;
+        }
+        timer = setTimeout(async () => {
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            try {
+                const response = await fetch(`${input.dataset.autocomplete}?q=${encodeURIComponent(query)}`, {
+                    signal: controller.signal,
+                });
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                ids.clear();
+                options.replaceChildren(
+                    ...data.results.map((item) => {
+                        ids.set(item.label, item.id);
+                        const option = document.createElement("option");
+                        option.value = item.label;
+                        return option;
+                    })
+                );
+            } catch (error) {
+                if (error.name !== "AbortError") {
+                    throw error;
+                }
+            }
+        }, 200);
+    });
+});